@@ -0,0 +1,85 @@
+"""
+Compare request latency with and without an online backup running in the background.
+
+Run from the repository root:
+    python -m benchmarks.bench_backup [--tasks 5000] [--requests 300]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+directory = tempfile.mkdtemp()
+os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench_database.db')
+
+from src.app import app, db, Task  # noqa: E402
+from src.database.Backup import create_backup  # noqa: E402
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+
+def run(requests: int, task_ids: list[int]) -> tuple[float, float]:
+    """
+    Alternate get_tasks and edit_task requests.
+
+    Returns:
+        tuple[float, float]: p99 latency (ms) of get_tasks and of edit_task.
+    """
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    reads, writes = [], []
+    for i in range(requests):
+        start = time.perf_counter()
+        client.get('/get_tasks')
+        reads.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        client.put(f'/edit_task/{task_ids[i % len(task_ids)]}', json={'story_point': i % 13 + 1})
+        writes.append(time.perf_counter() - start)
+    return percentile(reads, 0.99), percentile(writes, 0.99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--pages', type=int, default=app.config['BACKUP_PAGES_PER_STEP'])
+    parser.add_argument('--sleep', type=float, default=app.config['BACKUP_STEP_SLEEP'])
+    args = parser.parse_args()
+
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all(Task(title=f'Task {i}', description='Benchmark task ' * 20, story_point=1,
+                                development_bit_vector='00001', priority_tag='low', progress_tag='not-started',
+                                user='admin', created_at='Sunday 20 October, 09:15 PM') for i in range(args.tasks))
+        db.session.commit()
+        task_ids = [task_id for task_id, in db.session.query(Task.id).limit(50)]
+        source = db.engine.url.database
+
+    print(f'{"mode":<16}{"get_tasks p99 ms":>18}{"edit_task p99 ms":>18}{"backups":>9}')
+    for mode in ('idle', 'backup running'):
+        stop = threading.Event()
+        backups = []
+
+        def backup_loop():
+            while not stop.is_set():
+                backups.append(create_backup({'main': source}, os.path.join(directory, 'backups'),
+                                             pages=args.pages, sleep=args.sleep))
+                shutil.rmtree(backups[-1])
+
+        thread = threading.Thread(target=backup_loop) if mode == 'backup running' else None
+        if thread:
+            thread.start()
+        read_p99, write_p99 = run(args.requests, task_ids)
+        stop.set()
+        if thread:
+            thread.join()
+        print(f'{mode:<16}{read_p99:>18.2f}{write_p99:>18.2f}{len(backups):>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure the request overhead of structured request logging.
+
+Compares get_tasks latency with request logging off, with every request written synchronously by the requesting
+thread, through the background queue, and through the queue with successes sampled at 1%.
+
+Run from the repository root:
+    python -m benchmarks.bench_logging [--tasks 50] [--requests 3000]
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench_database.db')
+
+import src.app as app_module  # noqa: E402
+from src.app import app, db, Task, request_logger  # noqa: E402
+from src.request_handling.StructuredLogging import JsonFormatter, start_queue_logging  # noqa: E402
+
+
+def run(requests: int) -> tuple[float, float, float]:
+    """
+    Request get_tasks repeatedly from a logged-in client.
+
+    Returns:
+        tuple[float, float, float]: Requests per second, p50 latency (ms) and p99 latency (ms).
+    """
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        client.get('/get_tasks')
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return requests / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all(Task(title=f'Task {i}', description='Benchmark task', story_point=1,
+                                development_bit_vector='00001', priority_tag='low', progress_tag='not-started',
+                                user='admin', created_at='Sunday 20 October, 09:15 PM') for i in range(args.tasks))
+        db.session.commit()
+    app_module.log_listener = None
+    run(args.requests // 10)  # warm up
+
+    print(f'{"mode":<18}{"requests/s":>12}{"p50 ms":>10}{"p99 ms":>10}')
+    for mode in ('off', 'synchronous', 'queued', 'queued, 1% sampled'):
+        output = logging.FileHandler(os.path.join(directory, f'{mode}.log'))
+        output.setFormatter(JsonFormatter())
+        listener = None
+        if mode == 'synchronous':
+            request_logger.handlers = [output]
+            app_module.log_listener = True
+        elif mode.startswith('queued'):
+            listener, _ = start_queue_logging([request_logger], output)
+            app_module.log_listener = listener
+        app.config['LOG_SAMPLE_RATE'] = 0.01 if mode.endswith('sampled') else 1.0
+
+        throughput, p50, p99 = run(args.requests)
+        print(f'{mode:<18}{throughput:>12.0f}{p50:>10.3f}{p99:>10.3f}')
+        if listener:
+            listener.stop()
+        app_module.log_listener = None
+        output.close()
+
+
+if __name__ == '__main__':
+    main()
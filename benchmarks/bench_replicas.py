@@ -0,0 +1,99 @@
+"""
+Compare get_tasks latency while another client keeps editing tasks, with reads on the primary and on a SQLite file
+replica refreshed through the backup API.
+
+Run from the repository root:
+    python -m benchmarks.bench_replicas [--tasks 5000] [--requests 300] [--refresh-interval 2]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+directory = tempfile.mkdtemp()
+os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench_database.db')
+
+import src.app as app_module  # noqa: E402
+from src.app import app, db, Task  # noqa: E402
+from src.database.Replicas import ReplicaSet, create_replica_engine  # noqa: E402
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+
+def run(requests: int, task_ids: list[int], refresh_interval: float = None) -> tuple[float, float, int, int]:
+    """
+    Send get_tasks requests from one client while another edits tasks (and, with a refresh interval, a third thread
+    refreshes the replica).
+
+    Returns:
+        tuple[float, float, int, int]: p50 and p99 latency (ms) of get_tasks, edits made and replica refreshes.
+    """
+    stop = threading.Event()
+    counts = {'edits': 0, 'refreshes': 0}
+
+    def edit_loop():
+        writer = app.test_client()
+        writer.post('/login', data={'username': 'admin', 'password': '123'})
+        while not stop.is_set():
+            writer.put(f'/edit_task/{task_ids[counts["edits"] % len(task_ids)]}',
+                       json={'story_point': counts['edits'] % 13 + 1})
+            counts['edits'] += 1
+
+    def refresh_loop():
+        while not stop.wait(refresh_interval):
+            with app.app_context():
+                counts['refreshes'] += app_module.refresh_replicas() is not None
+
+    threads = [threading.Thread(target=edit_loop)]
+    if refresh_interval:
+        threads.append(threading.Thread(target=refresh_loop))
+    for thread in threads:
+        thread.start()
+    reader = app.test_client()
+    reader.post('/login', data={'username': 'admin', 'password': '123'})
+    reads = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        reader.get('/get_tasks')
+        reads.append(time.perf_counter() - start)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return percentile(reads, 0.5), percentile(reads, 0.99), counts['edits'], counts['refreshes']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--refresh-interval', type=float, default=2.0)
+    args = parser.parse_args()
+
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all(Task(title=f'Task {i}', description='Benchmark task ' * 20, story_point=1,
+                                development_bit_vector='00001', priority_tag='low', progress_tag='not-started',
+                                user='admin', created_at='Sunday 20 October, 09:15 PM') for i in range(args.tasks))
+        db.session.commit()
+        task_ids = [task_id for task_id, in db.session.query(Task.id).limit(50)]
+
+    print(f'{"reads from":<12}{"get_tasks p50 ms":>18}{"get_tasks p99 ms":>18}{"edits":>8}{"refreshes":>11}')
+    p50, p99, edits, _ = run(args.requests, task_ids)
+    print(f'{"primary":<12}{p50:>18.2f}{p99:>18.2f}{edits:>8}{"-":>11}')
+
+    uri = 'sqlite:///' + os.path.join(directory, 'replica.db')
+    app.config.update(READ_REPLICAS=[uri], REPLICA_REFRESH_INTERVAL=args.refresh_interval)
+    app_module.replica_set = ReplicaSet([create_replica_engine(uri)], max_lag=app.config['REPLICA_MAX_LAG'],
+                                        check_interval=app.config['REPLICA_CHECK_INTERVAL'])
+    with app.app_context():
+        app_module.refresh_replicas()
+    p50, p99, edits, refreshes = run(args.requests, task_ids, args.refresh_interval)
+    print(f'{"replica":<12}{p50:>18.2f}{p99:>18.2f}{edits:>8}{refreshes:>11}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare task insert throughput and latency with and without write-behind mode.
+
+Run from the repository root:
+    python -m benchmarks.bench_write_queue [--threads 16] [--writes 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ['DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_database.db')
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import src.app as app_module  # noqa: E402
+from src.app import app, db, Task, add_to_db  # noqa: E402
+from src.database.WriteQueue import WriteQueue  # noqa: E402
+
+
+def run(threads: int, writes: int) -> tuple[float, float, float]:
+    """
+    Insert threads * writes tasks from concurrent threads.
+
+    Returns:
+        tuple[float, float, float]: Writes per second, p50 latency (ms) and p99 latency (ms).
+    """
+    latencies = []
+    latencies_lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        thread_latencies = []
+        with app.app_context():
+            barrier.wait()
+            for i in range(writes):
+                task = Task(title=f'Task {i}', description='Benchmark task', story_point=1,
+                            development_bit_vector='00001', priority_tag='low', progress_tag='not-started',
+                            user='admin', created_at='Sunday 20 October, 09:15 PM')
+                start = time.perf_counter()
+                add_to_db(task)
+                thread_latencies.append(time.perf_counter() - start)
+        with latencies_lock:
+            latencies.extend(thread_latencies)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p99 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--writes', type=int, default=200, help='writes per thread')
+    args = parser.parse_args()
+
+    print(f'{"mode":<14}{"writes/s":>12}{"p50 ms":>10}{"p99 ms":>10}')
+    for mode in ('direct', 'write-behind'):
+        with app.app_context():
+            Task.query.delete()
+            db.session.commit()
+            if mode == 'write-behind':
+                app_module.write_queue = WriteQueue(sessionmaker(bind=db.engine, expire_on_commit=False))
+        throughput, p50, p99 = run(args.threads, args.writes)
+        print(f'{mode:<14}{throughput:>12.0f}{p50:>10.2f}{p99:>10.2f}')
+        if app_module.write_queue:
+            app_module.write_queue.stop()
+            app_module.write_queue = None
+
+
+if __name__ == '__main__':
+    main()
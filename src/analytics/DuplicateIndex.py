@@ -0,0 +1,123 @@
+import re
+import zlib
+
+import numpy as np
+
+PRIME = (1 << 31) - 1
+MAX_HASH = PRIME
+
+
+class DuplicateIndex:
+    """DuplicateIndex finds near-duplicate texts with MinHash signatures and locality-sensitive hashing (LSH).
+
+    Each text is reduced to its set of character shingles and summarised by a MinHash signature, whose positions agree
+    between two texts with probability equal to the Jaccard similarity of their shingle sets. Signatures are split into
+    bands, and texts sharing any band are stored in the same bucket, so a query only compares against the few texts
+    that collide with it instead of the whole collection. With 16 bands of 4 rows, texts with a similarity around 0.5
+    or more are very likely to collide.
+
+    Signatures are plain uint32 arrays, so they can be persisted and re-added without re-reading the original text.
+
+    Attributes:
+    last_seq (int): Sequence number of the last task change applied to the index
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 4, seed: int = 1):
+        """Initialises an empty DuplicateIndex
+
+        Args:
+            num_perm (int): Length of the MinHash signatures
+            bands (int): Number of LSH bands, which must divide num_perm
+            shingle_size (int): Length of the character shingles
+            seed (int): Seed for the hash functions; indexes must share it to share signatures
+        """
+        if num_perm % bands:
+            raise ValueError('The number of bands must divide the signature length')
+        generator = np.random.default_rng(seed)
+        self._a = generator.integers(1, PRIME, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, PRIME, num_perm, dtype=np.uint64)
+        self._rows = num_perm // bands
+        self._shingle_size = shingle_size
+        self._signatures: dict[int, np.ndarray] = {}
+        self._buckets: list[dict[bytes, set[int]]] = [{} for _ in range(bands)]
+        self.last_seq = 0
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key: int):
+        return key in self._signatures
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text
+
+        Args:
+            text (str): The text to summarise
+
+        Returns:
+            np.ndarray: The signature (uint32), all MAX_HASH for a text without any words
+        """
+        text = ' '.join(re.findall(r'\w+', text.lower()))
+        if not text:
+            return np.full(len(self._a), MAX_HASH, dtype=np.uint32)
+        size = min(self._shingle_size, len(text))
+        shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+        hashes = np.array([zlib.crc32(shingle.encode()) for shingle in shingles], dtype=np.uint64) % PRIME
+        return ((hashes[:, None] * self._a + self._b) % PRIME).min(axis=0).astype(np.uint32)
+
+    def add(self, key: int, signature: np.ndarray):
+        """Add or replace an entry
+
+        Args:
+            key (int): ID of the entry (e.g. a task ID)
+            signature (np.ndarray): The entry's signature
+        """
+        self.remove(key)
+        if (signature == MAX_HASH).all():
+            return
+        self._signatures[key] = signature
+        for band, buckets in zip(self._bands(signature), self._buckets):
+            buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key: int):
+        """Remove an entry, if present
+
+        Args:
+            key (int): ID of the entry
+        """
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, buckets in zip(self._bands(signature), self._buckets):
+            bucket = buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del buckets[band]
+
+    def query(self, signature: np.ndarray, threshold: float = 0.5, limit: int = 5,
+              exclude: int = None) -> list[tuple[int, float]]:
+        """Find the entries most similar to a signature
+
+        Args:
+            signature (np.ndarray): Signature to compare against
+            threshold (float): Minimum estimated similarity (0 to 1) to report
+            limit (int): Maximum number of entries to return
+            exclude (int): ID of an entry to leave out (e.g. the task being checked)
+
+        Returns:
+            list[tuple[int, float]]: (ID, estimated similarity) pairs, most similar first
+        """
+        candidates = set()
+        for band, buckets in zip(self._bands(signature), self._buckets):
+            candidates.update(buckets.get(band, ()))
+        candidates.discard(exclude)
+        if not candidates:
+            return []
+
+        keys = list(candidates)
+        similarity = (np.stack([self._signatures[key] for key in keys]) == signature).mean(axis=1)
+        order = np.argsort(-similarity, kind='stable')
+        return [(keys[i], round(float(similarity[i]), 3)) for i in order[:limit] if similarity[i] >= threshold]
+
+    def _bands(self, signature: np.ndarray) -> list[bytes]:
+        return [signature[i:i + self._rows].tobytes() for i in range(0, len(signature), self._rows)]
@@ -0,0 +1,140 @@
+import math
+from datetime import datetime, timedelta
+from typing import Iterable
+
+import numpy as np
+
+# Sprints drawn per simulation at a time; simulations that need more draw further blocks of this size
+HORIZON_BLOCK = 128
+# Upper bound on the velocity draws held in memory at once (simulations x sprints), about 32 MB of float64
+MAX_DRAWS = 2 ** 22
+
+
+def activity_windows(activities: Iterable) -> list[tuple[datetime, datetime]]:
+    """Get the sprint windows of a collection of Activity objects, ignoring activities without dates
+
+    Args:
+        activities (Iterable[Activity]): The activities of past sprints
+
+    Returns:
+        list[tuple[datetime, datetime]]: (start, end) of every dated activity, in order of start date
+    """
+    return sorted((activity.start, activity.end) for activity in activities
+                  if activity.start is not None and activity.end is not None)
+
+
+def fixed_windows(end: datetime, length: timedelta, count: int) -> list[tuple[datetime, datetime]]:
+    """Get consecutive sprint windows of a fixed length, the last of which finishes at end
+
+    Args:
+        end (datetime): When the most recent window finishes
+        length (timedelta): Length of each window
+        count (int): Number of windows
+
+    Returns:
+        list[tuple[datetime, datetime]]: (start, end) of every window, oldest first
+    """
+    return [(end - length * (count - i), end - length * (count - i - 1)) for i in range(count)]
+
+
+def sprint_velocities(completed_at: np.ndarray, story_points: np.ndarray,
+                      windows: list[tuple[datetime, datetime]]) -> np.ndarray:
+    """Total the story points completed within each sprint window
+
+    Args:
+        completed_at (np.ndarray): Completion time of each completed task (datetime64)
+        story_points (np.ndarray): Story points of each completed task
+        windows (list[tuple[datetime, datetime]]): Non-overlapping (start, end) sprint windows, in order of start
+
+    Returns:
+        np.ndarray: Story points completed in each window; tasks completed outside every window are ignored
+    """
+    if not windows:
+        return np.zeros(0)
+    starts = np.array([start for start, _ in windows], dtype='datetime64[us]')
+    ends = np.array([end for _, end in windows], dtype='datetime64[us]')
+    completed_at = np.asarray(completed_at, dtype='datetime64[us]')
+
+    window = np.searchsorted(starts, completed_at, side='right') - 1
+    inside = window >= 0
+    inside[inside] = completed_at[inside] < ends[window[inside]]
+    return np.bincount(window[inside], weights=np.asarray(story_points, dtype=float)[inside], minlength=len(windows))
+
+
+def simulate_sprints_needed(remaining_points: float, velocities: np.ndarray, simulations: int = 20000,
+                            seed: int = None, max_sprints: int = 520) -> np.ndarray:
+    """Monte Carlo simulation of how many sprints it takes to complete the remaining story points.
+
+    Every simulated future draws each sprint's velocity at random (with replacement) from the historical velocities,
+    and counts the sprints until the cumulative velocity covers the remaining points. The simulations are run together,
+    drawing a matrix of at most HORIZON_BLOCK sprints (and MAX_DRAWS draws) at a time until every simulation is done.
+
+    Args:
+        remaining_points (float): Story points left in the backlog
+        velocities (np.ndarray): Historical story points completed per sprint
+        simulations (int): Number of simulated futures
+        seed (int): Seed for the random number generator, for reproducible forecasts
+        max_sprints (int): Longest forecast made: at the mean velocity, and in every simulation, the backlog must be
+            completed within this many sprints
+
+    Returns:
+        np.ndarray: The number of sprints needed in each simulation
+
+    Raises:
+        ValueError: There is no historical velocity to forecast from, or the backlog would take more than max_sprints
+    """
+    velocities = np.asarray(velocities, dtype=float)
+    if remaining_points <= 0:
+        return np.zeros(simulations, dtype=np.int64)
+    if not len(velocities) or velocities.max() <= 0:
+        raise ValueError('No story points have been completed yet, so there is no velocity to forecast from')
+    too_long = ValueError(f'At the current velocity the backlog would take more than {max_sprints} sprints, which is '
+                          f'too far ahead to forecast')
+    expected = math.ceil(remaining_points / velocities.mean())
+    if expected > max_sprints:
+        raise too_long
+
+    generator = np.random.default_rng(seed)
+    # enough sprints for the mean velocity three times over, up to one block; the simulations that need more are
+    # extended below
+    horizon = max(1, min(3 * expected, HORIZON_BLOCK))
+    totals = np.zeros(simulations)
+    needed = np.zeros(simulations, dtype=np.int64)
+    pending = np.arange(simulations)
+    offset = 0
+    while len(pending):
+        if offset >= max_sprints:
+            raise too_long
+        block = max(1, min(horizon, MAX_DRAWS // len(pending)))
+        progress = totals[pending, None] + np.cumsum(generator.choice(velocities, size=(len(pending), block)), axis=1)
+        done = progress[:, -1] >= remaining_points
+        needed[pending[done]] = offset + np.argmax(progress[done] >= remaining_points, axis=1) + 1
+        totals[pending] = progress[:, -1]
+        pending = pending[~done]
+        offset += block
+    return needed
+
+
+def forecast(remaining_points: float, velocities: np.ndarray, percentiles: Iterable[int] = (50, 85, 95),
+             simulations: int = 20000, seed: int = None, max_sprints: int = 520) -> dict[int, int]:
+    """Forecast the number of sprints needed to complete the remaining story points, at several confidence levels
+
+    Args:
+        remaining_points (float): Story points left in the backlog
+        velocities (np.ndarray): Historical story points completed per sprint
+        percentiles (Iterable[int]): Confidence levels to report (e.g. 85 means 85% of simulations finished in time)
+        simulations (int): Number of simulated futures
+        seed (int): Seed for the random number generator
+        max_sprints (int): Longest forecast made, see simulate_sprints_needed
+
+    Returns:
+        dict[int, int]: Sprints needed at each confidence level
+
+    Raises:
+        ValueError: There is no velocity to forecast from, or the backlog would take more than max_sprints
+    """
+    needed = simulate_sprints_needed(remaining_points, velocities, simulations=simulations, seed=seed,
+                                     max_sprints=max_sprints)
+    percentiles = list(percentiles)
+    values = np.percentile(needed, percentiles, method='higher')
+    return {percentile: int(value) for percentile, value in zip(percentiles, values)}
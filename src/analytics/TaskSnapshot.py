@@ -0,0 +1,267 @@
+from typing import Iterable
+
+import numpy as np
+
+from src.project_management.Task import Priority, Status, Tag
+
+# progress_tag values used by the board, mapped to the Status they represent
+PROGRESS_TAG_STATUS = {
+    'not-started': Status.NOT_STARTED,
+    'in-progress': Status.IN_PROGRESS_DEVELOPMENT,
+    'planning': Status.IN_PROGRESS_PLANNING,
+    'integration': Status.IN_PROGRESS_INTEGRATION,
+    'development': Status.IN_PROGRESS_DEVELOPMENT,
+    'testing': Status.IN_PROGRESS_TESTING,
+    'completed': Status.COMPLETE,
+}
+STATUSES = list(Status)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+GROUP_KEYS = ('priority', 'status', 'user', 'tag')
+AGGREGATES = ('count', 'sum', 'mean')
+COLUMNS = ('_id', '_story_point', '_priority', '_status', '_tags', '_user', '_alive')
+
+
+class TaskSnapshot:
+    """TaskSnapshot is a compact, columnar, in-memory copy of the task table for reporting.
+
+    Every task is one row across a set of NumPy arrays. Priority, Status and user are stored as small integer codes and
+    the development tags as a bit mask (bit n is the Tag whose value[0] is n), so group-by, filter and histogram queries
+    are single vectorised passes instead of Python loops over ORM objects.
+
+    Rows are updated in place by upsert and remove, so the snapshot can be kept current from the task change stream
+    without reloading it.
+
+    Attributes:
+    last_seq (int): Sequence number of the last change applied to the snapshot
+    users (list[str]): Usernames, indexed by user code
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialises an empty TaskSnapshot
+
+        Args:
+            capacity (int): Number of rows to allocate up front (the arrays grow as needed)
+        """
+        self.last_seq = 0
+        self.users: list[str] = []
+        self._user_codes: dict[str, int] = {}
+        self._index: dict[int, int] = {}
+        self._size = 0
+        self._allocate(max(capacity, 16))
+
+    def __len__(self):
+        return len(self._index)
+
+    def upsert(self, tasks: Iterable[dict]):
+        """Insert or replace tasks in the snapshot
+
+        Args:
+            tasks (Iterable[dict]): Tasks with the keys of get_task_schema (only id, story_point, priority_tag,
+                progress_tag, development_bit_vector and user are used)
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return
+        # existing tasks keep their row, new tasks are numbered -1, -2, ... until rows are reserved for them
+        rows = np.empty(len(tasks), dtype=np.int64)
+        new_rows = 0
+        pending = {}
+        for i, task in enumerate(tasks):
+            row = self._index.get(task['id'], pending.get(task['id']))
+            if row is None:
+                new_rows += 1
+                row = pending[task['id']] = -new_rows
+            rows[i] = row
+
+        if new_rows:
+            self._reserve(self._size + new_rows)
+            is_new = rows < 0
+            rows[is_new] = self._size - rows[is_new] - 1
+            for task, row in zip(tasks, rows):
+                self._index[task['id']] = int(row)
+            self._size += new_rows
+
+        self._id[rows] = [task['id'] for task in tasks]
+        self._story_point[rows] = [task.get('story_point') or 0 for task in tasks]
+        self._priority[rows] = [encode_priority(task.get('priority_tag')) for task in tasks]
+        self._status[rows] = [STATUS_CODES[encode_status(task.get('progress_tag'))] for task in tasks]
+        self._tags[rows] = [int(task.get('development_bit_vector') or '0', 2) for task in tasks]
+        self._user[rows] = [self._encode_user(task.get('user')) for task in tasks]
+        self._alive[rows] = True
+
+    def remove(self, task_ids: Iterable[int]):
+        """Remove tasks from the snapshot. Unknown IDs are ignored.
+
+        Args:
+            task_ids (Iterable[int]): IDs of the tasks to remove
+        """
+        rows = [self._index.pop(task_id) for task_id in task_ids if task_id in self._index]
+        self._alive[rows] = False
+        if self._size > 1024 and len(self._index) < self._size // 2:
+            self._compact()
+
+    def mask(self, priority: Priority | Iterable[Priority] = None, status: Status | Iterable[Status] = None,
+             user: str | Iterable[str] = None, tag: Tag = None, min_points: int = None,
+             max_points: int = None) -> np.ndarray:
+        """Select the tasks matching every given condition
+
+        Args:
+            priority (Priority | Iterable[Priority]): Only tasks with (one of) these priorities
+            status (Status | Iterable[Status]): Only tasks with (one of) these statuses
+            user (str | Iterable[str]): Only tasks belonging to (one of) these users
+            tag (Tag): Only tasks with this development tag
+            min_points (int): Only tasks with at least this many story points
+            max_points (int): Only tasks with at most this many story points
+
+        Returns:
+            np.ndarray: Boolean mask over the snapshot's rows, for group_by and histogram
+        """
+        selected = self._alive[:self._size].copy()
+        if priority is not None:
+            selected &= np.isin(self._priority[:self._size], [p.value for p in _as_list(priority)])
+        if status is not None:
+            selected &= np.isin(self._status[:self._size], [STATUS_CODES[s] for s in _as_list(status)])
+        if user is not None:
+            codes = [self._user_codes[name] for name in _as_list(user) if name in self._user_codes]
+            selected &= np.isin(self._user[:self._size], codes)
+        if tag is not None:
+            selected &= (self._tags[:self._size] & (1 << tag.value[0])) != 0
+        if min_points is not None:
+            selected &= self._story_point[:self._size] >= min_points
+        if max_points is not None:
+            selected &= self._story_point[:self._size] <= max_points
+        return selected
+
+    def group_by(self, key: str, agg: str = 'sum', mask: np.ndarray = None) -> dict[str, float]:
+        """Aggregate story points per priority, status, user or development tag
+
+        A task with several development tags counts towards each of them.
+
+        Args:
+            key (str): One of 'priority', 'status', 'user' or 'tag'
+            agg (str): One of 'count', 'sum' (story points) or 'mean' (story points)
+            mask (np.ndarray): Rows to include, from mask(); defaults to every task
+
+        Returns:
+            dict[str, float]: The aggregate for every group that has at least one task
+
+        Raises:
+            ValueError: Unknown key or aggregate
+        """
+        if key not in GROUP_KEYS:
+            raise ValueError(f"Cannot group by '{key}', expected one of {', '.join(GROUP_KEYS)}")
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}', expected one of {', '.join(AGGREGATES)}")
+        selected = self._alive[:self._size] if mask is None else mask
+        points = self._story_point[:self._size][selected]
+
+        if key == 'tag':
+            tags = self._tags[:self._size][selected]
+            labels = [str(tag) for tag in Tag]
+            in_group = [(tags & (1 << tag.value[0])) != 0 for tag in Tag]
+            counts = np.array([group.sum() for group in in_group])
+            sums = np.array([points[group].sum() for group in in_group])
+        else:
+            codes, labels = {
+                'priority': (self._priority, [str(priority) for priority in sorted(Priority, key=lambda p: p.value)]),
+                'status': (self._status, [status.value[1] for status in STATUSES]),
+                'user': (self._user, self.users),
+            }[key]
+            codes = codes[:self._size][selected]
+            counts = np.bincount(codes, minlength=len(labels))
+            sums = np.bincount(codes, weights=points, minlength=len(labels))
+
+        if agg == 'count':
+            values = counts
+        elif agg == 'sum':
+            values = sums
+        else:
+            values = sums / np.maximum(counts, 1)
+        return {label: float(value) for label, value, count in zip(labels, values, counts) if count}
+
+    def histogram(self, bins: int | Iterable[int] = None, mask: np.ndarray = None) -> tuple[list[int], list[float]]:
+        """Histogram of story points
+
+        Args:
+            bins (int | Iterable[int]): Number of bins or bin edges; defaults to one bin per story point value
+            mask (np.ndarray): Rows to include, from mask(); defaults to every task
+
+        Returns:
+            tuple[list[int], list[float]]: The count in each bin, and the bin edges
+        """
+        selected = self._alive[:self._size] if mask is None else mask
+        points = self._story_point[:self._size][selected]
+        if bins is None:
+            top = int(points.max()) if len(points) else 0
+            bins = np.arange(0, top + 2)
+        counts, edges = np.histogram(points, bins=bins)
+        return counts.tolist(), edges.tolist()
+
+    def _encode_user(self, username: str | None) -> int:
+        username = username or ''
+        code = self._user_codes.get(username)
+        if code is None:
+            code = self._user_codes[username] = len(self.users)
+            self.users.append(username)
+        return code
+
+    def _allocate(self, capacity: int):
+        self._id = np.zeros(capacity, dtype=np.int64)
+        self._story_point = np.zeros(capacity, dtype=np.int32)
+        self._priority = np.zeros(capacity, dtype=np.int8)
+        self._status = np.zeros(capacity, dtype=np.int8)
+        self._tags = np.zeros(capacity, dtype=np.uint8)
+        self._user = np.zeros(capacity, dtype=np.int32)
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    def _reserve(self, size: int):
+        capacity = len(self._id)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+            column[len(keep):self._size] = 0
+        self._size = len(keep)
+        self._index = {int(task_id): row for row, task_id in enumerate(self._id[:self._size])}
+
+
+def encode_priority(priority_tag: str | None) -> int:
+    """Convert a task's priority_tag to the value of its Priority
+
+    Args:
+        priority_tag (str | None): The priority_tag of a task (e.g. 'urgent')
+
+    Returns:
+        int: The Priority's value, Priority.UNSPECIFIED for unknown tags
+    """
+    priority = Priority.__members__.get((priority_tag or '').upper().replace('-', '_'), Priority.UNSPECIFIED)
+    return priority.value
+
+
+def encode_status(progress_tag: str | None) -> Status:
+    """Convert a task's progress_tag to its Status
+
+    Args:
+        progress_tag (str | None): The progress_tag of a task (e.g. 'in-progress')
+
+    Returns:
+        Status: The matching Status, Status.NOT_STARTED for unknown tags
+    """
+    return PROGRESS_TAG_STATUS.get(progress_tag, Status.NOT_STARTED)
+
+
+def _as_list(value) -> list:
+    if isinstance(value, (str, Priority, Status, Tag)):
+        return [value]
+    return list(value)
@@ -1,24 +1,230 @@
-from datetime import datetime
+import atexit
+import io
+import json
+import logging
+import math
+import os
+import random
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import wraps
 from zoneinfo import ZoneInfo
 
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
-from flask_bcrypt import generate_password_hash, check_password_hash
+import click
+from flask import (Flask, Response, render_template, request, jsonify, flash, redirect, url_for, session, g,
+                   has_request_context, stream_with_context)
+from flask_bcrypt import check_password_hash
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from jinja2 import FileSystemBytecodeCache
+import numpy as np
+from sqlalchemy import MetaData, case, delete, event, func, insert, inspect, or_, select, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker, undefer
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.schema import CreateTable
+
+from src.analytics.DuplicateIndex import DuplicateIndex
+from src.background.JobRunner import JobContext, JobRunner
+from src.analytics.Forecast import fixed_windows, forecast, sprint_velocities
+from src.analytics.TaskSnapshot import TaskSnapshot
+from src.database.Archive import archive_in_batches
+from src.database.Backup import create_backup, list_backups, restore_backup, rotate_backups, verify_backup
+from src.database.Replicas import (ReplicaSet, create_replica_engine, get_replica_path, refresh_replica,
+                                   write_heartbeat)
+from src.database.Sharding import ShardDirectory, split_database
+from src.database.Transfer import export_ndjson, import_ndjson, is_transferable
+from src.database.WriteQueue import WriteQueue
+from src.error_handling.CustomError import CustomError
+from src.project_management.Activity import Activity
+from src.project_management.Log import ActiveLog, InactiveLog
+from src.project_management.SprintPlanner import plan_sprints
+from src.request_handling.AdmissionControl import AdmissionState
+from src.request_handling.FragmentCache import FragmentCache, FragmentCacheExtension
+from src.request_handling.Profiler import (ProfileRing, ProfilerBusy, SamplingProfiler, SlowRequestWatchdog,
+                                           format_collapsed)
+from src.request_handling.StructuredLogging import JsonFormatter, start_queue_logging
+from src.project_management.Task import Priority, Status, Tag
+from src.user_management.IdentityCache import ROLE_ADMIN, ROLE_MEMBER, Identity, IdentityCache
+from src.user_management.Provisioning import hash_password, provision_users, read_users_csv
+
+
+class RoutingSession(Session):
+    """
+    Session that sends statements on per-project tables to the current project's shard when sharding is enabled, and
+    reads that may be served by a read replica (see can_read_from_replica) to one when replicas are configured.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and shard_directory is not None:
+            engine = shard_directory.route(get_current_project_id(), mapper=mapper, clause=clause)
+            if engine is not None:
+                return engine
+        if bind is None and replica_set is not None and can_read_from_replica(self, clause):
+            engine = choose_replica()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 # --- Configuration Class ---
 class Config:
     SECRET_KEY = 'secret key'  # Use a secure random key in production
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///sql_database.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI', 'sqlite:///sql_database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Write-behind mode: group commits from many requests into fewer transactions
+    WRITE_BEHIND = False
+    WRITE_BEHIND_MAX_BATCH_SIZE = 64
+    WRITE_BEHIND_MAX_LATENCY = 0.005  # seconds
+    # Completed tasks older than this are moved out of the live task table
+    ARCHIVE_AFTER_DAYS = 30
+    ARCHIVE_BATCH_SIZE = 500
+    # Sharding: keep each project's tables in its own SQLite file so projects don't share a writer lock
+    SHARDING = False
+    SHARD_DIRECTORY = None  # defaults to <instance folder>/shards
+    SHARD_IDLE_TIMEOUT = 300  # seconds
+    SHARDED_TABLES = ('task', 'task_change', 'task_counter', 'task_signature', 'archived_task', 'activity',
+                      'active_log', 'inactive_log')
+    DEFAULT_PROJECT_ID = 1
+    # How often the in-memory analytics snapshot catches up with the task change stream
+    ANALYTICS_REFRESH_INTERVAL = 5  # seconds
+    # Delivery forecasts: velocity is measured over the last FORECAST_HISTORY_SPRINTS sprints of SPRINT_LENGTH_DAYS
+    SPRINT_LENGTH_DAYS = 14
+    FORECAST_HISTORY_SPRINTS = 10
+    FORECAST_SIMULATIONS = 20000
+    FORECAST_MAX_SPRINTS = 520  # backlogs that would take longer at the current velocity are not forecast
+    # Near-duplicate detection: tasks whose estimated title and description similarity reaches this are suggested
+    DUPLICATE_THRESHOLD = 0.5
+    DUPLICATE_SUGGESTIONS = 5
+    # Board views receive task summaries, with the description cut to this many characters by the database
+    TASK_EXCERPT_LENGTH = 120
+    # How long a session's resolved user is reused before it is read from the database again. A change to a user made
+    # by another process (e.g. a revoked password) reaches this one within IDENTITY_VERSION_CHECK_INTERVAL seconds
+    IDENTITY_CACHE_TTL = 60  # seconds
+    IDENTITY_VERSION_CHECK_INTERVAL = 1  # seconds
+    BCRYPT_LOG_ROUNDS = 12
+    # The seeded administrator, also made an administrator when a user table from before roles existed is upgraded
+    ADMIN_USERNAME = 'admin'
+    # Bulk user provisioning: users inserted per transaction, and password hashing processes (None for one per CPU)
+    PROVISIONING_BATCH_SIZE = 500
+    PROVISIONING_PROCESSES = None
+    # Admission control on write routes: a token bucket per user and route, and a cap on concurrent writes. The state is
+    # shared by every worker process on the host through a small SQLite file
+    ADMISSION_CONTROL = False
+    ADMISSION_STATE_PATH = None  # defaults to <instance folder>/admission.db
+    RATE_LIMIT_PER_SECOND = 5.0
+    RATE_LIMIT_BURST = 20
+    RATE_LIMITS = {}  # per-endpoint (per_second, burst) overrides, e.g. {'batch_tasks': (0.5, 5)}
+    WRITE_CONCURRENCY_LIMIT = 8
+    WRITE_SLOT_LEASE = 30  # seconds before a slot held by a crashed worker is reclaimed
+    # Background jobs: worker threads per process, and how long a running job may go without reporting progress
+    # before a restarted process runs it again
+    JOB_WORKERS = 2
+    JOB_STALE_AFTER = 300  # seconds
+    # NDJSON import and export: rows per import transaction, and where export jobs write their files
+    IMPORT_BATCH_SIZE = 5000
+    EXPORT_DIRECTORY = None  # defaults to <instance folder>/exports
+    # Online backups through the SQLite backup API: pages copied per step and the pause between steps, how often a
+    # backup is scheduled (None to disable) and how many backups are kept
+    BACKUP_DIRECTORY = None  # defaults to <instance folder>/backups
+    BACKUP_PAGES_PER_STEP = 256
+    BACKUP_STEP_SLEEP = 0.01  # seconds
+    BACKUP_INTERVAL = None  # seconds
+    BACKUP_RETENTION = 7
+    # Compiled templates are kept on disk so that new workers skip compiling them; fragments marked with
+    # {% cache %} (the header per user role, the footer and the task forms) are rendered once per process
+    TEMPLATE_BYTECODE_CACHE = True
+    TEMPLATE_CACHE_DIRECTORY = None  # defaults to a per-user folder in the system temporary directory
+    TEMPLATE_FRAGMENT_CACHE = True  # ignored while templates are auto-reloaded, e.g. in debug mode
+    TEMPLATE_FRAGMENT_CACHE_SIZE = 1024
+    # Structured logging: one JSON line per request (request ID, route, user, status, duration and SQL statement count)
+    # plus the application's own log records, written by a background thread. Successful requests are sampled at
+    # LOG_SAMPLE_RATE, or per endpoint through LOG_SAMPLE_RATES, e.g. {'get_tasks': 0.01}; requests that fail or
+    # raise are always logged
+    REQUEST_LOGGING = True
+    LOG_FILE = None  # defaults to standard error
+    LOG_LEVEL = 'INFO'
+    LOG_SAMPLE_RATE = 1.0
+    LOG_SAMPLE_RATES = {}
+    LOG_QUEUE_SIZE = 10000  # records waiting to be written; further records are dropped rather than block requests
+    # Sampling profiler: admins can profile a live worker through /admin/profile. With PROFILE_SLOW_REQUESTS set, a
+    # request still running after that many seconds is profiled until it finishes (at most PROFILE_SLOW_DURATION
+    # seconds, then no other for PROFILE_COOLDOWN seconds); the last PROFILE_RING_SIZE profiles are kept on disk
+    PROFILE_SAMPLE_INTERVAL = 0.005  # seconds
+    PROFILE_MAX_DURATION = 60  # seconds
+    PROFILE_SLOW_REQUESTS = None  # seconds
+    PROFILE_SLOW_DURATION = 5  # seconds
+    PROFILE_COOLDOWN = 60  # seconds
+    PROFILE_DIRECTORY = None  # defaults to <instance folder>/profiles
+    PROFILE_RING_SIZE = 20
+    # Read replicas: queries made by GET requests (and by routes marked with reads_from_replica) go to a replica at most
+    # REPLICA_MAX_LAG seconds behind the primary; writes, everything after a write in the same request, and reads by a
+    # session within REPLICA_READ_YOUR_WRITES seconds of its last write (until a replica has caught up) go to the
+    # primary, as does everything when no replica is usable. SQLite file replicas are refreshed from the primary with
+    # the backup API every REPLICA_REFRESH_INTERVAL seconds; other replicas only receive the heartbeat that measures
+    # their lag, and must be kept up to date by the database's own replication
+    READ_REPLICAS = []  # database URIs, e.g. ['sqlite:////var/lib/silicon/replica_1.db']
+    REPLICA_MAX_LAG = 10  # seconds
+    REPLICA_REFRESH_INTERVAL = 2  # seconds
+    REPLICA_CHECK_INTERVAL = 1  # seconds between reads of a replica's heartbeat
+    REPLICA_READ_YOUR_WRITES = 30  # seconds
 
 
 # --- Create Database Models ---
+# Priority.value of a task's priority_tag, computed by the database so that tasks sort by urgency rather than by name
+PRIORITY_ORDINAL = 'CASE lower(priority_tag) {} ELSE {} END'.format(
+    ' '.join(f"WHEN '{priority.name.lower().replace('_', '-')}' THEN {priority.value}" for priority in Priority),
+    Priority.UNSPECIFIED.value
+)
+NOT_STARTED_TAG = 'not-started'
+BOARD_COLUMNS = (NOT_STARTED_TAG, 'in-progress', 'completed')
+
+
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
+    # Only loaded when first accessed (or with undefer), since board views only need an excerpt
+    description = db.deferred(db.Column(db.String(1000), nullable=False))
+    story_point = db.Column(db.Integer, nullable=False)
+    development_bit_vector = db.Column(db.String(5), nullable=False)
+    priority_tag = db.Column(db.String(9), nullable=False)
+    progress_tag = db.Column(db.String(11), nullable=False)
+    user = db.Column(db.String(15), nullable=False)
+    created_at = db.Column(db.String(100), nullable=False)
+    project_id = db.Column(db.Integer, nullable=False, default=lambda: app.config['DEFAULT_PROJECT_ID'])
+    sprint_id = db.Column(db.Integer, nullable=True, default=None, index=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    completed_at = db.Column(db.DateTime, nullable=True, default=None, index=True)
+    priority = db.Column(db.Integer, db.Computed(PRIORITY_ORDINAL))
+
+    # Each next-tasks query is answered by walking one of these in order and stopping after K entries. IDs are never
+    # reused (AUTOINCREMENT), since an archived task keeps its ID in the archive table
+    __table_args__ = (
+        db.Index('ix_task_next', 'progress_tag', priority.desc(), 'story_point', 'id'),
+        db.Index('ix_task_next_user', 'progress_tag', 'user', priority.desc(), 'story_point', 'id'),
+        db.Index('ix_task_next_sprint', 'progress_tag', 'sprint_id', priority.desc(), 'story_point', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    # Every UPDATE is issued as 'UPDATE ... WHERE id = ? AND version = ?', so concurrent edits are detected instead of
+    # silently overwriting each other
+    __mapper_args__ = {'version_id_col': version}
+
+
+class ArchivedTask(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(1000), nullable=False)
     story_point = db.Column(db.Integer, nullable=False)
     development_bit_vector = db.Column(db.String(5), nullable=False)
@@ -26,12 +232,230 @@ class Task(db.Model):
     progress_tag = db.Column(db.String(11), nullable=False)
     user = db.Column(db.String(15), nullable=False)
     created_at = db.Column(db.String(100), nullable=False)
+    project_id = db.Column(db.Integer, nullable=False)
+    sprint_id = db.Column(db.Integer, nullable=True)
+    version = db.Column(db.Integer, nullable=False)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+COMPLETED_TAG = 'completed'
+
+
+@db.event.listens_for(Task.progress_tag, 'set', active_history=True)
+def track_task_completion(task, value, old_value, initiator):
+    """
+    Record when a task is moved to completed, and clear it when the task is reopened.
+    """
+    if value != COMPLETED_TAG:
+        task.completed_at = None
+    elif old_value != COMPLETED_TAG:
+        task.completed_at = datetime.now()
+
+
+class TaskChange(db.Model):
+    seq = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(6), nullable=False)
+
+
+# Every write to the task table, whichever path it takes (ORM, bulk, write queue or archive), is appended to the
+# task_change stream by the database itself, in the same transaction
+TASK_CHANGE_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS task_change_{op} AFTER {op.upper()} ON task "
+    f"BEGIN INSERT INTO task_change (task_id, op) VALUES ({row}.id, '{op}'); END"
+    for op, row in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD'))
+]
+
+
+class TaskCounter(db.Model):
+    progress_tag = db.Column(db.String(11), primary_key=True)
+    sprint_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 for tasks that are not in a sprint
+    task_count = db.Column(db.Integer, nullable=False, default=0)
+    story_points = db.Column(db.Integer, nullable=False, default=0)
+
+
+def get_task_counter_upsert(row: str, sign: str) -> str:
+    return (
+        f"INSERT INTO task_counter (progress_tag, sprint_id, task_count, story_points) "
+        f"VALUES ({row}.progress_tag, coalesce({row}.sprint_id, 0), {sign}1, {sign}{row}.story_point) "
+        f"ON CONFLICT (progress_tag, sprint_id) DO UPDATE SET task_count = task_count + excluded.task_count, "
+        f"story_points = story_points + excluded.story_points;"
+    )
+
+
+# The task counts and story point totals per progress tag and sprint are kept up to date by the database, in the same
+# transaction as the task write
+TASK_COUNTER_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS task_counter_insert AFTER INSERT ON task "
+    f"BEGIN {get_task_counter_upsert('NEW', '+')} END",
+    f"CREATE TRIGGER IF NOT EXISTS task_counter_update AFTER UPDATE OF progress_tag, sprint_id, story_point ON task "
+    f"BEGIN {get_task_counter_upsert('OLD', '-')} {get_task_counter_upsert('NEW', '+')} END",
+    f"CREATE TRIGGER IF NOT EXISTS task_counter_delete AFTER DELETE ON task "
+    f"BEGIN {get_task_counter_upsert('OLD', '-')} END",
+]
+TASK_TRIGGERS = {'task_change': TASK_CHANGE_TRIGGERS, 'task_counter': TASK_COUNTER_TRIGGERS}
+
+
+def get_task_counter_rebuild():
+    """
+    Build the statement that fills task_counter from the task table. It names both tables, so a session sends it to the
+    current project's shard when sharding is enabled.
+    """
+    sprint_id = func.coalesce(Task.sprint_id, 0)
+    return insert(TaskCounter).from_select(
+        ['progress_tag', 'sprint_id', 'task_count', 'story_points'],
+        select(Task.progress_tag, sprint_id, func.count(), func.coalesce(func.sum(Task.story_point), 0))
+        .group_by(Task.progress_tag, sprint_id)
+    )
+
+
+@db.event.listens_for(db.metadata, 'after_create')
+def upgrade_task_columns(metadata, connection, **kwargs):
+    """
+    Add the columns a task table created by an earlier version lacks, with the values new tasks get by default:
+    project_id (DEFAULT_PROJECT_ID), version (1), and sprint_id and completed_at (NULL, i.e. not in a sprint and with no
+    recorded completion time). Indexes whose columns all exist are created too.
+
+    The computed priority column cannot be added to an existing SQLite table; upgrade_task_ids rebuilds the table for
+    it.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table('task'):
+        return
+    existing = {column['name'] for column in inspector.get_columns('task')}
+    project_id = int(app.config['DEFAULT_PROJECT_ID'])
+    definitions = {
+        'project_id': f'INTEGER NOT NULL DEFAULT {project_id}',
+        'sprint_id': 'INTEGER',
+        'version': 'INTEGER NOT NULL DEFAULT 1',
+        'completed_at': 'DATETIME',
+    }
+    for name, definition in definitions.items():
+        if name not in existing:
+            connection.exec_driver_sql(f'ALTER TABLE task ADD COLUMN {name} {definition}')
+            existing.add(name)
+    for index in Task.__table__.indexes:
+        if all(column.name in existing for column in index.columns):
+            index.create(connection, checkfirst=True)
+
+
+@db.event.listens_for(db.metadata, 'after_create')
+def upgrade_task_ids(metadata, connection, **kwargs):
+    """
+    Rebuild a task table created without AUTOINCREMENT, whose IDs SQLite reuses after the highest task is archived, or
+    without the computed priority column, which SQLite cannot add to an existing table. Then make sure new task IDs
+    start above every archived task's ID.
+
+    Runs before create_task_triggers, which installs the triggers again on the rebuilt table.
+    """
+    inspector = inspect(connection)
+    if connection.dialect.name != 'sqlite' or not inspector.has_table('task'):
+        return
+    table = Task.__table__
+    task_sql = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'task'")
+    existing = {column['name'] for column in inspector.get_columns('task')}
+    computed = {column.name for column in table.columns if column.computed is not None}
+    if 'AUTOINCREMENT' not in task_sql.scalar().upper() or not computed <= existing:
+        rebuilt = table.to_metadata(MetaData(), name='task_autoincrement')
+        # computed columns are derived by the database and cannot be inserted; columns the old table lacks get the
+        # value new tasks get by default
+        columns = [column.name for column in table.columns if column.computed is None]
+        missing = {'project_id': str(int(app.config['DEFAULT_PROJECT_ID'])), 'version': '1'}
+        names = ', '.join(f'"{name}"' for name in columns)
+        values = ', '.join(f'"{name}"' if name in existing else missing.get(name, 'NULL') for name in columns)
+        connection.execute(CreateTable(rebuilt))
+        connection.exec_driver_sql(f'INSERT INTO task_autoincrement ({names}) SELECT {values} FROM task')
+        connection.exec_driver_sql('DROP TABLE task')  # drops its indexes and triggers too
+        connection.exec_driver_sql('ALTER TABLE task_autoincrement RENAME TO task')
+        for index in table.indexes:
+            index.create(connection)
+    if inspector.has_table('archived_task'):
+        highest = connection.scalar(select(func.coalesce(func.max(ArchivedTask.id), 0)))
+        sequence = connection.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'task'").scalar()
+        if sequence is None:
+            connection.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('task', ?)", (highest,))
+        elif sequence < highest:
+            connection.exec_driver_sql("UPDATE sqlite_sequence SET seq = ? WHERE name = 'task'", (highest,))
+
+
+@db.event.listens_for(db.metadata, 'after_create')
+def create_task_triggers(metadata, connection, **kwargs):
+    """
+    Install the task triggers in any database that holds the task table and the table they maintain.
+
+    Counters are seeded from the existing tasks when the task_counter table is still empty.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table('task'):
+        return
+    for table, triggers in TASK_TRIGGERS.items():
+        if inspector.has_table(table):
+            for trigger in triggers:
+                connection.exec_driver_sql(trigger)
+    if inspector.has_table('task_counter') and connection.scalar(select(func.count()).select_from(TaskCounter)) == 0:
+        connection.execute(get_task_counter_rebuild())
+
+
+class TaskSignature(db.Model):
+    task_id = db.Column(db.Integer, primary_key=True)
+    seq = db.Column(db.Integer, nullable=False)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    dedup_key = db.Column(db.String(500), nullable=False)
+    params = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(10), nullable=False, index=True)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    project_id = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+    # At most one active job per kind and deduplication key, enforced by the database across processes
+    __table_args__ = (
+        db.Index('ux_job_active', 'kind', 'dedup_key', unique=True,
+                 sqlite_where=db.text("status IN ('queued', 'running')")),
+    )
 
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(15), unique=True, nullable=False)
     password = db.Column(db.String(150), nullable=False)
+    role = db.Column(db.String(15), nullable=False, default=ROLE_MEMBER)
+
+
+@db.event.listens_for(db.metadata, 'after_create')
+def upgrade_user_roles(metadata, connection, **kwargs):
+    """
+    Add the role column to a user table created before roles existed. Existing users become members, except
+    ADMIN_USERNAME, who is made an administrator since seeding skips usernames that already exist.
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table('user') or 'role' in {column['name'] for column in inspector.get_columns('user')}:
+        return
+    connection.exec_driver_sql(f"ALTER TABLE user ADD COLUMN role VARCHAR(15) NOT NULL DEFAULT '{ROLE_MEMBER}'")
+    connection.execute(update(User).where(User.username == app.config['ADMIN_USERNAME']).values(role=ROLE_ADMIN))
+
+
+class IdentityVersion(db.Model):
+    # A single row, bumped whenever a user is changed; every process drops its cached identities when it moves
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+
+
+class ReplicaHeartbeat(db.Model):
+    # A single row, updated on the primary by refresh_replicas; a replica's copy of it tells how far behind it is
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.Float, nullable=False)
 
 
 # --- Initialise App ---
@@ -39,27 +463,168 @@ app = Flask(__name__)
 app.config.from_object(Config)
 db.init_app(app)
 
+app.jinja_env.add_extension(FragmentCacheExtension)
+if app.config['TEMPLATE_BYTECODE_CACHE']:
+    if app.config['TEMPLATE_CACHE_DIRECTORY']:
+        os.makedirs(app.config['TEMPLATE_CACHE_DIRECTORY'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['TEMPLATE_CACHE_DIRECTORY'])
+if app.config['TEMPLATE_FRAGMENT_CACHE'] and not app.jinja_env.auto_reload:
+    app.jinja_env.fragment_cache = FragmentCache(app.config['TEMPLATE_FRAGMENT_CACHE_SIZE'])
+
 with app.app_context():
+    shard_directory = None
+    if app.config['SHARDING']:
+        shard_directory = ShardDirectory(
+            app.config['SHARD_DIRECTORY'] or os.path.join(app.instance_path, 'shards'),
+            db.metadata,
+            app.config['SHARDED_TABLES'],
+            idle_timeout=app.config['SHARD_IDLE_TIMEOUT']
+        )
+
+    replica_set = None
+    if app.config['READ_REPLICAS']:
+        replica_set = ReplicaSet(
+            [create_replica_engine(uri) for uri in app.config['READ_REPLICAS']],
+            max_lag=app.config['REPLICA_MAX_LAG'],
+            check_interval=app.config['REPLICA_CHECK_INTERVAL']
+        )
+
     db.create_all()  # Create all tables defined in the models
-    usernames = ['admin', 'Alicia', 'Ryani', 'Abi', 'Thisangi', 'Jaimee', 'Xin']
+    usernames = [app.config['ADMIN_USERNAME'], 'Alicia', 'Ryani', 'Abi', 'Thisangi', 'Jaimee', 'Xin']
+    seed_users = [{'username': username, 'password': '123',
+                   'role': ROLE_ADMIN if username == app.config['ADMIN_USERNAME'] else ROLE_MEMBER}
+                  for username in usernames]
+    # hashed in this process: a handful of seed users is not worth starting a process pool for on import
+    for _ in provision_users(db.session, User, seed_users, rounds=app.config['BCRYPT_LOG_ROUNDS'], processes=1):
+        pass
+
+    write_queue = None
+    if app.config['WRITE_BEHIND'] and not app.config['SHARDING']:
+        write_queue = WriteQueue(
+            sessionmaker(bind=db.engine, expire_on_commit=False),
+            max_batch_size=app.config['WRITE_BEHIND_MAX_BATCH_SIZE'],
+            max_latency=app.config['WRITE_BEHIND_MAX_LATENCY']
+        )
+    shard_write_queues: dict[int, WriteQueue] = {}
 
-    for username in usernames:
-        existing_user = User.query.filter_by(username=username).first()
-        if not existing_user:
-            new_user = User(username=username, password=generate_password_hash('123').decode('utf-8'))
-            db.session.add(new_user)
-    db.session.commit()
+    job_runner = JobRunner(
+        sessionmaker(bind=db.engine, expire_on_commit=False),
+        Job,
+        max_workers=app.config['JOB_WORKERS'],
+        stale_after=app.config['JOB_STALE_AFTER']
+    )
+
+
+# --- Projects ---
+def get_current_project_id() -> int:
+    """
+    Retrieve the ID of the project the current request works on.
+
+    The project is taken from g.project_id (set by commands and background work), the 'project' query parameter, the
+    X-Project-Id header or the session, in that order, falling back to DEFAULT_PROJECT_ID.
+
+    Returns:
+        int: The current project ID.
+    """
+    if g and g.get('project_id') is not None:
+        return g.project_id
+    if has_request_context():
+        project_id = (request.args.get('project', type=int) or request.headers.get('X-Project-Id', type=int)
+                      or session.get('project_id'))
+        if project_id is not None:
+            return project_id
+    return app.config['DEFAULT_PROJECT_ID']
+
+
+def get_write_queue() -> WriteQueue | None:
+    """
+    Retrieve the write queue for the current project.
+
+    With sharding enabled each project's shard gets its own write queue, since a group commit can only cover one
+    database file.
+
+    Returns:
+        WriteQueue | None: The write queue, or None if write-behind mode is disabled.
+    """
+    if shard_directory is None or not app.config['WRITE_BEHIND']:
+        return write_queue
+    project_id = get_current_project_id()
+    if project_id not in shard_write_queues:
+        shard_engine = shard_directory.engine_for(project_id)
+        shard_write_queues.setdefault(project_id, WriteQueue(
+            sessionmaker(bind=db.engine, binds={table: shard_engine for table in shard_directory.tables},
+                         expire_on_commit=False),
+            max_batch_size=app.config['WRITE_BEHIND_MAX_BATCH_SIZE'],
+            max_latency=app.config['WRITE_BEHIND_MAX_LATENCY']
+        ))
+    return shard_write_queues[project_id]
 
 
 # --- User management ---
+def get_identity_version() -> int:
+    """
+    Read the identity version shared by every process, from the primary since a replica may not have the latest bump.
+
+    Returns:
+        int: The version, 0 if no user has been changed yet.
+    """
+    with primary_reads():
+        return db.session.scalar(select(IdentityVersion.version).where(IdentityVersion.id == 1)) or 0
+
+
+def bump_identity_version() -> None:
+    """
+    Tell every process to resolve its sessions' identities again, after users were changed. Commits the session.
+    """
+    statement = sqlite_insert(IdentityVersion).values(id=1, version=1)
+    db.session.execute(statement.on_conflict_do_update(index_elements=['id'],
+                                                       set_={'version': IdentityVersion.version + 1}))
+    db.session.commit()
+
+
+identity_cache = IdentityCache(ttl=app.config['IDENTITY_CACHE_TTL'], get_version=get_identity_version,
+                               check_interval=app.config['IDENTITY_VERSION_CHECK_INTERVAL'])
+
+
+def get_current_identity() -> Identity | None:
+    """
+    Resolve the logged-in user of the current request.
+
+    The identity is resolved at most once per request (kept in g) and cached across requests by session ID, so most
+    requests do not query the user table at all.
+
+    Returns:
+        Identity: The current user's identity, or None if no user is logged in or the user no longer exists.
+    """
+    if 'identity' in g:
+        return g.identity
+    identity = None
+    if 'user_id' in session or 'username' in session:
+        session_id = session.get('session_id')
+        identity = identity_cache.get(session_id) if session_id else None
+        if identity is None:
+            if 'user_id' in session:
+                user = db.session.get(User, session['user_id'])
+            else:
+                user = User.query.filter_by(username=session['username']).first()
+            if user:
+                identity = Identity(user.id, user.username, user.role)
+                if not session_id:
+                    session_id = session['session_id'] = secrets.token_urlsafe()
+                identity_cache.put(session_id, identity)
+    g.identity = identity
+    return identity
+
+
 def get_current_user():
     """
-    Retrieve the currently logged-in user from the session.
+    Retrieve the currently logged-in user.
 
     Returns:
         str: Username of the current user, or None if no user is logged in.
     """
-    return session.get('username')
+    identity = get_current_identity()
+    return identity.username if identity else None
 
 
 def is_logged_in():
@@ -67,9 +632,9 @@ def is_logged_in():
     Check if a user is currently logged in.
 
     Returns:
-        Redirects to login page if not logged in.
+        bool: True if a user is logged in, otherwise False.
     """
-    return 'username' in session
+    return get_current_identity() is not None
 
 
 def is_admin():
@@ -77,9 +642,118 @@ def is_admin():
     Check if the current user is an administrator.
 
     Returns:
-        bool: True if the current user is 'admin', otherwise False.
+        bool: True if the current user has the admin role, otherwise False.
+    """
+    identity = get_current_identity()
+    return identity is not None and identity.is_admin
+
+
+def login_required(role: str = None):
+    """
+    Decorate a route so that it is only served to logged-in users, optionally with a given role.
+
+    Other requests are redirected to the login page.
+
+    Args:
+        role (str): The role required (e.g. ROLE_ADMIN), or None for any logged-in user.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            identity = get_current_identity()
+            if identity is None or not identity.has_role(role):
+                return redirect(url_for('login'))
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def invalidate_user_sessions(user: User) -> None:
+    """
+    Drop the cached identities of a user, e.g. after their username or password changed, in this process straight away
+    and in the others through the shared identity version.
+
+    Args:
+        user (User): The user whose sessions must be resolved again.
+    """
+    identity_cache.invalidate_user(user.id)
+    bump_identity_version()
+    if g.get('identity') is not None and g.identity.user_id == user.id:
+        g.pop('identity')
+
+
+@app.context_processor
+def inject_identity():
+    return {'identity': get_current_identity() if has_request_context() else None}
+
+
+# --- Admission Control ---
+admission_state: AdmissionState | None = None
+admission_state_lock = threading.Lock()
+
+
+def get_admission_state() -> AdmissionState:
+    """
+    Retrieve the admission control state shared by the worker processes, opening it on first use.
+
+    Returns:
+        AdmissionState: The shared state.
+    """
+    global admission_state
+    with admission_state_lock:
+        if admission_state is None:
+            admission_state = AdmissionState(
+                app.config['ADMISSION_STATE_PATH'] or os.path.join(app.instance_path, 'admission.db')
+            )
+        return admission_state
+
+
+def reject(message: str, status: int, retry_after: float):
+    response = jsonify({'error': message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def admission_controlled(view):
+    """
+    Decorate a write route so that it is rejected straight away, rather than queued, when its caller exceeds their rate
+    limit (429) or too many writes are already running (503). Both carry a Retry-After header, and every rejection is
+    counted in the shared metrics.
+
+    Callers are identified by username, or by address when not logged in.
     """
-    return get_current_user() == 'admin'
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not app.config['ADMISSION_CONTROL']:
+            return view(*args, **kwargs)
+        state = get_admission_state()
+        caller = get_current_user() or request.remote_addr
+        per_second, burst = app.config['RATE_LIMITS'].get(
+            request.endpoint, (app.config['RATE_LIMIT_PER_SECOND'], app.config['RATE_LIMIT_BURST'])
+        )
+        wait = state.take_token(f'{request.endpoint}:{caller}', per_second, burst)
+        if wait:
+            state.count(f'rejected.rate_limit.{request.endpoint}')
+            return reject('Too many requests', 429, wait)
+
+        slot = state.acquire_slot('write', app.config['WRITE_CONCURRENCY_LIMIT'], lease=app.config['WRITE_SLOT_LEASE'])
+        if slot is None:
+            state.count(f'rejected.concurrency.{request.endpoint}')
+            return reject('Server is busy', 503, 1)
+        streamed = False
+        try:
+            response = view(*args, **kwargs)
+            # a streamed response (imports, provisioning) does its writing after the view returns, so its slot is
+            # held until the response has been sent or abandoned
+            streamed = isinstance(response, Response) and response.is_streamed
+            if streamed:
+                response.call_on_close(lambda: state.release_slot(slot))
+            return response
+        finally:
+            if not streamed:
+                state.release_slot(slot)
+    return wrapper
 
 
 def check_user_exists(user: str) -> bool:
@@ -95,6 +769,247 @@ def check_user_exists(user: str) -> bool:
     return User.query.filter_by(username=user).first() is not None
 
 
+# --- Request Logging ---
+request_logger = logging.getLogger('silicon.request')
+log_listener, log_handler = None, None
+if app.config['REQUEST_LOGGING']:
+    log_output = logging.FileHandler(app.config['LOG_FILE']) if app.config['LOG_FILE'] else logging.StreamHandler(
+        sys.stderr)
+    log_output.setFormatter(JsonFormatter())
+    log_listener, log_handler = start_queue_logging([request_logger, app.logger], log_output,
+                                                    max_queue=app.config['LOG_QUEUE_SIZE'])
+    request_logger.setLevel(app.config['LOG_LEVEL'])
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    atexit.register(log_listener.stop)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+
+
+@app.before_request
+def start_request_log():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+
+
+@app.after_request
+def tag_response(response):
+    response.headers['X-Request-ID'] = g.request_id
+    g.response_status = response.status_code
+    return response
+
+
+def record_request_error(error: Exception):
+    """
+    Attach an exception that a route handled itself (e.g. by returning a 500 response) to the request's log line.
+
+    Args:
+        error (Exception): The exception that was handled.
+    """
+    g.request_error = error
+
+
+@app.teardown_request
+def log_request(exception=None):
+    """
+    Log the finished request as one structured record. Successful requests are sampled; requests that failed or raised
+    are always logged, with the error code of a CustomError.
+    """
+    if log_listener is None or 'request_started' not in g:
+        return
+    error = exception or g.get('request_error')
+    status = g.get('response_status', 500)
+    if error is None and status < 400:
+        rate = app.config['LOG_SAMPLE_RATES'].get(request.endpoint, app.config['LOG_SAMPLE_RATE'])
+        if rate < 1 and random.random() >= rate:
+            return
+
+    identity = g.get('identity')
+    fields = {
+        'request_id': g.request_id,
+        'method': request.method,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'endpoint': request.endpoint,
+        'user': identity.username if identity else session.get('username'),
+        'status': status,
+        'duration_ms': round((time.perf_counter() - g.request_started) * 1000, 3),
+        'sql_count': g.sql_count,
+    }
+    if isinstance(error, CustomError):
+        fields.update(error_code=str(error.ID), error=error.message)
+    elif error is not None:
+        fields['error'] = str(error)
+    level = logging.ERROR if error is not None or status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+    request_logger.log(level, '%s %s %s', request.method, request.path, status, extra={'fields': fields},
+                       exc_info=(type(error), error, error.__traceback__) if error is not None else None)
+
+
+# --- Profiling ---
+profiler = SamplingProfiler(app.config['PROFILE_SAMPLE_INTERVAL'])
+profile_ring: ProfileRing | None = None
+slow_request_watchdog: SlowRequestWatchdog | None = None
+
+
+def get_profile_ring() -> ProfileRing:
+    """
+    Retrieve the ring of stored profiles, creating its directory on first use.
+    """
+    global profile_ring
+    if profile_ring is None:
+        profile_ring = ProfileRing(app.config['PROFILE_DIRECTORY'] or os.path.join(app.instance_path, 'profiles'),
+                                   app.config['PROFILE_RING_SIZE'])
+    return profile_ring
+
+
+if app.config['PROFILE_SLOW_REQUESTS']:
+    slow_request_watchdog = SlowRequestWatchdog(
+        profiler,
+        get_profile_ring(),
+        app.config['PROFILE_SLOW_REQUESTS'],
+        duration=app.config['PROFILE_SLOW_DURATION'],
+        cooldown=app.config['PROFILE_COOLDOWN']
+    )
+
+
+@app.before_request
+def track_slow_request():
+    if slow_request_watchdog is not None:
+        slow_request_watchdog.track(request.endpoint or request.path)
+
+
+@app.teardown_request
+def untrack_slow_request(exception=None):
+    if slow_request_watchdog is not None:
+        slow_request_watchdog.untrack()
+
+
+# --- Read Replicas ---
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def reads_from_replica(view):
+    """
+    Decorate a route that only reads but is not a GET request, such as a form post that looks a record up, so that its
+    queries may go to a read replica.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """
+    Send the reads made inside the block to the primary, e.g. to make sure a record missing from a replica was not
+    created since the replica was refreshed.
+    """
+    previous = g.get('primary_reads', False)
+    g.primary_reads = True
+    try:
+        yield
+    finally:
+        g.primary_reads = previous
+
+
+def can_read_from_replica(db_session: Session, clause) -> bool:
+    """
+    Decide whether a statement may go to a read replica: it must be a plain SELECT (not SELECT ... FOR UPDATE) made
+    while handling a GET request or a route marked with reads_from_replica, outside a flush, and before the request has
+    written anything.
+
+    Args:
+        db_session (Session): The session executing the statement.
+        clause: The statement, or None when the session asks for a connection without one.
+
+    Returns:
+        bool: True if the statement may be read from a replica.
+    """
+    if clause is None or not getattr(clause, 'is_select', False) or getattr(clause, '_for_update_arg', None):
+        return False
+    if not has_request_context() or db_session._flushing or g.get('db_wrote') or g.get('primary_reads'):
+        return False
+    return request.method in SAFE_METHODS or g.get('replica_reads', False)
+
+
+def choose_replica() -> Engine | None:
+    """
+    Choose the replica for a read of the current request. Within REPLICA_READ_YOUR_WRITES seconds of the session's last
+    write, only a replica refreshed after that write is chosen, so a user always sees their own changes.
+
+    Returns:
+        Engine | None: The replica engine, or None if the read should go to the primary.
+    """
+    last_write = session.get('last_write_at')
+    if last_write is not None and time.time() - last_write < app.config['REPLICA_READ_YOUR_WRITES']:
+        return replica_set.choose(since=last_write)
+    return replica_set.choose()
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def mark_flush_written(db_session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def mark_statement_written(orm_execute_state):
+    if has_request_context() and not orm_execute_state.is_select:
+        g.db_wrote = True
+
+
+@app.after_request
+def remember_last_write(response):
+    """
+    Record when the session last wrote: after any request that is not a GET (unless marked with reads_from_replica),
+    and after a GET request that wrote.
+    """
+    if replica_set is not None and (g.get('db_wrote') or
+                                    request.method not in SAFE_METHODS and not g.get('replica_reads')):
+        session['last_write_at'] = time.time()
+    return response
+
+
+def refresh_replicas() -> dict | None:
+    """
+    Write the heartbeat on the primary, then copy the primary over every SQLite file replica with the backup API.
+
+    Nothing is done if another process refreshed the replicas less than REPLICA_REFRESH_INTERVAL seconds ago, so
+    several worker processes do not each copy the database.
+
+    Returns:
+        dict | None: The copy statistics of each SQLite replica by path, or None if the refresh was skipped.
+    """
+    if write_heartbeat(db.engine, min_interval=app.config['REPLICA_REFRESH_INTERVAL'] * 0.9) is None:
+        return None
+    primary = db.engine.url.database
+    return {path: refresh_replica(primary, path)
+            for path in map(get_replica_path, app.config['READ_REPLICAS']) if path is not None}
+
+
+def schedule_replica_refresh(interval: float) -> None:
+    """
+    Refresh the replicas every interval seconds. Runs forever on its own thread.
+    """
+    while True:
+        with app.app_context():
+            try:
+                refresh_replicas()
+            except Exception:
+                app.logger.exception('Replica refresh failed')
+        time.sleep(interval)
+
+
+if replica_set is not None and app.config['REPLICA_REFRESH_INTERVAL']:
+    threading.Thread(target=schedule_replica_refresh, args=(app.config['REPLICA_REFRESH_INTERVAL'],),
+                     name='replica-refresh', daemon=True).start()
+
+
 # --- Flash and Redirect
 def flash_and_redirect(message, category, redirect_page):
     """
@@ -112,139 +1027,1172 @@ def flash_and_redirect(message, category, redirect_page):
     return redirect(url_for(redirect_page))
 
 
-# --- Time Handling ---
-def get_aest_time():
+# --- Time Handling ---
+def get_aest_time():
+    """
+    Get the current time in the Australia/Melbourne timezone, formatted as:
+    'Full weekday name, day of the month, full month name, hour:minute AM/PM'.
+
+    Example:
+        Sunday 20 October, 09:15 PM
+
+    Returns:
+        str: The formatted current date and time in AEST.
+    """
+    return datetime.now(ZoneInfo('Australia/Melbourne')).strftime('%A %d %B, %I:%M %p')
+
+
+# --- Database ---
+def add_to_db(instance) -> None:
+    """
+    Add an instance to the database session and commit the changes.
+
+    In write-behind mode the insert is committed by the write queue, and this returns once it is durable.
+
+    Args:
+        instance (db.Model): The model instance to add and commit.
+    """
+    queue = get_write_queue()
+    if queue:
+        queue.submit(lambda writer_session: writer_session.add(instance)).result()
+        return
+    db.session.add(instance)
+    db.session.commit()
+
+
+def delete_from_db(instance):
+    """
+    Delete a model instance from the database and commit the changes.
+
+    In write-behind mode the delete is committed by the write queue, and this returns once it is durable.
+
+    Args:
+        instance (db.Model): The model instance to delete.
+    """
+    queue = get_write_queue()
+    if queue:
+        model, identity = type(instance), db.inspect(instance).identity
+
+        def delete_instance(writer_session):
+            row = writer_session.get(model, identity)
+            if row is not None:
+                writer_session.delete(row)
+
+        queue.submit(delete_instance).result()
+        db.session.expunge(instance)
+        return
+    db.session.delete(instance)
+    db.session.commit()
+
+
+def get_model_instance(model, **kwargs):
+    """
+    Retrieve the first instance of a model that matches the given filter criteria.
+
+    Args:
+        model (db.Model): The SQLAlchemy model to query.
+        **kwargs: Column-value pairs to filter by (e.g., username='admin').
+
+    Returns:
+        db.Model: The first matching model instance, or None if no match is found.
+    """
+    return model.query.filter_by(**kwargs).first()
+
+
+def update_model_instance(instance, data: dict):
+    """
+    Update a model instance with the provided data.
+
+    Args:
+        instance (db.Model): The model instance to update.
+        data (dict): A dictionary of attributes to update (e.g., {'title': 'New Title'}), already filtered down to the
+            fields the client may write (see get_editable_fields).
+
+    Raises:
+        StaleDataError: The row was changed by someone else since the instance was loaded.
+    """
+    changes = {key: value for key, value in data.items() if hasattr(instance, key)}
+    queue = get_write_queue()
+    if queue and changes:
+        if isinstance(instance, Task):
+            changes.update(get_completion_changes(changes))
+        queue.submit(get_conditional_update(instance, changes)).result()
+        # discard the stale in-memory state so the next read sees the committed row
+        db.session.expire(instance)
+        return
+
+    for key, value in changes.items():
+        setattr(instance, key, value)
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        raise
+
+
+def get_conditional_update(instance, changes: dict):
+    """
+    Build a unit of work for the write queue that applies changes to the row behind an instance.
+
+    The UPDATE matches the instance's primary key and, if the model is versioned, the version the instance was loaded
+    at, so a concurrent edit is detected exactly as it is on the direct path.
+
+    Args:
+        instance (db.Model): The loaded model instance to update.
+        changes (dict): Column-value pairs to write.
+
+    Returns:
+        Callable[[Session], None]: Function that performs the update with the session it is given.
+
+    Raises:
+        StaleDataError: (When called) the row was changed or deleted since the instance was loaded.
+    """
+    mapper = db.inspect(instance).mapper
+    statement = update(mapper.class_).where(
+        *[column == value for column, value in zip(mapper.primary_key, mapper.primary_key_from_instance(instance))]
+    )
+    if mapper.version_id_col is not None:
+        version_column = mapper.version_id_col
+        current_version = mapper.get_property_by_column(version_column).key
+        statement = statement.where(version_column == getattr(instance, current_version))
+        changes = {**changes, current_version: version_column + 1}
+    statement = statement.values(**changes).execution_options(synchronize_session=False)
+
+    def conditional_update(writer_session):
+        if writer_session.execute(statement).rowcount != 1:
+            raise StaleDataError(f'{mapper.class_.__name__} has been modified')
+
+    return conditional_update
+
+
+# --- Task Management ---
+def validate_task_data(data: dict) -> tuple[bool, str]:
+    """
+    Validate task data for required fields.
+
+    Args:
+        data (dict): Task data from the request.
+
+    Returns:
+        tuple[bool, str]: (True, "") if valid; (False, "Error message") if invalid.
+    """
+    required_fields = ['title', 'description', 'priority_tag', 'progress_tag', 'development_bit_vector']
+    for field in required_fields:
+        if not data.get(field):
+            return False, f"'{field}' is required."
+    return True, "Added task"
+
+
+def get_task_schema(task):
+    """
+    Convert a Task model instance to a dictionary format.
+
+    Args:
+        task (Task): A task model instance.
+
+    Returns:
+        dict: A dictionary representation of the task.
+    """
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'story_point': task.story_point,
+        'development_bit_vector': task.development_bit_vector,
+        'priority_tag': task.priority_tag,
+        'progress_tag': task.progress_tag,
+        'user': task.user,
+        'created_at': task.created_at,
+        'sprint_id': task.sprint_id,
+        'version': task.version,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None
+    }
+
+
+def get_task_summary_columns():
+    """
+    The columns of a task summary: what the board views show, with the description cut to an excerpt by the database
+    so the full text is never read or sent.
+    """
+    length = app.config['TASK_EXCERPT_LENGTH']
+    return (Task.id, Task.title, func.substr(Task.description, 1, length).label('description_excerpt'),
+            (func.length(Task.description) > length).label('description_truncated'), Task.story_point,
+            Task.development_bit_vector, Task.priority_tag, Task.progress_tag, Task.user, Task.created_at,
+            Task.sprint_id, Task.version)
+
+
+def get_task_summaries(*conditions) -> list[dict]:
+    """
+    Retrieve the summaries of the tasks matching the conditions, in ID order.
+
+    Args:
+        *conditions (ColumnElement): Filters on the task table; every task if none are given.
+
+    Returns:
+        list[dict]: The task summaries.
+    """
+    query = select(*get_task_summary_columns()).where(*conditions).order_by(Task.id)
+    return [dict(row) for row in db.session.execute(query).mappings()]
+
+
+def get_tasks_list():
+    """
+    Retrieve all tasks from the database and return them in dictionary format.
+
+    Returns:
+        list[dict]: A list of all tasks in dictionary format.
+    """
+    tasks = Task.query.options(undefer(Task.description)).all()
+    return [get_task_schema(task) for task in tasks]
+
+
+def get_changed_tasks(since: int, until: int, full: bool = False) -> tuple[list[dict], list[int]]:
+    """
+    Retrieve the tasks changed in the task change stream after since, up to and including until.
+
+    Args:
+        since (int): Sequence number the caller is up to date with.
+        until (int): Last sequence number to include.
+        full (bool): Return the full tasks rather than their summaries.
+
+    Returns:
+        tuple[list[dict], list[int]]: The changed tasks that still exist, and the IDs of the changed tasks that have
+            since been deleted.
+    """
+    changed_ids = db.session.scalars(
+        select(TaskChange.task_id).where(TaskChange.seq > since, TaskChange.seq <= until).distinct()
+    ).all()
+    tasks = []
+    for start in range(0, len(changed_ids), 500):
+        chunk = changed_ids[start:start + 500]
+        if full:
+            tasks.extend(map(get_task_schema, Task.query.options(undefer(Task.description)).filter(Task.id.in_(chunk))))
+        else:
+            tasks.extend(get_task_summaries(Task.id.in_(chunk)))
+    found = {task['id'] for task in tasks}
+    return tasks, [task_id for task_id in changed_ids if task_id not in found]
+
+
+def get_next_tasks(limit: int, user: str = None, sprint_id: int = None, backlog: bool = False,
+                   progress_tag: str = NOT_STARTED_TAG) -> list[dict]:
+    """
+    Retrieve the tasks to work on next: highest priority first, then smallest, then oldest.
+
+    The ordering matches the ix_task_next indexes, so the database reads the first entries of one index range instead
+    of sorting every matching task.
+
+    Args:
+        limit (int): The number of tasks to return.
+        user (str): Only include tasks assigned to this user.
+        sprint_id (int): Only include tasks in this sprint.
+        backlog (bool): Only include tasks that are not in any sprint (ignored when sprint_id is given).
+        progress_tag (str): Only include tasks with this progress tag.
+
+    Returns:
+        list[dict]: The summaries of the selected tasks, in order.
+    """
+    query = select(*get_task_summary_columns()).where(Task.progress_tag == progress_tag)
+    if user is not None:
+        query = query.where(Task.user == user)
+    if sprint_id is not None:
+        query = query.where(Task.sprint_id == sprint_id)
+    elif backlog:
+        query = query.where(Task.sprint_id.is_(None))
+    query = query.order_by(Task.priority.desc(), Task.story_point, Task.id).limit(limit)
+    return [dict(row) for row in db.session.execute(query).mappings()]
+
+
+# --- Board Summary ---
+def get_board_summary(sprint_id: int = None, backlog: bool = False) -> dict:
+    """
+    Summarise the board from the task counters: task counts and story point totals per column and per sprint.
+
+    Only the counter rows are read, never the task table.
+
+    Args:
+        sprint_id (int): Only summarise this sprint.
+        backlog (bool): Only summarise tasks that are not in any sprint (ignored when sprint_id is given).
+
+    Returns:
+        dict: Totals per column (every board column is always present), per sprint (sprint_id None for the backlog)
+            and overall, each as {'count': int, 'story_points': int}.
+    """
+    query = select(TaskCounter).where(TaskCounter.task_count != 0)
+    if sprint_id is not None or backlog:
+        query = query.where(TaskCounter.sprint_id == (sprint_id or 0))
+
+    def empty():
+        return {'count': 0, 'story_points': 0}
+
+    def add(totals, counter):
+        totals['count'] += counter.task_count
+        totals['story_points'] += counter.story_points
+
+    columns = {column: empty() for column in BOARD_COLUMNS}
+    sprints = {}
+    total = empty()
+    for counter in db.session.scalars(query):
+        add(columns.setdefault(counter.progress_tag, empty()), counter)
+        sprint = sprints.setdefault(counter.sprint_id or None, {'sprint_id': counter.sprint_id or None, **empty(),
+                                                                'columns': {}})
+        add(sprint, counter)
+        add(sprint['columns'].setdefault(counter.progress_tag, empty()), counter)
+        add(total, counter)
+    return {'columns': columns, 'sprints': sorted(sprints.values(), key=lambda sprint: sprint['sprint_id'] or 0),
+            'total': total}
+
+
+def repair_task_counters() -> int:
+    """
+    Rebuild the task counters of the current project from the task table.
+
+    The counters are replaced in a single transaction, so they are never seen half rebuilt.
+
+    Returns:
+        int: The number of counter rows that were wrong (including missing and extra rows).
+    """
+    def key(row):
+        return row.progress_tag, row.sprint_id
+
+    def totals(rows):
+        return {key(row): (row.task_count, row.story_points) for row in rows
+                if row.task_count or row.story_points}
+
+    columns = (TaskCounter.progress_tag, TaskCounter.sprint_id, TaskCounter.task_count, TaskCounter.story_points)
+    stored = totals(db.session.execute(delete(TaskCounter).returning(*columns)).all())
+    db.session.execute(get_task_counter_rebuild())
+    rebuilt = totals(db.session.execute(select(*columns)).all())
+    db.session.commit()
+    return sum(stored.get(counter) != rebuilt.get(counter) for counter in stored.keys() | rebuilt.keys())
+
+
+# --- Analytics ---
+TASK_SNAPSHOT_COLUMNS = (Task.id, Task.story_point, Task.priority_tag, Task.progress_tag, Task.development_bit_vector,
+                         Task.user)
+task_snapshots: dict[int, tuple[TaskSnapshot, float]] = {}
+task_snapshot_lock = threading.Lock()
+
+
+def get_task_snapshot() -> TaskSnapshot:
+    """
+    Retrieve the analytics snapshot of the current project's tasks.
+
+    The snapshot is loaded on first use. Afterwards, at most once every ANALYTICS_REFRESH_INTERVAL seconds, it applies
+    the task changes recorded since its last refresh, reloading only the tasks that changed.
+
+    Returns:
+        TaskSnapshot: The up-to-date snapshot.
+    """
+    project_id = get_current_project_id()
+    with task_snapshot_lock:
+        snapshot, refreshed_at = task_snapshots.get(project_id, (None, 0.0))
+        if snapshot is None:
+            snapshot = TaskSnapshot()
+            snapshot.last_seq = db.session.scalar(select(func.max(TaskChange.seq))) or 0
+            rows = db.session.execute(select(*TASK_SNAPSHOT_COLUMNS).execution_options(yield_per=10000)).mappings()
+            for chunk in rows.partitions():
+                snapshot.upsert(chunk)
+        elif time.monotonic() - refreshed_at >= app.config['ANALYTICS_REFRESH_INTERVAL']:
+            refresh_task_snapshot(snapshot)
+        else:
+            return snapshot
+        task_snapshots[project_id] = (snapshot, time.monotonic())
+    return snapshot
+
+
+def refresh_task_snapshot(snapshot: TaskSnapshot) -> int:
+    """
+    Apply the task changes recorded since the snapshot's last refresh.
+
+    Args:
+        snapshot (TaskSnapshot): The snapshot to bring up to date.
+
+    Returns:
+        int: The number of tasks that were reloaded or removed.
+    """
+    changes = db.session.execute(
+        select(TaskChange.seq, TaskChange.task_id).where(TaskChange.seq > snapshot.last_seq).order_by(TaskChange.seq)
+    ).all()
+    if not changes:
+        return 0
+    changed_ids = list({change.task_id for change in changes})
+    found = set()
+    for start in range(0, len(changed_ids), 500):
+        rows = db.session.execute(
+            select(*TASK_SNAPSHOT_COLUMNS).where(Task.id.in_(changed_ids[start:start + 500]))
+        ).mappings().all()
+        snapshot.upsert(rows)
+        found.update(row['id'] for row in rows)
+    snapshot.remove(set(changed_ids) - found)
+    snapshot.last_seq = changes[-1].seq
+    return len(changed_ids)
+
+
+def get_snapshot_mask(snapshot: TaskSnapshot, args):
+    """
+    Build a snapshot filter from request arguments.
+
+    Supported arguments are priority (Priority names), status (Status names) and user, each comma separated, tag (a Tag
+    name), min_points and max_points.
+
+    Args:
+        snapshot (TaskSnapshot): The snapshot to filter.
+        args (MultiDict): The request arguments.
+
+    Returns:
+        np.ndarray: Boolean mask of the selected tasks.
+
+    Raises:
+        KeyError: An unknown Priority, Status or Tag name was given.
+    """
+    def names(key):
+        return [name.strip().upper() for name in args[key].split(',')] if args.get(key) else None
+
+    return snapshot.mask(
+        priority=[Priority[name] for name in names('priority')] if names('priority') else None,
+        status=[Status[name] for name in names('status')] if names('status') else None,
+        user=args['user'].split(',') if args.get('user') else None,
+        tag=Tag[args['tag'].strip().upper()] if args.get('tag') else None,
+        min_points=args.get('min_points', type=int),
+        max_points=args.get('max_points', type=int)
+    )
+
+
+# --- Duplicate Detection ---
+duplicate_indexes: dict[int, DuplicateIndex] = {}
+duplicate_index_lock = threading.Lock()
+# Computes signatures outside any project's index; every index uses the same hash functions, so they are interchangeable
+task_signer = DuplicateIndex()
+
+
+def get_task_text(title: str, description: str) -> str:
+    return f'{title} {description}'
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """
+    Retrieve the near-duplicate index of the current project's tasks.
+
+    The index is loaded from the stored task signatures on first use (or built from the task table when none are stored
+    yet) and then brought up to date with the task change stream on every call.
+
+    Returns:
+        DuplicateIndex: The up-to-date index.
+    """
+    project_id = get_current_project_id()
+    with duplicate_index_lock:
+        index = duplicate_indexes.get(project_id)
+        if index is None:
+            index = DuplicateIndex()
+            stored = 0
+            rows = db.session.execute(select(TaskSignature).execution_options(yield_per=10000)).scalars()
+            for row in rows:
+                index.add(row.task_id, np.frombuffer(row.signature, dtype=np.uint32))
+                index.last_seq = max(index.last_seq, row.seq)
+                stored += 1
+            if not stored:
+                index.last_seq = db.session.scalar(select(func.max(TaskChange.seq))) or 0
+                task_ids = db.session.scalars(select(Task.id)).all()
+                store_task_signatures(index, task_ids, index.last_seq)
+            duplicate_indexes[project_id] = index
+        refresh_duplicate_index(index)
+    return index
+
+
+def store_task_signatures(index: DuplicateIndex, task_ids: list[int], seq: int) -> None:
+    """
+    Recompute and store the signatures of the given tasks, and drop those of tasks that no longer exist.
+
+    Args:
+        index (DuplicateIndex): The index to update.
+        task_ids (list[int]): IDs of the tasks that changed.
+        seq (int): The task change sequence number the signatures are current as of.
+    """
+    found = set()
+    for start in range(0, len(task_ids), 500):
+        chunk = task_ids[start:start + 500]
+        rows = db.session.execute(select(Task.id, Task.title, Task.description).where(Task.id.in_(chunk))).all()
+        signatures = []
+        for row in rows:
+            signature = index.signature(get_task_text(row.title, row.description))
+            index.add(row.id, signature)
+            signatures.append({'task_id': row.id, 'seq': seq, 'signature': signature.tobytes()})
+            found.add(row.id)
+        if signatures:
+            db.session.execute(insert(TaskSignature).prefix_with('OR REPLACE'), signatures)
+    removed = set(task_ids) - found
+    for task_id in removed:
+        index.remove(task_id)
+    if removed:
+        db.session.execute(delete(TaskSignature).where(TaskSignature.task_id.in_(removed)))
+    db.session.commit()
+
+
+def refresh_duplicate_index(index: DuplicateIndex) -> int:
+    """
+    Apply the task changes recorded since the index was last refreshed, storing the new signatures.
+
+    Args:
+        index (DuplicateIndex): The index to bring up to date.
+
+    Returns:
+        int: The number of tasks that were re-indexed or removed.
+    """
+    changes = db.session.execute(
+        select(TaskChange.seq, TaskChange.task_id).where(TaskChange.seq > index.last_seq).order_by(TaskChange.seq)
+    ).all()
+    if not changes:
+        return 0
+    latest = {change.task_id: change.seq for change in changes}
+    changed_ids = list(latest)
+    # tasks inserted by add_task_to_db already have a signature as of their change; only load it
+    stale = []
+    for start in range(0, len(changed_ids), 500):
+        chunk = changed_ids[start:start + 500]
+        stored = {row.task_id: row for row in db.session.execute(
+            select(TaskSignature.task_id, TaskSignature.seq, TaskSignature.signature)
+            .where(TaskSignature.task_id.in_(chunk))
+        )}
+        for task_id in chunk:
+            row = stored.get(task_id)
+            if row is not None and row.seq >= latest[task_id]:
+                index.add(task_id, np.frombuffer(row.signature, dtype=np.uint32))
+            else:
+                stale.append(task_id)
+    if stale:
+        store_task_signatures(index, stale, changes[-1].seq)
+    index.last_seq = changes[-1].seq
+    return len(changed_ids)
+
+
+def add_task_to_db(task: Task) -> None:
+    """
+    Insert a new task together with its near-duplicate signature, in the same transaction.
+
+    In write-behind mode both are committed by the write queue, and this returns once they are durable.
+
+    Args:
+        task (Task): The task to insert.
+    """
+    signature = task_signer.signature(get_task_text(task.title, task.description)).tobytes()
+
+    def insert_task(writer_session):
+        writer_session.add(task)
+        writer_session.flush()
+        seq = writer_session.scalar(select(func.max(TaskChange.seq)).where(TaskChange.task_id == task.id))
+        writer_session.add(TaskSignature(task_id=task.id, seq=seq, signature=signature))
+
+    queue = get_write_queue()
+    if queue:
+        queue.submit(insert_task).result()
+        return
+    insert_task(db.session)
+    db.session.commit()
+
+
+def find_duplicate_tasks(title: str, description: str, exclude: int = None) -> list[dict]:
+    """
+    Find existing tasks whose title and description are near-duplicates of the given ones.
+
+    Args:
+        title (str): Title to check.
+        description (str): Description to check.
+        exclude (int): ID of a task to leave out, e.g. the task being checked.
+
+    Returns:
+        list[dict]: The id, title and estimated similarity of each likely duplicate, most similar first.
+    """
+    index = get_duplicate_index()
+    matches = index.query(
+        index.signature(get_task_text(title, description)),
+        threshold=app.config['DUPLICATE_THRESHOLD'],
+        limit=app.config['DUPLICATE_SUGGESTIONS'],
+        exclude=exclude
+    )
+    if not matches:
+        return []
+    titles = dict(db.session.execute(select(Task.id, Task.title).where(Task.id.in_([id for id, _ in matches]))).all())
+    return [{'id': task_id, 'title': titles[task_id], 'similarity': similarity}
+            for task_id, similarity in matches if task_id in titles]
+
+
+# --- Forecasting ---
+forecast_cache: dict[int, tuple[tuple, dict]] = {}
+
+
+def get_delivery_forecast(percentiles: list[int], simulations: int = None) -> dict:
+    """
+    Forecast when the current backlog will be completed, from historical sprint velocity.
+
+    Velocity is the story points completed (including since-archived tasks) in each of the last
+    FORECAST_HISTORY_SPRINTS sprint windows of SPRINT_LENGTH_DAYS, ignoring windows from before the first completion.
+    The forecast is cached per project until a task is completed, reopened or the backlog changes.
+
+    Args:
+        percentiles (list[int]): Confidence levels to report.
+        simulations (int): Number of Monte Carlo simulations, defaults to FORECAST_SIMULATIONS.
+
+    Returns:
+        dict: The remaining points, the velocity samples, and the sprints and date needed at each confidence level.
+
+    Raises:
+        ValueError: No story points have been completed yet, or the backlog would take more than FORECAST_MAX_SPRINTS
+            sprints.
+    """
+    simulations = simulations or app.config['FORECAST_SIMULATIONS']
+    remaining = db.session.execute(
+        select(func.coalesce(func.sum(Task.story_point), 0), func.count(Task.id)).where(Task.progress_tag != COMPLETED_TAG)
+    ).one()
+    completions = [
+        db.session.execute(select(func.count(model.id), func.max(model.completed_at))
+                           .where(model.completed_at.is_not(None))).one()
+        for model in (Task, ArchivedTask)
+    ]
+    key = (tuple(remaining), tuple(map(tuple, completions)), tuple(percentiles), simulations,
+           app.config['SPRINT_LENGTH_DAYS'], app.config['FORECAST_HISTORY_SPRINTS'])
+    project_id = get_current_project_id()
+    cached_key, cached = forecast_cache.get(project_id, (None, None))
+    if cached_key == key:
+        return cached
+
+    now = datetime.now()
+    sprint_length = timedelta(days=app.config['SPRINT_LENGTH_DAYS'])
+    windows = fixed_windows(now, sprint_length, app.config['FORECAST_HISTORY_SPRINTS'])
+    history = union_all(*[
+        select(model.completed_at, model.story_point).where(model.completed_at >= windows[0][0])
+        for model in (Task, ArchivedTask)
+    ])
+    rows = db.session.execute(history).all()
+    completed_at = np.array([row[0] for row in rows], dtype='datetime64[us]')
+    story_points = np.array([row[1] for row in rows], dtype=float)
+    if len(completed_at):
+        windows = [window for window in windows if window[1] > completed_at.min()]
+    velocities = sprint_velocities(completed_at, story_points, windows)
+
+    sprints_needed = forecast(remaining[0], velocities, percentiles=percentiles, simulations=simulations,
+                              max_sprints=app.config['FORECAST_MAX_SPRINTS'])
+    result = {
+        'remaining_points': remaining[0],
+        'remaining_tasks': remaining[1],
+        'velocities': velocities.tolist(),
+        'sprint_length_days': app.config['SPRINT_LENGTH_DAYS'],
+        'sprints': {str(percentile): sprints for percentile, sprints in sprints_needed.items()},
+        'dates': {str(percentile): (now + sprint_length * sprints).date().isoformat()
+                  for percentile, sprints in sprints_needed.items()}
+    }
+    forecast_cache[project_id] = (key, result)
+    return result
+
+
+# --- Sprint Planning ---
+def get_sprint_plan_operations(sprints: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Plan the given sprints from the backlog and express the result as batch operations.
+
+    The backlog is every task that is not completed and is either unassigned or already in one of the sprints being
+    planned, oldest first. Tasks already in a planned sprint that no longer fit are moved back to the backlog.
+
+    Args:
+        sprints (list[dict]): The sprints to fill, in order, as {'id': int, 'capacity': int}.
+
+    Returns:
+        tuple[list[dict], list[dict]]: A summary per sprint, and the update operations (with versions) that apply the
+            plan through apply_task_batch. Only tasks whose sprint changes are included.
+    """
+    sprint_ids = [sprint['id'] for sprint in sprints]
+    rows = db.session.execute(
+        select(Task.id, Task.story_point, Task.priority, Task.sprint_id, Task.version)
+        .where(Task.progress_tag != COMPLETED_TAG, or_(Task.sprint_id.is_(None), Task.sprint_id.in_(sprint_ids)))
+        .order_by(Task.id)
+    ).all()
+    tasks = {row.id: row for row in rows}
+    backlog = [{'id': row.id, 'story_point': row.story_point, 'priority': Priority(row.priority)} for row in rows]
+
+    planned = {}
+    summary = []
+    for sprint, task_ids in zip(sprints, plan_sprints(backlog, [sprint['capacity'] for sprint in sprints])):
+        planned.update((task_id, sprint['id']) for task_id in task_ids)
+        summary.append({
+            'id': sprint['id'],
+            'capacity': sprint['capacity'],
+            'story_points': sum(tasks[task_id].story_point for task_id in task_ids),
+            'task_ids': task_ids
+        })
+
+    operations = [
+        {'op': 'update', 'id': row.id, 'version': row.version, 'data': {'sprint_id': planned.get(row.id)}}
+        for row in rows if planned.get(row.id) != row.sprint_id
+    ]
+    return summary, operations
+
+
+# --- Archive ---
+def archive_completed_tasks(max_age_days: int = None, batch_size: int = None, pause: float = 0.0,
+                            on_batch=None) -> int:
+    """
+    Move tasks that were completed more than max_age_days ago from the live task table into the archive table.
+
+    Tasks are moved in bounded batches, one transaction each, so the job never holds the write lock for long.
+
+    Args:
+        max_age_days (int): Minimum days since completion, defaults to ARCHIVE_AFTER_DAYS.
+        batch_size (int): Maximum tasks moved per transaction, defaults to ARCHIVE_BATCH_SIZE.
+        pause (float): Seconds to sleep between batches.
+        on_batch (Callable[[int], None]): Called with the running total after each batch.
+
+    Returns:
+        int: The number of tasks archived.
+    """
+    return archive_in_batches(db.session, Task, ArchivedTask, get_archive_condition(max_age_days),
+                              batch_size=batch_size or app.config['ARCHIVE_BATCH_SIZE'], pause=pause,
+                              on_batch=on_batch)
+
+
+def get_archive_condition(max_age_days: int = None):
+    """
+    Build the condition selecting the tasks completed more than max_age_days (default ARCHIVE_AFTER_DAYS) ago.
+    """
+    if max_age_days is None:
+        max_age_days = app.config['ARCHIVE_AFTER_DAYS']
+    cutoff = datetime.now() - timedelta(days=max_age_days)
+    return (Task.progress_tag == COMPLETED_TAG) & (Task.completed_at < cutoff)
+
+
+def get_archived_task_schema(task: ArchivedTask) -> dict:
+    """
+    Convert an ArchivedTask model instance to a dictionary format.
+
+    Args:
+        task (ArchivedTask): An archived task model instance.
+
+    Returns:
+        dict: The task's dictionary representation, plus when it was archived.
+    """
+    return {**get_task_schema(task), 'archived_at': task.archived_at.isoformat()}
+
+
+def search_archived_tasks(search: str = None, limit: int = 100, offset: int = 0) -> list[dict]:
+    """
+    Retrieve archived tasks, most recently completed first, optionally matching a search term.
+
+    Args:
+        search (str): Text to look for in the title or description.
+        limit (int): Maximum number of tasks to return.
+        offset (int): Number of matching tasks to skip.
+
+    Returns:
+        list[dict]: The matching archived tasks in dictionary format.
+    """
+    query = ArchivedTask.query
+    if search:
+        pattern = f'%{search}%'
+        query = query.filter(or_(ArchivedTask.title.ilike(pattern), ArchivedTask.description.ilike(pattern)))
+    tasks = query.order_by(ArchivedTask.completed_at.desc(), ArchivedTask.id.desc()).limit(limit).offset(offset)
+    return [get_archived_task_schema(task) for task in tasks]
+
+
+# --- Import and Export ---
+# In import order: users, then live and archived tasks, then sprint activity and logs where those tables exist
+TRANSFER_MODELS = (User, Task, ArchivedTask, Activity, InactiveLog, ActiveLog)
+# Export jobs report progress, which also keeps them from being taken for abandoned (JOB_STALE_AFTER), this often
+EXPORT_PROGRESS_ROWS = 10000
+
+
+def get_transfer_tables(names: list[str] = None) -> list:
+    """
+    List the tables of the current project's database that can be exported and imported.
+
+    Args:
+        names (list[str]): Only include these tables.
+
+    Returns:
+        list[Table]: The tables, in import order.
+
+    Raises:
+        KeyError: An unknown table name was given.
+    """
+    tables = {model.__table__.name: model.__table__ for model in TRANSFER_MODELS}
+    for name in names or ():
+        if name not in tables:
+            raise KeyError(name)
+    return [table for name, table in tables.items() if (not names or name in names) and is_transferable(table)
+            and inspect(db.session.get_bind(clause=select(table))).has_table(name)]
+
+
+def get_uploaded_lines() -> io.TextIOWrapper:
+    """
+    Open the request's upload (the 'file' form field, or else the body) as text lines.
+
+    The request's own streams are closed once the view returns, so the upload is spooled (to disk if large) into a file
+    that a streamed response can keep reading. The caller closes it.
+
+    Returns:
+        io.TextIOWrapper: The uploaded lines.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+    shutil.copyfileobj(request.files['file'].stream if 'file' in request.files else request.stream, upload)
+    upload.seek(0)
+    return io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+
+
+# --- Backups ---
+def get_backup_directory() -> str:
+    return app.config['BACKUP_DIRECTORY'] or os.path.join(app.instance_path, 'backups')
+
+
+def get_backup_sources() -> dict[str, str]:
+    """
+    List the database files to back up: the main database, and every project shard when sharding is enabled.
+
+    Returns:
+        dict[str, str]: Database paths by backup name.
+    """
+    sources = {'main': db.engine.url.database}
+    if shard_directory is not None:
+        sources.update((f'shard_{project_id}', shard_directory.path_for(project_id))
+                       for project_id in shard_directory.project_ids())
+    return sources
+
+
+def run_backup(on_file=None) -> dict:
+    """
+    Back up every database without blocking writers, verify the result, and delete backups beyond BACKUP_RETENTION.
+
+    Args:
+        on_file (Callable[[int], None]): Called with the number of databases copied so far after each one.
+
+    Returns:
+        dict: The backup's path and manifest entries, and the paths of the deleted backups.
+
+    Raises:
+        RuntimeError: The new backup failed verification; it is deleted.
+    """
+    directory = get_backup_directory()
+    path = create_backup(get_backup_sources(), directory, pages=app.config['BACKUP_PAGES_PER_STEP'],
+                         sleep=app.config['BACKUP_STEP_SLEEP'], on_file=on_file)
+    problems = verify_backup(path)
+    if problems:
+        shutil.rmtree(path, ignore_errors=True)
+        raise RuntimeError('Backup failed verification: ' + '; '.join(problems))
+    with open(os.path.join(path, 'manifest.json')) as manifest:
+        files = json.load(manifest)['files']
+    return {'path': path, 'files': files, 'removed': rotate_backups(directory, app.config['BACKUP_RETENTION'])}
+
+
+def schedule_backups(interval: float) -> None:
+    """
+    Submit a backup job whenever the newest backup is older than interval seconds. Runs forever on its own thread.
+
+    The age is read from the backup directory, so several processes sharing it do not each take a backup.
+    """
+    while True:
+        backups = list_backups(get_backup_directory())
+        age = time.time() - os.path.getmtime(backups[-1]) if backups else float('inf')
+        if age >= interval:
+            job_runner.submit('backup', dedup_key='scheduled')
+            age = 0
+        time.sleep(min(interval - age, 60))
+
+
+# --- Background Jobs ---
+def in_app_context(handler):
+    """
+    Wrap a job handler so that it runs in an application context, for the project the job was submitted for.
+    """
+    @wraps(handler)
+    def run(context: JobContext):
+        with app.app_context():
+            g.project_id = context.project_id
+            return handler(context)
+    return run
+
+
+@in_app_context
+def archive_tasks_job(context: JobContext) -> dict:
+    """
+    Archive old completed tasks, reporting progress (and stopping if cancelled) after every batch.
+
+    Parameters: days and batch_size, as for archive_completed_tasks.
     """
-    Get the current time in the Australia/Melbourne timezone, formatted as:
-    'Full weekday name, day of the month, full month name, hour:minute AM/PM'.
+    days = context.params.get('days')
+    total = db.session.scalar(select(func.count(Task.id)).where(get_archive_condition(days)))
+    archived = archive_completed_tasks(max_age_days=days, batch_size=context.params.get('batch_size'),
+                                       on_batch=lambda done: context.progress(done / max(total, 1)))
+    return {'archived': archived}
 
-    Example:
-        Sunday 20 October, 09:15 PM
 
-    Returns:
-        str: The formatted current date and time in AEST.
-    """
-    return datetime.now(ZoneInfo('Australia/Melbourne')).strftime('%A %d %B, %I:%M %p')
+@in_app_context
+def repair_task_counters_job(context: JobContext) -> dict:
+    return {'repaired': repair_task_counters()}
 
 
-# --- Database ---
-def add_to_db(instance) -> None:
+@in_app_context
+def export_data_job(context: JobContext) -> dict:
     """
-    Add an instance to the database session and commit the changes.
-
-    Args:
-        instance (db.Model): The model instance to add and commit.
+    Export tables (parameter: tables, a list of names, default all) to an NDJSON file in EXPORT_DIRECTORY, reporting
+    progress (and stopping if cancelled) every EXPORT_PROGRESS_ROWS rows.
     """
-    db.session.add(instance)
-    db.session.commit()
+    directory = app.config['EXPORT_DIRECTORY'] or os.path.join(app.instance_path, 'exports')
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'export-{context.job_id}.ndjson')
+    tables = get_transfer_tables(context.params.get('tables'))
+    total = sum(db.session.scalar(select(func.count()).select_from(table)) for table in tables)
+    rows = -1
+    with open(path, 'w', encoding='utf-8') as export:
+        for rows, line in enumerate(export_ndjson(db.session, tables)):
+            export.write(line)
+            if rows % EXPORT_PROGRESS_ROWS == 0:
+                context.progress(rows / max(total, 1))
+    return {'path': path, 'rows': rows}
+
+
+@in_app_context
+def backup_job(context: JobContext) -> dict:
+    """
+    Back up every database (see run_backup), reporting progress (and stopping if cancelled) after every database.
+    """
+    total = len(get_backup_sources())
+    return run_backup(on_file=lambda done: context.progress(done / total))
 
 
-def delete_from_db(instance):
+job_runner.register('archive-tasks', archive_tasks_job)
+job_runner.register('repair-task-counters', repair_task_counters_job)
+job_runner.register('export-data', export_data_job)
+job_runner.register('backup', backup_job)
+job_runner.recover()
+
+if app.config['BACKUP_INTERVAL']:
+    threading.Thread(target=schedule_backups, args=(app.config['BACKUP_INTERVAL'],), name='backup-scheduler',
+                     daemon=True).start()
+
+
+def get_job_schema(job: Job) -> dict:
     """
-    Delete a model instance from the database and commit the changes.
+    Convert a Job model instance to a dictionary format.
 
     Args:
-        instance (db.Model): The model instance to delete.
+        job (Job): A job model instance.
+
+    Returns:
+        dict: A dictionary representation of the job, with its parameters and result decoded.
     """
-    db.session.delete(instance)
-    db.session.commit()
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'params': json.loads(job.params),
+        'status': job.status,
+        'progress': job.progress,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'project_id': job.project_id,
+        'cancel_requested': job.cancel_requested,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
 
 
-def get_model_instance(model, **kwargs):
+# --- Batch Task Mutations ---
+BATCH_OPERATIONS = ('create', 'update', 'delete')
+TASK_EDITABLE_FIELDS = ('title', 'description', 'story_point', 'development_bit_vector', 'priority_tag',
+                        'progress_tag', 'sprint_id')
+
+
+def get_editable_fields(data: dict) -> dict:
     """
-    Retrieve the first instance of a model that matches the given filter criteria.
+    Filter task data down to the fields a client is allowed to write.
 
     Args:
-        model (db.Model): The SQLAlchemy model to query.
-        **kwargs: Column-value pairs to filter by (e.g., username='admin').
+        data (dict): Task data from the request.
 
     Returns:
-        db.Model: The first matching model instance, or None if no match is found.
+        dict: The subset of data whose keys are in TASK_EDITABLE_FIELDS.
     """
-    return model.query.filter_by(**kwargs).first()
+    return {key: value for key, value in data.items() if key in TASK_EDITABLE_FIELDS}
 
 
-def update_model_instance(instance, data: dict):
+def get_completion_changes(changes: dict) -> dict:
     """
-    Update a model instance with the provided data.
+    Work out the completed_at change that goes with a progress_tag change made outside the ORM.
+
+    This mirrors track_task_completion for bulk and queued UPDATE statements: moving to completed keeps an existing
+    completion time, and moving anywhere else clears it.
 
     Args:
-        instance (db.Model): The model instance to update.
-        data (dict): A dictionary of attributes to update (e.g., {'title': 'New Title'}).
+        changes (dict): Column-value pairs being written to a task.
+
+    Returns:
+        dict: {'completed_at': value or SQL expression}, or {} if progress_tag is not being changed.
     """
-    for key, value in data.items():
-        if hasattr(instance, key):
-            setattr(instance, key, value)
-    db.session.commit()
+    if 'progress_tag' not in changes:
+        return {}
+    if changes['progress_tag'] != COMPLETED_TAG:
+        return {'completed_at': None}
+    return {'completed_at': case((Task.progress_tag == COMPLETED_TAG, func.coalesce(Task.completed_at, datetime.now())),
+                                 else_=datetime.now())}
 
 
-# --- Task Management ---
-def validate_task_data(data: dict) -> tuple[bool, str]:
+def skip_pending_results(results: list[dict]) -> list[dict]:
     """
-    Validate task data for required fields.
+    Mark every operation that has not failed as skipped, used when an atomic batch is abandoned.
 
     Args:
-        data (dict): Task data from the request.
+        results (list[dict]): Per-operation results.
 
     Returns:
-        tuple[bool, str]: (True, "") if valid; (False, "Error message") if invalid.
+        list[dict]: The same results, updated in place.
     """
-    required_fields = ['title', 'description', 'priority_tag', 'progress_tag', 'development_bit_vector']
-    for field in required_fields:
-        if not data.get(field):
-            return False, f"'{field}' is required."
-    return True, "Added task"
+    for result in results:
+        if result['status'] == 'ok':
+            result.update(status='skipped')
+            result.pop('error', None)
+    return results
 
 
-def get_task_schema(task):
+def validate_batch_operations(operations: list[dict]) -> list[dict]:
     """
-    Convert a Task model instance to a dictionary format.
+    Validate a list of batch operations against the current state of the task table.
+
+    Operations are checked in order, so an update or delete that targets a task deleted earlier in the same batch is
+    rejected. All targeted tasks are loaded with a single query. Updates and deletes may carry the 'version' they were
+    based on; otherwise the version loaded here is used, so the write still fails if the task changes in the meantime.
 
     Args:
-        task (Task): A task model instance.
+        operations (list[dict]): Operations of the form
+            {'op': 'create' | 'update' | 'delete', 'id': int, 'version': int, 'data': dict}.
 
     Returns:
-        dict: A dictionary representation of the task.
+        list[dict]: One result per operation, with 'status' set to 'ok', 'error' or 'conflict' (and an 'error' message).
     """
-    return {
-        'id': task.id,
-        'title': task.title,
-        'description': task.description,
-        'story_point': task.story_point,
-        'development_bit_vector': task.development_bit_vector,
-        'priority_tag': task.priority_tag,
-        'progress_tag': task.progress_tag,
-        'user': task.user,
-        'created_at': task.created_at
-    }
+    target_ids = {operation.get('id') for operation in operations if isinstance(operation, dict)}
+    target_ids = [task_id for task_id in target_ids if isinstance(task_id, int)]
+    existing = {task.id: get_task_schema(task)
+                for task in Task.query.options(undefer(Task.description)).filter(Task.id.in_(target_ids))}
+
+    results = []
+    for index, operation in enumerate(operations):
+        result = {'index': index, 'op': None, 'status': 'ok'}
+        results.append(result)
+
+        if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+            result.update(status='error', error=f"'op' must be one of {', '.join(BATCH_OPERATIONS)}.")
+            continue
+        result['op'] = operation['op']
+        data = operation.get('data') or {}
+        if not isinstance(data, dict):
+            result.update(status='error', error="'data' must be an object.")
+            continue
+
+        if operation['op'] == 'create':
+            is_valid, message = validate_task_data(data)
+            if not is_valid:
+                result.update(status='error', error=message)
+            continue
+
+        task_id = operation.get('id')
+        result['id'] = task_id
+        if task_id not in existing:
+            result.update(status='error', error='Task not found')
+            continue
+
+        result['version'] = operation.get('version', existing[task_id]['version'])
+        if result['version'] != existing[task_id]['version']:
+            result.update(status='conflict', error='Task has been modified')
+            continue
+
+        if operation['op'] == 'update':
+            is_valid, message = validate_task_data({**existing[task_id], **data})
+            if not is_valid:
+                result.update(status='error', error=message)
+            elif get_editable_fields(data):
+                existing[task_id].update(get_editable_fields(data), version=result['version'] + 1)
+        else:
+            del existing[task_id]
+    return results
 
 
-def get_tasks_list():
+def apply_task_batch(operations: list[dict], atomic: bool = True) -> tuple[bool, list[dict]]:
     """
-    Retrieve all tasks from the database and return them in dictionary format.
+    Apply a list of task creates, updates and deletes in a single transaction.
+
+    Creates are inserted with one bulk statement, while updates and deletes are conditional on the task's version so
+    that concurrent edits are reported as conflicts. The whole batch is committed once. In atomic mode nothing is
+    written if any operation is invalid or conflicts; otherwise those operations are skipped and reported.
+
+    Args:
+        operations (list[dict]): Operations as accepted by validate_batch_operations.
+        atomic (bool): True for all-or-nothing semantics, False for best-effort.
 
     Returns:
-        list[dict]: A list of all tasks in dictionary format.
+        tuple[bool, list[dict]]: Whether the batch was applied, and the per-operation results.
+
+    Raises:
+        SQLAlchemyError: The transaction failed and was rolled back.
     """
-    tasks = Task.query.all()
-    return [get_task_schema(task) for task in tasks]
+    results = validate_batch_operations(operations)
+    if atomic and any(result['status'] != 'ok' for result in results):
+        return False, skip_pending_results(results)
+
+    creates, writes = [], []
+    for result in results:
+        if result['status'] != 'ok':
+            continue
+        fields = get_editable_fields(operations[result['index']].get('data') or {})
+        if result['op'] == 'create':
+            creates.append((result, {
+                'story_point': 0,
+                **fields,
+                'user': get_current_user(),
+                'created_at': get_aest_time(),
+                'project_id': get_current_project_id(),
+                'completed_at': datetime.now() if fields.get('progress_tag') == COMPLETED_TAG else None
+            }))
+        elif result['op'] == 'update':
+            if fields:
+                writes.append((result, update(Task).values(
+                    **fields, **get_completion_changes(fields), version=Task.version + 1
+                )))
+        else:
+            writes.append((result, delete(Task)))
+
+    try:
+        for result, statement in writes:
+            statement = statement.where(Task.id == result['id'], Task.version == result['version'])
+            if db.session.execute(statement.execution_options(synchronize_session=False)).rowcount != 1:
+                result.update(status='conflict', error='Task has been modified')
+            elif result['op'] == 'update':
+                result['version'] += 1
+        if atomic and any(result['status'] == 'conflict' for result in results):
+            db.session.rollback()
+            return False, skip_pending_results(results)
+        if creates:
+            new_ids = db.session.scalars(
+                insert(Task).returning(Task.id, sort_by_parameter_order=True),
+                [row for _, row in creates]
+            ).all()
+            for (result, _), new_id in zip(creates, new_ids):
+                result['id'] = new_id
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return True, results
 
 
 # --- Routing ---
 @app.route('/')
+@login_required()
 def home():
     """
     Render the home page if the user is logged in, otherwise redirect to the login page.
 
     :return: Rendered template for the home page or redirect to log in.
     """
-    if is_logged_in():
-        return render_template('index.html')
-    else:
-        return redirect(url_for('login'))
+    return render_template('index.html')
 
 
 @app.route('/login', methods=['GET', 'POST'])
+@reads_from_replica
 def login():
     """
     Handle user login by verifying credentials and managing session state.
@@ -256,12 +2204,17 @@ def login():
         password = request.form.get('password')
 
         user: User = User.query.filter_by(username=form_username).first()
+        if not user:
+            # the user may have been created since the replica was refreshed
+            with primary_reads():
+                user = User.query.filter_by(username=form_username).first()
 
         if not user:
             flash('Username does not exist', category='error')
-
-        if check_password_hash(user.password, password):
-            session['username'] = form_username
+        elif check_password_hash(user.password, password):
+            session['username'] = user.username
+            session['user_id'] = user.id
+            session['session_id'] = secrets.token_urlsafe()
             session['from_login'] = True
             flash_and_redirect('Login successful!', 'success', 'home')
         else:
@@ -276,61 +2229,61 @@ def logout():
 
     :return: Redirect to the login page.
     """
+    if session.get('session_id'):
+        identity_cache.discard(session['session_id'])
     session.clear()
     return redirect(url_for('login'))
 
 
 @app.route('/admin')
+@login_required(ROLE_ADMIN)
 def admin_page():
     """
     Render the admin page if the user is logged in and is an admin.
 
     :return: Rendered admin page or redirect to log in if unauthorized.
     """
-    if is_logged_in() and is_admin():
-        if session.get('from_login'):
-            session.pop('_flashes', None)
-            session.pop('from_login')
-        return render_template('admin.html')
+    if session.get('from_login'):
+        session.pop('_flashes', None)
+        session.pop('from_login')
+    return render_template('admin.html')
 
 
 @app.route('/create-user')
+@login_required(ROLE_ADMIN)
 def create_user_page():
     """
     Render the create user page if the user is logged in and is an admin.
 
     :return: Rendered create user page or redirect to log in if unauthorized.
     """
-    if is_logged_in() and is_admin():
-        return render_template('create_user.html')
-    return redirect(url_for('login'))
+    return render_template('create_user.html')
 
 
 @app.route('/change-username')
+@login_required(ROLE_ADMIN)
 def change_username_page():
     """
     Render the change username page if the user is logged in and is an admin.
 
     :return: Rendered change username page or redirect to log in if unauthorized.
     """
-    if is_logged_in() and is_admin():
-        return render_template('change_username.html')
-    return redirect(url_for('login'))
+    return render_template('change_username.html')
 
 
 @app.route('/change-password')
+@login_required(ROLE_ADMIN)
 def change_password_page():
     """
     Render the change password page if the user is logged in and is an admin.
 
     :return: Rendered change password page or redirect to log in if unauthorized.
     """
-    if is_logged_in() and is_admin():
-        return render_template('change_password.html')
-    return redirect(url_for('login'))
+    return render_template('change_password.html')
 
 
 @app.route('/add_task', methods=['POST'])
+@admission_controlled
 def add_task():
     """
     Add a new task to the database after validating the request data.
@@ -351,17 +2304,23 @@ def add_task():
             priority_tag=data['priority_tag'],
             progress_tag=data['progress_tag'],
             user=get_current_user(),
-            created_at=get_aest_time()
+            created_at=get_aest_time(),
+            project_id=get_current_project_id()
         )
 
-        add_to_db(new_task)
+        add_task_to_db(new_task)
 
-        return jsonify(get_task_schema(new_task)), 201
+        task_data = get_task_schema(new_task)
+        task_data['possible_duplicates'] = find_duplicate_tasks(new_task.title, new_task.description,
+                                                                exclude=new_task.id)
+        return jsonify(task_data), 201
     except Exception as e:
+        record_request_error(e)
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/delete_task/<int:task_id>', methods=['DELETE'])
+@admission_controlled
 def delete_task(task_id):
     """
     Delete a task from the database based on the task ID.
@@ -369,7 +2328,7 @@ def delete_task(task_id):
     :param task_id: The ID of the task to delete.
     :return: JSON response with the list of remaining tasks.
     """
-    task = Task.query.get(task_id)
+    task = db.session.get(Task, task_id)
     if task:
         delete_from_db(task)
     return get_tasks()  # Assuming this function returns the updated task list.
@@ -378,14 +2337,75 @@ def delete_task(task_id):
 @app.route('/get_tasks', methods=['GET'])
 def get_tasks():
     """
-    Retrieve and return a list of all tasks in JSON format.
+    Retrieve and return a list of all tasks in JSON format, with the task change sequence number (seq) and project
+    they reflect.
+
+    Tasks are summaries (see get_task_summary_columns) unless detail=full is given; get_task returns a full task.
+    With since (the seq of an earlier response for the same project) only the tasks changed after it are returned,
+    along with the IDs of the tasks deleted since. If since is ahead of the change stream, e.g. after a restore, every
+    task is returned and reset is set.
 
     :return: JSON response containing the list of tasks.
     """
-    tasks = get_tasks_list()
+    # read the position first: a change committed after it is sent again next time, never missed
+    seq = db.session.scalar(select(func.max(TaskChange.seq))) or 0
+    since = request.args.get('since', type=int)
+    full = request.args.get('detail') == 'full'
+    response = {'seq': seq, 'project_id': get_current_project_id()}
+    if since is None or since > seq:
+        tasks = get_tasks_list() if full else get_task_summaries()
+        response.update(tasks=tasks, deleted=[], reset=since is not None)
+    else:
+        tasks, deleted = get_changed_tasks(since, seq, full=full)
+        response.update(tasks=tasks, deleted=deleted, reset=False)
+    return jsonify(response)
+
+
+@app.route('/next_tasks', methods=['GET'])
+def next_tasks():
+    """
+    Retrieve the top k tasks to work on next, by priority, story points and age.
+
+    Optional arguments: k (default 10, at most 100), user, sprint_id (a sprint ID, or 'none' for the backlog) and
+    progress_tag (default not-started).
+
+    :return: JSON response containing the ordered list of tasks.
+    """
+    limit = request.args.get('k', 10, type=int)
+    if not 0 < limit <= 100:
+        return jsonify({'error': 'k must be between 1 and 100'}), 400
+    sprint_id = request.args.get('sprint_id')
+    backlog = sprint_id is not None and sprint_id.lower() == 'none'
+    if sprint_id is not None and not backlog and not sprint_id.isdigit():
+        return jsonify({'error': 'sprint_id must be a sprint ID or none'}), 400
+
+    tasks = get_next_tasks(
+        limit,
+        user=request.args.get('user'),
+        sprint_id=None if sprint_id is None or backlog else int(sprint_id),
+        backlog=backlog,
+        progress_tag=request.args.get('progress_tag', NOT_STARTED_TAG)
+    )
     return jsonify({'tasks': tasks})
 
 
+@app.route('/tasks/summary', methods=['GET'])
+def get_task_summary():
+    """
+    Retrieve task counts and story point totals per board column and per sprint, without loading any tasks.
+
+    Optional argument: sprint_id (a sprint ID, or 'none' for the backlog).
+
+    :return: JSON response containing the board summary.
+    """
+    sprint_id = request.args.get('sprint_id')
+    backlog = sprint_id is not None and sprint_id.lower() == 'none'
+    if sprint_id is not None and not backlog and not sprint_id.isdigit():
+        return jsonify({'error': 'sprint_id must be a sprint ID or none'}), 400
+    return jsonify(get_board_summary(sprint_id=None if sprint_id is None or backlog else int(sprint_id),
+                                     backlog=backlog))
+
+
 @app.route('/get_task/<int:task_id>', methods=['GET'])
 def get_task(task_id):
     """
@@ -394,93 +2414,685 @@ def get_task(task_id):
     :param task_id: The ID of the task to retrieve.
     :return: JSON response with the task data or an error message if not found.
     """
-    task = Task.query.get(task_id)
+    task = db.session.get(Task, task_id, options=[undefer(Task.description)])
     if task:
-        return jsonify(get_task_schema(task))
+        response = jsonify(get_task_schema(task))
+        response.set_etag(str(task.version))
+        return response
     return jsonify({'error': 'Task not found'}), 404
 
 
 @app.route('/edit_task/<int:task_id>', methods=['PUT'])
+@admission_controlled
 def edit_task(task_id):
     """
     Edit an existing task based on the task ID and provided data.
 
+    If the request carries an If-Match header (the ETag returned by get_task), the edit is only applied when the task
+    is still at that version; otherwise 412 is returned. An edit that loses a race with a concurrent edit returns 409.
+
     :param task_id: The ID of the task to edit.
     :return: JSON response with the updated task data or an error message.
     """
     try:
-        task = Task.query.get(task_id)
+        task = db.session.get(Task, task_id, options=[undefer(Task.description)])
         if not task:
             return jsonify({'error': 'Task not found'}), 404
 
-        data = request.get_json()
-        update_model_instance(task, data)
+        if request.if_match and not request.if_match.contains(str(task.version)):
+            response = jsonify({'error': 'Task has been modified', 'task': get_task_schema(task)})
+            response.set_etag(str(task.version))
+            return response, 412
+
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'The request body must be an object'}), 400
+        update_model_instance(task, get_editable_fields(data))
+
+        response = jsonify(get_task_schema(task))
+        response.set_etag(str(task.version))
+        return response
+    except StaleDataError:
+        return jsonify({'error': 'Task has been modified'}), 409
+    except Exception as e:
+        record_request_error(e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/tasks/batch', methods=['POST'])
+@admission_controlled
+def batch_tasks():
+    """
+    Apply many task creates, edits and deletes in a single transaction.
+
+    The request body is {'operations': [...], 'mode': 'atomic' | 'best_effort'}, where each operation is
+    {'op': 'create', 'data': {...}}, {'op': 'update', 'id': 1, 'data': {...}} or {'op': 'delete', 'id': 1}.
+
+    :return: JSON response with a result for every operation.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    mode = data.get('mode', 'atomic')
+    if not isinstance(operations, list):
+        return jsonify({'error': "'operations' must be a list."}), 400
+    if mode not in ('atomic', 'best_effort'):
+        return jsonify({'error': "'mode' must be 'atomic' or 'best_effort'."}), 400
+
+    try:
+        applied, results = apply_task_batch(operations, atomic=mode == 'atomic')
+        if applied:
+            status_code = 200
+        elif any(result['status'] == 'conflict' for result in results):
+            status_code = 409
+        else:
+            status_code = 400
+        return jsonify({'applied': applied, 'mode': mode, 'results': results}), status_code
+    except Exception as e:
+        record_request_error(e)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/archived_tasks', methods=['GET'])
+def get_archived_tasks():
+    """
+    Retrieve archived tasks. Supports the query parameters q (search text), limit and offset.
+
+    :return: JSON response containing the list of archived tasks.
+    """
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    offset = request.args.get('offset', 0, type=int)
+    tasks = search_archived_tasks(request.args.get('q'), limit=limit, offset=offset)
+    return jsonify({'tasks': tasks})
+
 
-        return jsonify(get_task_schema(task))
+@app.route('/archived_tasks/<int:task_id>', methods=['GET'])
+def get_archived_task(task_id):
+    """
+    Retrieve and return a specific archived task by its ID.
+
+    :param task_id: The ID of the archived task to retrieve.
+    :return: JSON response with the task data or an error message if not found.
+    """
+    task = db.session.get(ArchivedTask, task_id)
+    if task:
+        return jsonify(get_archived_task_schema(task))
+    return jsonify({'error': 'Task not found'}), 404
+
+
+@app.route('/analytics/tasks', methods=['GET'])
+def get_task_analytics():
+    """
+    Aggregate story points per group from the in-memory task snapshot.
+
+    Query parameters: group_by ('priority', 'status', 'user' or 'tag'), agg ('count', 'sum' or 'mean') and the filters
+    accepted by get_snapshot_mask.
+
+    :return: JSON response with the aggregate for every group.
+    """
+    group_by = request.args.get('group_by', 'status')
+    agg = request.args.get('agg', 'sum')
+    try:
+        snapshot = get_task_snapshot()
+        groups = snapshot.group_by(group_by, agg=agg, mask=get_snapshot_mask(snapshot, request.args))
+    except KeyError as e:
+        return jsonify({'error': f'Unknown value {e}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'group_by': group_by, 'agg': agg, 'groups': groups})
+
+
+@app.route('/analytics/histogram', methods=['GET'])
+def get_story_point_histogram():
+    """
+    Histogram of story points from the in-memory task snapshot.
+
+    Query parameters: bins (number of bins, defaults to one per story point value) and the filters accepted by
+    get_snapshot_mask.
+
+    :return: JSON response with the count in each bin and the bin edges.
+    """
+    try:
+        snapshot = get_task_snapshot()
+        counts, edges = snapshot.histogram(bins=request.args.get('bins', type=int),
+                                           mask=get_snapshot_mask(snapshot, request.args))
+    except KeyError as e:
+        return jsonify({'error': f'Unknown value {e}'}), 400
+    return jsonify({'counts': counts, 'edges': edges})
+
+
+@app.route('/tasks/duplicates', methods=['GET', 'POST'])
+def get_duplicate_suggestions():
+    """
+    Suggest existing tasks that look like near-duplicates of a draft or an existing task.
+
+    Takes title and description (as query arguments or JSON), or task_id to check an existing task.
+
+    :return: JSON response with the likely duplicates and their estimated similarity.
+    """
+    data = request.get_json(silent=True) or request.args
+    if not hasattr(data, 'get'):
+        return jsonify({'error': 'The request body must be an object'}), 400
+    if data.get('task_id') is not None:
+        try:
+            task_id = int(data['task_id'])
+        except (TypeError, ValueError):
+            return jsonify({'error': 'task_id must be an integer'}), 400
+        task = db.session.get(Task, task_id, options=[undefer(Task.description)])
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+        title, description = task.title, task.description
+    else:
+        task_id = None
+        title, description = data.get('title', ''), data.get('description', '')
+        if not title and not description:
+            return jsonify({'error': 'A title, description or task_id is required'}), 400
+
+    return jsonify({'duplicates': find_duplicate_tasks(title, description, exclude=task_id)})
+
+
+@app.route('/forecast', methods=['GET'])
+def get_forecast():
+    """
+    Forecast when the backlog will be done. Query parameters: percentiles (comma separated, default 50,85,95) and
+    simulations.
+
+    :return: JSON response with the sprints and completion date at each confidence level.
+    """
+    try:
+        percentiles = [int(percentile) for percentile in request.args.get('percentiles', '50,85,95').split(',')]
+        if not all(0 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError('Percentiles must be between 0 and 100')
+        simulations = min(request.args.get('simulations', type=int) or app.config['FORECAST_SIMULATIONS'], 200000)
+        return jsonify(get_delivery_forecast(percentiles, simulations))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/sprints/plan', methods=['POST'])
+@admission_controlled
+def plan_sprints_route():
+    """
+    Fill sprints from the backlog by priority within their story point capacity.
+
+    The request body is {'sprints': [{'id': 1, 'capacity': 30}, ...], 'apply': false}. The plan is returned together
+    with the batch operations that apply it; with 'apply' set they are applied atomically straight away.
+
+    :return: JSON response with the plan, the operations and, if applied, the batch results.
+    """
+    data = request.get_json(silent=True) or {}
+    sprints = data.get('sprints')
+    if not isinstance(sprints, list) or not all(
+            isinstance(sprint, dict) and isinstance(sprint.get('id'), int) and isinstance(sprint.get('capacity'), int)
+            for sprint in sprints):
+        return jsonify({'error': "'sprints' must be a list of {'id': int, 'capacity': int}."}), 400
+    if not all(sprint['capacity'] > 0 for sprint in sprints):
+        return jsonify({'error': 'Sprint capacities must be positive.'}), 400
+
+    try:
+        summary, operations = get_sprint_plan_operations(sprints)
+        response = {'sprints': summary, 'operations': operations}
+        if data.get('apply'):
+            applied, results = apply_task_batch(operations)
+            response.update(applied=applied, results=results)
+            if not applied:
+                return jsonify(response), 409
+        return jsonify(response)
     except Exception as e:
+        record_request_error(e)
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/create_user', methods=['POST'])
+@login_required(ROLE_ADMIN)
+@admission_controlled
 def create_user():
     """
     Create a new user with the provided username and password.
 
     :return: Redirect to the create user page with appropriate flash messages.
     """
-    if is_logged_in() and is_admin():
-        new_username = request.form['new_username']
-        new_password = request.form['new_password']
-        if check_user_exists(new_username):
-            flash('Username already exists', category='error')
-        else:
-            user_to_create = User(username=new_username, password=new_password)
-            add_to_db(user_to_create)
-            flash('User created!', category='success')
-        return redirect(url_for('create_user_page'))
+    new_username = request.form['new_username']
+    new_password = request.form['new_password']
+    if check_user_exists(new_username):
+        flash('Username already exists', category='error')
+    else:
+        user_to_create = User(username=new_username,
+                              password=hash_password(new_password, app.config['BCRYPT_LOG_ROUNDS']))
+        add_to_db(user_to_create)
+        flash('User created!', category='success')
+    return redirect(url_for('create_user_page'))
 
 
 @app.route('/change_username', methods=['POST'])
+@login_required(ROLE_ADMIN)
+@admission_controlled
 def change_username():
     """
     Change an existing user's username.
 
     :return: Redirect to the change username page with appropriate flash messages.
     """
-    if is_logged_in() and is_admin():
-        old_username = request.form['old_username']
-        new_username_change = request.form['new_username_change']
-        user = get_model_instance(User, username=old_username)
-        if user:
-            if check_user_exists(new_username_change):
-                flash('New username already exists', category='error')
-            else:
-                user.username = new_username_change
-                db.session.commit()
-                flash('Username updated!', category='success')
+    old_username = request.form['old_username']
+    new_username_change = request.form['new_username_change']
+    # one query answers both whether the user exists and whether the new name is taken
+    users = {user.username: user for user in
+             User.query.filter(User.username.in_([old_username, new_username_change])).all()}
+    user = users.get(old_username)
+    if user:
+        if new_username_change in users:
+            flash('New username already exists', category='error')
         else:
-            flash('Username not found', category='error')
-        return redirect(url_for('change_username_page'))
+            user.username = new_username_change
+            db.session.commit()
+            invalidate_user_sessions(user)
+            flash('Username updated!', category='success')
+    else:
+        flash('Username not found', category='error')
+    return redirect(url_for('change_username_page'))
 
 
 @app.route('/change_password', methods=['POST'])
+@login_required(ROLE_ADMIN)
+@admission_controlled
 def change_password():
     """
     Change an existing user's password.
 
     :return: Redirect to the change password page with appropriate flash messages.
     """
-    if is_logged_in() and is_admin():
-        form_username = request.form['username']
-        new_password_change = request.form['new_password_change']
-        user = get_model_instance(User, username=form_username)
-        if user:
-            user.password = new_password_change
-            db.session.commit()
-            flash('Password updated!', category='success')
-        else:
-            flash('Username not found', category='error')
-        return redirect(url_for('change_password_page'))
+    form_username = request.form['username']
+    new_password_change = request.form['new_password_change']
+    user = get_model_instance(User, username=form_username)
+    if user:
+        user.password = hash_password(new_password_change, app.config['BCRYPT_LOG_ROUNDS'])
+        db.session.commit()
+        invalidate_user_sessions(user)
+        flash('Password updated!', category='success')
+    else:
+        flash('Username not found', category='error')
+    return redirect(url_for('change_password_page'))
+
+
+@app.route('/jobs', methods=['POST'])
+@login_required(ROLE_ADMIN)
+def submit_job():
+    """
+    Submit a background job: {"kind": ..., "params": {...}, "dedup_key": optional}.
+
+    While a job of the same kind and key (by default, the same project and parameters) is queued or running, the
+    existing job is returned instead of starting another.
+
+    :return: JSON response with the job, 202 Accepted.
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('kind') not in job_runner.kinds:
+        return jsonify({'error': f'kind must be one of {job_runner.kinds}'}), 400
+    if not isinstance(data.get('params', {}), dict):
+        return jsonify({'error': 'params must be an object'}), 400
+    job_id, deduplicated = job_runner.submit(data['kind'], data.get('params'), dedup_key=data.get('dedup_key'),
+                                             project_id=get_current_project_id())
+    response = jsonify({'job': get_job_schema(db.session.get(Job, job_id)), 'deduplicated': deduplicated})
+    response.headers['Location'] = url_for('get_job', job_id=job_id)
+    return response, 202
+
+
+@app.route('/jobs', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def get_jobs():
+    """
+    List the most recent background jobs, optionally filtered by status.
+
+    :return: JSON response containing the jobs, newest first.
+    """
+    query = select(Job).order_by(Job.id.desc()).limit(min(request.args.get('limit', 50, type=int), 500))
+    if request.args.get('status'):
+        query = query.where(Job.status == request.args['status'])
+    return jsonify({'jobs': [get_job_schema(job) for job in db.session.scalars(query)]})
+
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def get_job(job_id):
+    """
+    Poll a background job's status, progress and result.
+
+    :param job_id: The ID of the job.
+    :return: JSON response with the job or an error message if not found.
+    """
+    job = db.session.get(Job, job_id, populate_existing=True)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(get_job_schema(job))
+
+
+@app.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@login_required(ROLE_ADMIN)
+def cancel_job(job_id):
+    """
+    Cancel a background job. A queued job is cancelled immediately; a running job stops at its next progress report.
+
+    :param job_id: The ID of the job.
+    :return: JSON response with the job, 409 if it has already finished, or 404 if not found.
+    """
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    cancelled = job_runner.cancel(job_id)
+    db.session.refresh(job)
+    if not cancelled:
+        return jsonify({'error': 'Job has already finished', 'job': get_job_schema(job)}), 409
+    return jsonify(get_job_schema(job))
+
+
+@app.route('/export', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def export_data():
+    """
+    Stream the current project's data as NDJSON: users, tasks, archived tasks, and sprint activity and logs where
+    present. Optional argument: tables, a comma separated list of table names.
+
+    :return: Streamed NDJSON download.
+    """
+    try:
+        tables = get_transfer_tables(request.args['tables'].split(',') if request.args.get('tables') else None)
+    except KeyError as e:
+        return jsonify({'error': f'Unknown table {e}'}), 400
+    response = Response(stream_with_context(export_ndjson(db.session, tables)), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = 'attachment; filename=export.ndjson'
+    return response
+
+
+@app.route('/import', methods=['POST'])
+@login_required(ROLE_ADMIN)
+@admission_controlled
+def import_data():
+    """
+    Import an NDJSON export (uploaded as 'file' or sent as the body), in batches of IMPORT_BATCH_SIZE rows.
+
+    Progress is streamed as NDJSON, one line per committed batch with the last committed line number. If the import
+    fails, the final line holds the error; sending the same file again with start_line set to the last committed line
+    resumes it.
+
+    :return: Streamed progress.
+    """
+    lines = get_uploaded_lines()
+
+    def generate():
+        report = {'line': request.args.get('start_line', 0, type=int), 'imported': {}}
+        try:
+            for report in import_ndjson(db.session, get_transfer_tables(), lines,
+                                        batch_size=app.config['IMPORT_BATCH_SIZE'], start_line=report['line']):
+                yield json.dumps(report) + '\n'
+            yield json.dumps({**report, 'done': True}) + '\n'
+        except ValueError as e:
+            yield json.dumps({**report, 'error': str(e)}) + '\n'
+        finally:
+            lines.close()
+            if report['imported'].get(User.__tablename__):
+                bump_identity_version()  # imported users may have new passwords or roles
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/metrics', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def get_metrics():
+    """
+    Retrieve the counters shared by every worker process, such as admission control rejections per route, this
+    process's template fragment cache statistics, and the lag of each read replica.
+
+    :return: JSON response with the counter values.
+    """
+    counters = get_admission_state().counters() if app.config['ADMISSION_CONTROL'] else {}
+    metrics = {'counters': counters}
+    fragment_cache = app.jinja_env.fragment_cache
+    if fragment_cache is not None:
+        # kept by each worker process, unlike the shared counters
+        metrics['template_fragments'] = {'hits': fragment_cache.hits, 'misses': fragment_cache.misses,
+                                         'size': len(fragment_cache)}
+    if replica_set is not None:
+        metrics['replicas'] = replica_set.status()
+    return jsonify(metrics)
+
+
+@app.route('/admin/profile', methods=['POST'])
+@login_required(ROLE_ADMIN)
+def profile_worker():
+    """
+    Profile the worker process that handles this request, by sampling the stacks of its other threads for the given
+    number of seconds (default 10). The request returns once the profile is done.
+
+    The profile is returned in collapsed-stack format (one 'frame;frame;... count' line per stack, the input of
+    flamegraph.pl and speedscope) and kept with the slow request profiles.
+
+    :return: The profile as plain text, or a JSON error if the duration is invalid or a profile is already running.
+    """
+    seconds = request.args.get('seconds', 10, type=float)
+    if not 0 < seconds <= app.config['PROFILE_MAX_DURATION']:
+        return jsonify({'error': f"seconds must be between 0 and {app.config['PROFILE_MAX_DURATION']}"}), 400
+    try:
+        counts = profiler.sample(seconds)
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    name = get_profile_ring().save(counts, 'on-demand', trigger='admin', seconds=seconds, pid=os.getpid())
+    return Response(format_collapsed(counts), mimetype='text/plain', headers={'X-Profile-Name': name})
+
+
+@app.route('/admin/profiles', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def list_profiles():
+    """
+    List the stored profiles, newest first.
+
+    :return: JSON response with the metadata of each profile.
+    """
+    return jsonify({'profiles': get_profile_ring().list_profiles()})
+
+
+@app.route('/admin/profiles/<name>', methods=['GET'])
+@login_required(ROLE_ADMIN)
+def get_profile(name):
+    """
+    Retrieve a stored profile in collapsed-stack format.
+
+    :param name: The name of the profile.
+    :return: The profile as plain text, or a JSON error if not found.
+    """
+    profile = get_profile_ring().read(name)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(profile, mimetype='text/plain')
+
+
+@app.route('/users/provision', methods=['POST'])
+@login_required(ROLE_ADMIN)
+@admission_controlled
+def provision_users_route():
+    """
+    Create users in bulk from a CSV with username, password and optional role columns, uploaded as the 'file' form
+    field or sent as the request body.
+
+    Progress is streamed as newline-delimited JSON: the running totals after each committed batch, then a final line
+    (with done set) that also lists the skipped rows.
+
+    :return: Streamed progress, or a JSON error if the CSV header is invalid.
+    """
+    lines = get_uploaded_lines()
+    try:
+        users = read_users_csv(lines)
+    except ValueError as e:
+        lines.close()
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        report = {'processed': 0, 'created': 0, 'skipped': []}
+        try:
+            for report in provision_users(db.session, User, users, batch_size=app.config['PROVISIONING_BATCH_SIZE'],
+                                          rounds=app.config['BCRYPT_LOG_ROUNDS'],
+                                          processes=app.config['PROVISIONING_PROCESSES']):
+                yield json.dumps({**report, 'skipped': len(report['skipped'])}) + '\n'
+        finally:
+            lines.close()
+        yield json.dumps({**report, 'done': True}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# --- Commands ---
+@app.cli.command('archive-tasks')
+@click.option('--days', type=int, default=None, help='Archive tasks completed more than this many days ago.')
+@click.option('--batch-size', type=int, default=None, help='Maximum tasks moved per transaction.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches.')
+def archive_tasks_command(days, batch_size, pause):
+    """
+    Move old completed tasks out of the live task table.
+    """
+    archived = archive_completed_tasks(max_age_days=days, batch_size=batch_size, pause=pause)
+    click.echo(f'Archived {archived} tasks.')
+
+
+@app.cli.command('repair-task-counters')
+def repair_task_counters_command():
+    """
+    Rebuild the board counters from the task table, in every shard when sharding is enabled.
+    """
+    for project_id in shard_directory.project_ids() if shard_directory else [None]:
+        g.project_id = project_id
+        repaired = repair_task_counters()
+        prefix = f'Project {project_id}: ' if project_id is not None else ''
+        click.echo(f'{prefix}Repaired {repaired} task counters.')
+
+
+@app.cli.command('provision-users')
+@click.argument('csv_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', type=int, default=None, help='Maximum users inserted per transaction.')
+@click.option('--processes', type=int, default=None, help='Number of password hashing processes.')
+def provision_users_command(csv_file, batch_size, processes):
+    """
+    Create users in bulk from a CSV file with username, password and optional role columns.
+    """
+    with open(csv_file, encoding='utf-8-sig', newline='') as lines:
+        report = {'processed': 0, 'created': 0, 'skipped': []}
+        for report in provision_users(db.session, User, read_users_csv(lines),
+                                      batch_size=batch_size or app.config['PROVISIONING_BATCH_SIZE'],
+                                      rounds=app.config['BCRYPT_LOG_ROUNDS'],
+                                      processes=processes or app.config['PROVISIONING_PROCESSES']):
+            click.echo(f"Processed {report['processed']} rows, created {report['created']} users.")
+    for skipped in report['skipped']:
+        click.echo(f"Skipped line {skipped['line']} ({skipped['username']}): {skipped['reason']}")
+
+
+@app.cli.command('export-data')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--tables', default=None, help='Comma separated tables to export (default: all).')
+def export_data_command(path, tables):
+    """
+    Export users, tasks, archived tasks and sprint activity to an NDJSON file.
+    """
+    rows = -1
+    tables = get_transfer_tables(tables.split(',') if tables else None)
+    with open(path, 'w', encoding='utf-8') as export:
+        for rows, line in enumerate(export_ndjson(db.session, tables)):
+            export.write(line)
+    click.echo(f'Exported {rows} rows to {path}')
+
+
+@app.cli.command('import-data')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', type=int, default=None, help='Maximum rows inserted per transaction.')
+@click.option('--checkpoint', default=None, help='Checkpoint file (default: PATH.checkpoint).')
+def import_data_command(path, batch_size, checkpoint):
+    """
+    Import an NDJSON export. An interrupted import resumes from its checkpoint when run again.
+    """
+    checkpoint = checkpoint or f'{path}.checkpoint'
+    report = {'imported': {}}
+    with open(path, encoding='utf-8') as lines:
+        try:
+            for report in import_ndjson(db.session, get_transfer_tables(), lines,
+                                        batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+                                        checkpoint_path=checkpoint):
+                click.echo(f"Imported up to line {report['line']}: {report['imported']}")
+        except ValueError as e:
+            raise click.ClickException(f'{e}. Run the command again to resume after the last committed line.')
+        finally:
+            if report['imported'].get(User.__tablename__):
+                bump_identity_version()  # imported users may have new passwords or roles
+    os.remove(checkpoint)
+
+
+@app.cli.command('backup')
+def backup_command():
+    """
+    Back up the databases online, verify the backup and rotate old backups.
+    """
+    backup = run_backup()
+    click.echo(f"Backed up to {backup['path']}")
+    for database, file in backup['files'].items():
+        click.echo(f"  {database}: {file['size']} bytes, sha256 {file['sha256']}, {file['steps']} steps, "
+                   f"{file['restarts']} restarts")
+    for path in backup['removed']:
+        click.echo(f'Removed old backup {path}')
+
+
+@app.cli.command('verify-backup')
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+def verify_backup_command(path):
+    """
+    Check a backup's files against its checksums and SQLite's integrity check.
+    """
+    problems = verify_backup(path)
+    for problem in problems:
+        click.echo(problem)
+    if problems:
+        raise click.ClickException('Backup failed verification')
+    click.echo('Backup verified.')
+
+
+@app.cli.command('restore-backup')
+@click.argument('path', type=click.Path(exists=True, file_okay=False))
+@click.confirmation_option(prompt='This overwrites the live databases. Continue?')
+def restore_backup_command(path):
+    """
+    Verify a backup and restore it over the databases it was taken from.
+    """
+    try:
+        restored = restore_backup(path, pages=app.config['BACKUP_PAGES_PER_STEP'])
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for database, target in restored.items():
+        click.echo(f'Restored {database} to {target}')
+
+
+@app.cli.command('compile-templates')
+def compile_templates_command():
+    """
+    Compile every template into the bytecode cache, so the first requests after a deploy or restart skip compiling.
+    """
+    if app.jinja_env.bytecode_cache is None:
+        raise click.ClickException('TEMPLATE_BYTECODE_CACHE is disabled')
+    templates = app.jinja_env.list_templates()
+    app.jinja_env.cache.clear()  # load from the loader, not from templates this process already compiled
+    for name in templates:
+        app.jinja_env.get_template(name)
+    click.echo(f'Compiled {len(templates)} templates.')
+
+
+@app.cli.command('split-shards')
+@click.option('--batch-size', type=int, default=1000, help='Maximum rows written per transaction.')
+def split_shards_command(batch_size):
+    """
+    Copy per-project tables from the main database into one shard file per project.
+    """
+    shards = shard_directory or ShardDirectory(
+        app.config['SHARD_DIRECTORY'] or os.path.join(app.instance_path, 'shards'),
+        db.metadata,
+        app.config['SHARDED_TABLES']
+    )
+    copied = split_database(db.engine, shards, batch_size=batch_size)
+    for project_id, rows in sorted(copied.items()):
+        click.echo(f'Project {project_id}: copied {rows} rows to {shards.path_for(project_id)}')
+    shards.dispose()
 
 
 if __name__ == '__main__':
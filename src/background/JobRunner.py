@@ -0,0 +1,248 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested, by JobContext.progress and JobContext.check_cancelled"""
+
+
+class JobContext:
+    """JobContext is what a running job sees of its job row.
+
+    Attributes:
+    job_id (int): ID of the job
+    kind (str): Kind of the job
+    params (dict): Parameters the job was submitted with
+    project_id (int | None): Project the job was submitted for
+    """
+
+    def __init__(self, runner: 'JobRunner', job_id: int, kind: str, params: dict, project_id: int | None):
+        self.job_id = job_id
+        self.kind = kind
+        self.params = params
+        self.project_id = project_id
+        self._runner = runner
+
+    def progress(self, fraction: float):
+        """Record progress, which also marks the job as alive, and stop if cancellation was requested
+
+        Args:
+            fraction (float): Fraction of the work done, from 0 to 1
+
+        Raises:
+            JobCancelled: The job was cancelled
+        """
+        self._runner._record_progress(self.job_id, min(max(fraction, 0.0), 1.0))
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        """Stop if cancellation was requested
+
+        Raises:
+            JobCancelled: The job was cancelled
+        """
+        if self._runner._is_cancel_requested(self.job_id):
+            raise JobCancelled()
+
+
+class JobRunner:
+    """JobRunner runs long operations on a bounded thread pool, outside the request that asked for them.
+
+    The job table is the queue: every job is recorded before it is handed to the pool, and the pool only receives job
+    IDs. A worker claims a job with a conditional update (queued to running), so a job handed to the pool twice, by
+    recovery in two processes for example, still runs once. When the process restarts, recover() hands queued jobs to
+    the pool again, along with running jobs that have not reported progress for stale_after seconds.
+
+    Jobs of the same kind with the same deduplication key are not run concurrently: submitting one while another is
+    queued or running returns the existing job. The job model must enforce this with a unique index on (kind,
+    dedup_key) restricted to active jobs.
+
+    Handlers are registered per kind. They receive a JobContext and return a JSON-serialisable result (e.g. counts, or
+    the location of a file they wrote). Cancellation is cooperative: a cancelled queued job never starts, and a running
+    job stops at its next progress report.
+
+    Attributes:
+    max_workers (int): Maximum number of jobs running at once in this process
+    stale_after (float): Seconds without progress after which recover() treats a running job as abandoned
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], model, max_workers: int = 2, stale_after: float = 300.0):
+        """Initialises a JobRunner
+
+        Args:
+            session_factory (Callable[[], Session]): Creates the sessions used to read and update jobs
+            model (db.Model): The job model
+            max_workers (int): Maximum number of jobs running at once
+            stale_after (float): Seconds without progress after which a running job is treated as abandoned
+        """
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self._session_factory = session_factory
+        self._model = model
+        self._handlers: dict[str, Callable[[JobContext], Any]] = {}
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def kinds(self) -> list[str]:
+        return sorted(self._handlers)
+
+    def register(self, kind: str, handler: Callable[[JobContext], Any]):
+        """Register the handler of a kind of job
+
+        Args:
+            kind (str): Name of the kind of job
+            handler (Callable[[JobContext], Any]): Runs a job and returns its result
+        """
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: dict = None, dedup_key: str = None, project_id: int = None) -> tuple[int, bool]:
+        """Record a job and queue it
+
+        Args:
+            kind (str): Kind of job, which must have a registered handler
+            params (dict): JSON-serialisable parameters for the handler
+            dedup_key (str): Jobs of a kind with the same key are not run concurrently; defaults to the project and
+                parameters
+            project_id (int): Project the job is for
+
+        Returns:
+            tuple[int, bool]: The job ID, and whether an already active job was returned instead of a new one
+
+        Raises:
+            KeyError: No handler is registered for the kind
+        """
+        if kind not in self._handlers:
+            raise KeyError(f'Unknown job kind: {kind}')
+        params = params or {}
+        if dedup_key is None:
+            dedup_key = json.dumps([project_id, params], sort_keys=True)
+
+        with self._session_factory() as session:
+            job = self._model(kind=kind, dedup_key=dedup_key, params=json.dumps(params), status=QUEUED, progress=0.0,
+                              project_id=project_id, created_at=datetime.now(), updated_at=datetime.now())
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                existing = session.scalar(select(self._model.id).where(
+                    self._model.kind == kind, self._model.dedup_key == dedup_key,
+                    self._model.status.in_(ACTIVE_STATUSES)
+                ))
+                if existing is not None:
+                    return existing, True
+                raise
+            job_id = job.id
+        self._get_executor().submit(self._run, job_id)
+        return job_id, False
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job. A queued job is cancelled at once; a running job stops at its next progress report
+
+        Args:
+            job_id (int): ID of the job
+
+        Returns:
+            bool: False if the job does not exist or has already finished
+        """
+        model = self._model
+        with self._session_factory() as session:
+            cancelled = session.execute(
+                update(model).where(model.id == job_id, model.status == QUEUED)
+                .values(status=CANCELLED, cancel_requested=True, finished_at=datetime.now(), updated_at=datetime.now())
+            ).rowcount
+            if not cancelled:
+                cancelled = session.execute(
+                    update(model).where(model.id == job_id, model.status == RUNNING).values(cancel_requested=True)
+                ).rowcount
+            session.commit()
+        return bool(cancelled)
+
+    def recover(self) -> int:
+        """Queue again the jobs left behind by a previous process: queued jobs and abandoned running jobs
+
+        Returns:
+            int: The number of jobs queued again
+        """
+        model = self._model
+        with self._session_factory() as session:
+            session.execute(
+                update(model)
+                .where(model.status == RUNNING,
+                       model.updated_at < datetime.now() - timedelta(seconds=self.stale_after))
+                .values(status=QUEUED, updated_at=datetime.now())
+            )
+            session.commit()
+            job_ids = session.scalars(
+                select(model.id).where(model.status == QUEUED, model.kind.in_(self._handlers)).order_by(model.id)
+            ).all()
+        for job_id in job_ids:
+            self._get_executor().submit(self._run, job_id)
+        return len(job_ids)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads. Jobs that have not started stay queued until the next recover()
+
+        Args:
+            wait (bool): Whether to wait for the running jobs to finish
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            return self._executor
+
+    def _run(self, job_id: int):
+        model = self._model
+        with self._session_factory() as session:
+            claimed = session.execute(
+                update(model).where(model.id == job_id, model.status == QUEUED)
+                .values(status=RUNNING, started_at=datetime.now(), updated_at=datetime.now())
+            ).rowcount
+            session.commit()
+            if not claimed:
+                return
+            job = session.get(model, job_id)
+            context = JobContext(self, job.id, job.kind, json.loads(job.params), job.project_id)
+
+        try:
+            result = self._handlers[context.kind](context)
+            values = {'status': SUCCEEDED, 'progress': 1.0, 'result': json.dumps(result)}
+        except JobCancelled:
+            values = {'status': CANCELLED}
+        except Exception as e:
+            values = {'status': FAILED, 'error': f'{type(e).__name__}: {e}'}
+        with self._session_factory() as session:
+            session.execute(update(model).where(model.id == job_id)
+                            .values(**values, finished_at=datetime.now(), updated_at=datetime.now()))
+            session.commit()
+
+    def _record_progress(self, job_id: int, fraction: float):
+        with self._session_factory() as session:
+            session.execute(update(self._model).where(self._model.id == job_id)
+                            .values(progress=fraction, updated_at=datetime.now()))
+            session.commit()
+
+    def _is_cancel_requested(self, job_id: int) -> bool:
+        with self._session_factory() as session:
+            return bool(session.scalar(select(self._model.cancel_requested).where(self._model.id == job_id)))
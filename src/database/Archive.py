@@ -0,0 +1,60 @@
+import time
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.orm import Session
+
+
+def archive_in_batches(session: Session, model, archive_model, condition, batch_size: int = 500,
+                       pause: float = 0.0, on_batch: Callable[[int], None] = None) -> int:
+    """Move the rows of model that match condition into archive_model, one bounded batch per transaction.
+
+    Each batch copies at most batch_size rows with INSERT ... SELECT and deletes them from the live table in the same
+    transaction, so the write lock is only held for one batch at a time and other writers can interleave between
+    batches. The archive model must have every column of the live model plus an 'archived_at' column.
+
+    Args:
+        session (Session): Session used to run the batches, committed after every batch and rolled back if a batch
+            fails
+        model (db.Model): The live model to move rows out of
+        archive_model (db.Model): The archive model to move rows into
+        condition (ColumnElement): Which rows of model to archive
+        batch_size (int): Maximum number of rows moved per transaction
+        pause (float): Seconds to sleep between batches, to give other writers a turn
+        on_batch (Callable[[int], None]): Called with the running total after each committed batch; an exception it
+            raises stops the archiving after that batch
+
+    Returns:
+        int: The number of rows archived
+    """
+    table = model.__table__
+    # computed columns are derived by the database and cannot be inserted
+    columns = [column for column in table.columns if column.computed is None]
+    archived = 0
+    while True:
+        ids = session.scalars(select(table.c.id).where(condition).order_by(table.c.id).limit(batch_size)).all()
+        if not ids:
+            break
+
+        # re-check the condition inside the write transaction in case a row changed after it was selected
+        batch = (table.c.id.in_(ids), condition)
+        try:
+            session.execute(insert(archive_model.__table__).from_select(
+                [column.name for column in columns] + ['archived_at'],
+                select(*columns, literal(datetime.now())).where(*batch)
+            ))
+            deleted = session.execute(delete(table).where(*batch)).rowcount
+            session.commit()
+        except Exception:
+            # leave neither half of the batch behind in the session
+            session.rollback()
+            raise
+        archived += deleted
+        if on_batch:
+            on_batch(archived)
+
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+    return archived
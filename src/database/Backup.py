@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable
+
+MANIFEST = 'manifest.json'
+PARTIAL_SUFFIX = '.partial'
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup_file(source: str, destination: str, pages: int = 256, sleep: float = 0.01,
+                max_restarts: int = 10) -> dict:
+    """Copy a live SQLite database with the online backup API
+
+    Pages are copied a bounded number at a time, sleeping in between, so the source is only locked for one short step
+    at a time and other connections can read and write between steps. A write to the source by another connection
+    makes SQLite restart the copy; after max_restarts restarts the rest is copied in a single step instead, so a busy
+    database is still backed up.
+
+    Args:
+        source (str): Path of the database to copy
+        destination (str): Path of the copy, which is overwritten
+        pages (int): Pages copied per step
+        sleep (float): Seconds to sleep between steps
+        max_restarts (int): Restarts tolerated before falling back to a single step
+
+    Returns:
+        dict: The copy's SHA-256 checksum and size, and the number of steps and restarts taken
+    """
+    stats = {'steps': 0, 'restarts': 0}
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        stats['steps'] += 1
+        if last_remaining is not None and remaining > last_remaining:
+            stats['restarts'] += 1
+            if stats['restarts'] > max_restarts:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if remaining:
+            time.sleep(sleep)
+
+    source_connection = sqlite3.connect(source)
+    destination_connection = sqlite3.connect(destination)
+    try:
+        try:
+            source_connection.backup(destination_connection, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            source_connection.backup(destination_connection, pages=-1)
+    finally:
+        destination_connection.close()
+        source_connection.close()
+    return {'sha256': get_checksum(destination), 'size': os.path.getsize(destination), **stats}
+
+
+def create_backup(sources: dict[str, str], directory: str, pages: int = 256, sleep: float = 0.01,
+                  on_file: Callable[[int], None] = None) -> str:
+    """Back up a set of databases (e.g. the main database and its shards) into a new timestamped backup directory
+
+    The backup is written to a '.partial' directory and renamed once every file and the manifest (checksums and sizes)
+    are written, so an interrupted backup is never mistaken for a complete one.
+
+    Args:
+        sources (dict[str, str]): Database paths by name, e.g. {'main': 'instance/sql_database.db'}
+        directory (str): Directory holding the backups
+        pages (int): Pages copied per step
+        sleep (float): Seconds to sleep between steps
+        on_file (Callable[[int], None]): Called with the number of databases copied so far after each one; an exception
+            it raises stops the backup
+
+    Returns:
+        str: Path of the backup directory
+    """
+    name = datetime.now().strftime('%Y%m%dT%H%M%S_%f')
+    path = os.path.join(directory, name)
+    partial = path + PARTIAL_SUFFIX
+    os.makedirs(partial)
+    try:
+        files = {}
+        for database, source in sources.items():
+            files[database] = {'source': os.path.abspath(source),
+                               **backup_file(source, os.path.join(partial, f'{database}.db'), pages, sleep)}
+            if on_file:
+                on_file(len(files))
+        with open(os.path.join(partial, MANIFEST), 'w') as manifest:
+            json.dump({'created_at': datetime.now().isoformat(), 'files': files}, manifest, indent=2)
+        os.rename(partial, path)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    return path
+
+
+def verify_backup(path: str) -> list[str]:
+    """Check a backup against its manifest: every file must match its checksum and pass SQLite's integrity check
+
+    Args:
+        path (str): Path of the backup directory
+
+    Returns:
+        list[str]: The problems found, empty if the backup is sound
+    """
+    try:
+        with open(os.path.join(path, MANIFEST)) as manifest:
+            files = json.load(manifest)['files']
+    except (OSError, ValueError, KeyError) as e:
+        return [f'unreadable manifest: {e}']
+    problems = []
+    for database, expected in files.items():
+        file = os.path.join(path, f'{database}.db')
+        if not os.path.exists(file):
+            problems.append(f'{database}: missing')
+            continue
+        if get_checksum(file) != expected['sha256']:
+            problems.append(f'{database}: checksum mismatch')
+            continue
+        connection = sqlite3.connect(f'file:{file}?mode=ro', uri=True)
+        try:
+            result = connection.execute('PRAGMA integrity_check').fetchone()[0]
+        finally:
+            connection.close()
+        if result != 'ok':
+            problems.append(f'{database}: integrity check failed ({result})')
+    return problems
+
+
+def list_backups(directory: str) -> list[str]:
+    """List the complete backups in a directory, oldest first
+
+    Args:
+        directory (str): Directory holding the backups
+
+    Returns:
+        list[str]: Paths of the backup directories
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if not name.endswith(PARTIAL_SUFFIX) and os.path.exists(os.path.join(directory, name, MANIFEST))]
+
+
+def rotate_backups(directory: str, keep: int) -> list[str]:
+    """Delete all but the newest keep backups
+
+    Args:
+        directory (str): Directory holding the backups
+        keep (int): Number of backups to keep
+
+    Returns:
+        list[str]: Paths of the deleted backups
+    """
+    backups = list_backups(directory)
+    expired = backups[:max(len(backups) - keep, 0)]
+    for path in expired:
+        shutil.rmtree(path)
+    return expired
+
+
+def restore_backup(path: str, targets: dict[str, str] = None, pages: int = 256, sleep: float = 0.0) -> dict[str, str]:
+    """Restore a verified backup over live databases, through the backup API so open connections see the new content
+
+    Args:
+        path (str): Path of the backup directory
+        targets (dict[str, str]): Database paths to restore by name, defaulting to the sources in the manifest
+        pages (int): Pages copied per step
+        sleep (float): Seconds to sleep between steps
+
+    Returns:
+        dict[str, str]: The restored database paths by name
+
+    Raises:
+        ValueError: The backup failed verification, or has no file for a target
+    """
+    problems = verify_backup(path)
+    if problems:
+        raise ValueError('Backup failed verification: ' + '; '.join(problems))
+    with open(os.path.join(path, MANIFEST)) as manifest:
+        files = json.load(manifest)['files']
+    targets = targets or {database: file['source'] for database, file in files.items()}
+    for database in targets:
+        if database not in files:
+            raise ValueError(f'Backup has no {database} database')
+    for database, target in targets.items():
+        backup_file(os.path.join(path, f'{database}.db'), target, pages=pages, sleep=sleep)
+    return targets
+
+
+def get_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,180 @@
+import itertools
+import os
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+
+from src.database.Backup import backup_file
+
+HEARTBEAT_TABLE = 'replica_heartbeat'
+
+
+def create_replica_engine(uri: str) -> Engine:
+    """Create the engine for a read replica
+
+    SQLite file replicas are opened read-only, so a missing replica file fails to connect (and the replica is skipped)
+    instead of being created empty.
+
+    Args:
+        uri (str): The replica's database URI
+
+    Returns:
+        Engine: The replica engine
+    """
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database and url.database != ':memory:':
+        return create_engine(f'sqlite:///file:{os.path.abspath(url.database)}?mode=ro&uri=true')
+    return create_engine(url)
+
+
+def get_replica_path(uri: str) -> str | None:
+    """Get the file of a SQLite replica, which can be refreshed with refresh_replica
+
+    Args:
+        uri (str): The replica's database URI
+
+    Returns:
+        str | None: The replica's file path, or None if the replica is not a SQLite file
+    """
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return url.database
+
+
+def write_heartbeat(engine: Engine, min_interval: float = 0.0, now: float = None) -> float | None:
+    """Record the current time in the primary's heartbeat row
+
+    A replica's copy of the row tells how far behind the primary it is: every transaction committed on the primary
+    before the heartbeat is also on a replica holding that heartbeat. The row is only updated if its heartbeat is at
+    least min_interval seconds old, which lets one of several processes refreshing the same replicas claim each round.
+
+    Args:
+        engine (Engine): The primary database engine
+        min_interval (float): Seconds that must have passed since the last heartbeat
+        now (float): The time to record, the current time by default
+
+    Returns:
+        float | None: The recorded time, or None if the last heartbeat is more recent than min_interval
+    """
+    now = time.time() if now is None else now
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            f'INSERT INTO {HEARTBEAT_TABLE} (id, beat_at) VALUES (1, :now) '
+            f'ON CONFLICT (id) DO UPDATE SET beat_at = excluded.beat_at '
+            f'WHERE {HEARTBEAT_TABLE}.beat_at <= :now - :min_interval'
+        ), {'now': now, 'min_interval': min_interval})
+    return now if result.rowcount else None
+
+
+def refresh_replica(primary: str, replica: str, pages: int = -1, sleep: float = 0.0) -> dict:
+    """Copy the primary SQLite database over a replica file with the online backup API
+
+    The copy is made in place, so connections already reading the replica see the new data from their next
+    transaction; they wait (up to their busy timeout) while the pages are written.
+
+    Args:
+        primary (str): Path of the primary database
+        replica (str): Path of the replica, created if missing
+        pages (int): Pages copied per step, all at once by default to keep readers waiting for as short as possible
+        sleep (float): Seconds to sleep between steps
+
+    Returns:
+        dict: The copy's checksum, size, steps and restarts, as returned by backup_file
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(replica)), exist_ok=True)
+    return backup_file(primary, replica, pages=pages, sleep=sleep)
+
+
+class ReplicaSet:
+    """ReplicaSet chooses which read replica, if any, a read should go to.
+
+    Each replica's lag is read from its copy of the heartbeat row (see write_heartbeat), at most once per check_interval
+    seconds. A replica is only chosen while its lag is at most max_lag; a replica whose file or heartbeat is missing or
+    that fails to answer is skipped, and with no usable replica choose returns None so the read goes to the primary.
+
+    Attributes:
+    engines (list[Engine]): The replica engines
+    max_lag (float): Seconds a replica may be behind the primary and still be read from
+    check_interval (float): Seconds a replica's heartbeat is reused before it is read again
+    """
+
+    def __init__(self, engines: list[Engine], max_lag: float, check_interval: float = 1.0,
+                 clock: Callable[[], float] = time.time):
+        """Initialises a ReplicaSet
+
+        Args:
+            engines (list[Engine]): The replica engines
+            max_lag (float): Seconds a replica may be behind the primary and still be read from
+            check_interval (float): Seconds a replica's heartbeat is reused before it is read again
+            clock (Callable[[], float]): Returns the current time, as time.time does
+        """
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._clock = clock
+        self._heartbeats: dict[int, tuple[float, float | None]] = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def heartbeat(self, index: int) -> float | None:
+        """Get a replica's heartbeat, reading it again if the last read is older than check_interval
+
+        Args:
+            index (int): Position of the replica in engines
+
+        Returns:
+            float | None: The last heartbeat the replica has received, or None if it could not be read
+        """
+        now = self._clock()
+        checked_at, beat_at = self._heartbeats.get(index, (None, None))
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return beat_at
+        try:
+            with self.engines[index].connect() as connection:
+                beat_at = connection.execute(text(f'SELECT beat_at FROM {HEARTBEAT_TABLE} WHERE id = 1')).scalar()
+        except Exception:
+            beat_at = None
+        self._heartbeats[index] = (now, beat_at)
+        return beat_at
+
+    def choose(self, since: float = None) -> Engine | None:
+        """Choose a replica to read from, taking turns between the usable ones
+
+        Args:
+            since (float): Only choose a replica whose heartbeat is at least this recent, e.g. the time of the session's
+                last write, so the session reads its own writes
+
+        Returns:
+            Engine | None: A usable replica, or None if the read should go to the primary
+        """
+        now = self._clock()
+        usable = []
+        for index, engine in enumerate(self.engines):
+            beat_at = self.heartbeat(index)
+            if beat_at is not None and now - beat_at <= self.max_lag and (since is None or beat_at >= since):
+                usable.append(engine)
+        if not usable:
+            return None
+        with self._lock:
+            turn = next(self._turn)
+        return usable[turn % len(usable)]
+
+    def status(self) -> list[dict]:
+        """Describe each replica, for monitoring
+
+        Returns:
+            list[dict]: Each replica's URL (without password), lag in seconds (None if unreachable) and whether it is
+                used
+        """
+        now = self._clock()
+        replicas = []
+        for index, engine in enumerate(self.engines):
+            beat_at = self.heartbeat(index)
+            lag = None if beat_at is None else round(now - beat_at, 3)
+            replicas.append({'url': engine.url.render_as_string(hide_password=True), 'lag': lag,
+                             'usable': lag is not None and lag <= self.max_lag})
+        return replicas
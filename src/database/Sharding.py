@@ -0,0 +1,178 @@
+import os
+import re
+import threading
+import time
+
+import sqlalchemy as sa
+from sqlalchemy import MetaData, create_engine, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.util import find_tables
+
+SHARD_FILENAME = re.compile(r'^project_(\d+)\.db$')
+
+
+class ShardDirectory:
+    """ShardDirectory keeps every project's tables in a SQLite database file of its own.
+
+    SQLite allows a single writer per database file, so giving each project its own file lets writes to different
+    projects proceed in parallel. Engines are created the first time a project is used, and the pooled connections of
+    shards that have not been used for idle_timeout seconds are closed; the engine reconnects on its next use.
+
+    Attributes:
+    directory (str): Folder containing one project_<id>.db file per project
+    tables (list[sa.Table]): The tables that are stored per project; every other table stays in the main database
+    idle_timeout (float): Seconds a shard may go unused before its connections are closed
+    """
+
+    def __init__(self, directory: str, metadata: MetaData, table_names, idle_timeout: float = 300.0):
+        """Initialises a ShardDirectory
+
+        Args:
+            directory (str): Folder to keep the shard files in, created if missing
+            metadata (MetaData): Metadata describing the sharded tables
+            table_names (Iterable[str]): Names of the tables stored per project
+            idle_timeout (float): Seconds a shard may go unused before its connections are closed
+        """
+        self.directory = directory
+        self.table_names = set(table_names)
+        self.tables = [table for table in metadata.sorted_tables if table.name in self.table_names]
+        self.idle_timeout = idle_timeout
+        self._metadata = metadata
+        self._engines: dict[int, Engine] = {}
+        self._last_used: dict[int, float] = {}
+        self._connected: set[int] = set()
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, project_id: int) -> str:
+        """Get the database file of a project
+
+        Args:
+            project_id (int): ID of the project
+
+        Returns:
+            str: Path of the project's shard file
+        """
+        return os.path.join(self.directory, f'project_{int(project_id)}.db')
+
+    def project_ids(self) -> list[int]:
+        """List the projects that have a shard file
+
+        Returns:
+            list[int]: The project IDs, in ascending order
+        """
+        return sorted(int(match.group(1)) for match in map(SHARD_FILENAME.match, os.listdir(self.directory)) if match)
+
+    def engine_for(self, project_id: int) -> Engine:
+        """Get the engine of a project's shard, creating the shard file and its tables on first use
+
+        Args:
+            project_id (int): ID of the project
+
+        Returns:
+            Engine: Engine connected to the project's shard file
+        """
+        project_id = int(project_id)
+        now = time.monotonic()
+        with self._lock:
+            engine = self._engines.get(project_id)
+            if engine is None:
+                engine = create_engine(f'sqlite:///{self.path_for(project_id)}')
+                self._metadata.create_all(engine, tables=self.tables)
+                self._engines[project_id] = engine
+            if now - self._last_sweep >= min(self.idle_timeout, 60.0):
+                self._close_idle(now)
+            self._last_used[project_id] = now
+            self._connected.add(project_id)
+        return engine
+
+    def route(self, project_id: int, mapper=None, clause=None) -> Engine | None:
+        """Choose the shard engine for an ORM operation, for use from Session.get_bind
+
+        Args:
+            project_id (int): ID of the project the current request works on
+            mapper: The mapper being operated on, if any
+            clause: The statement being executed, if any
+
+        Returns:
+            Engine | None: The project's shard engine if the operation touches a sharded table, otherwise None
+        """
+        if mapper is not None:
+            tables = [sa.inspect(mapper).local_table]
+        elif clause is not None:
+            tables = find_tables(clause, include_crud=True)
+        else:
+            return None
+        if any(table.name in self.table_names for table in tables):
+            return self.engine_for(project_id)
+        return None
+
+    def close_idle(self) -> int:
+        """Close the connections of every shard that has not been used for idle_timeout seconds
+
+        Returns:
+            int: The number of shards whose connections were closed
+        """
+        with self._lock:
+            return self._close_idle(time.monotonic())
+
+    def dispose(self):
+        """
+        Close the connections of every shard
+        """
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._connected.clear()
+
+    def _close_idle(self, now: float) -> int:
+        self._last_sweep = now
+        idle = [project_id for project_id in self._connected if now - self._last_used[project_id] >= self.idle_timeout]
+        for project_id in idle:
+            self._engines[project_id].dispose()
+            self._connected.discard(project_id)
+        return len(idle)
+
+
+def split_database(source: Engine, shards: ShardDirectory, key_column: str = 'project_id',
+                   batch_size: int = 1000) -> dict[int, int]:
+    """Copy the sharded tables of a single database into per-project shard files.
+
+    Rows are read in primary key order and written in batches, one transaction per batch. Rows already present in a
+    shard are replaced, so an interrupted split can simply be run again. The source database is left untouched.
+
+    Args:
+        source (Engine): Engine of the database to split
+        shards (ShardDirectory): Where to write the shards
+        key_column (str): Column holding the project ID of each row; tables without it are skipped
+        batch_size (int): Maximum rows written per transaction
+
+    Returns:
+        dict[int, int]: The number of rows copied into each project's shard
+    """
+    copied: dict[int, int] = {}
+    existing_tables = set(sa.inspect(source).get_table_names())
+    for table in shards.tables:
+        if table.name not in existing_tables or key_column not in table.c:
+            continue
+        key = table.c[key_column]
+        # computed columns are derived by the database and cannot be inserted
+        columns = [column for column in table.columns if column.computed is None]
+        with source.connect() as connection:
+            project_ids = connection.scalars(select(key).distinct()).all()
+        for project_id in project_ids:
+            last_id = None
+            while True:
+                query = select(*columns).where(key == project_id).order_by(table.c.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.where(table.c.id > last_id)
+                with source.connect() as connection:
+                    rows = [row._asdict() for row in connection.execute(query)]
+                if not rows:
+                    break
+                with shards.engine_for(project_id).begin() as connection:
+                    connection.execute(insert(table).prefix_with('OR REPLACE'), rows)
+                copied[project_id] = copied.get(project_id, 0) + len(rows)
+                last_id = rows[-1]['id']
+    return copied
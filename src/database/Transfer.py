@@ -0,0 +1,206 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Iterable, Iterator
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, LargeBinary, String, Table, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+FORMAT = 'silicon-ndjson'
+VERSION = 1
+
+
+def get_transfer_columns(table: Table) -> list:
+    """List the columns of a table that are exported and imported: computed columns are left to the database"""
+    return [column for column in table.columns if column.computed is None]
+
+
+def is_transferable(table: Table) -> bool:
+    """Tables holding binary data (e.g. derived signatures) are rebuilt by the application rather than transferred"""
+    return not any(isinstance(column.type, LargeBinary) for column in table.columns)
+
+
+def export_ndjson(session: Session, tables: list[Table], batch_size: int = 1000) -> Iterator[str]:
+    """Export tables as newline-delimited JSON, streaming rows in primary key order
+
+    The first line is a header naming the format and the tables; each following line is one row, as
+    {"table": name, "row": {column: value}}. Dates and times are written in ISO 8601. Rows are fetched batch_size at a
+    time from an open cursor, so memory use does not grow with the size of the tables.
+
+    Args:
+        session (Session): Session to read with
+        tables (list[Table]): Tables to export, in the order they should be imported
+        batch_size (int): Rows fetched from the cursor at a time
+
+    Yields:
+        str: One line of NDJSON, including the trailing newline
+    """
+    yield json.dumps({'format': FORMAT, 'version': VERSION, 'tables': [table.name for table in tables]}) + '\n'
+    for table in tables:
+        columns = get_transfer_columns(table)
+        query = select(*columns).order_by(*table.primary_key.columns).execution_options(yield_per=batch_size)
+        for partition in session.execute(query).partitions():
+            for row in partition:
+                values = {column.name: _encode(value) for column, value in zip(columns, row)}
+                yield json.dumps({'table': table.name, 'row': values}, separators=(',', ':')) + '\n'
+
+
+def import_ndjson(session: Session, tables: list[Table], lines: Iterable[str], batch_size: int = 5000,
+                  start_line: int = 0, checkpoint_path: str = None) -> Iterator[dict]:
+    """Import NDJSON written by export_ndjson, validating and inserting batch_size rows per transaction
+
+    Each batch is validated in full before anything is written; an invalid batch stops the import with ValueError,
+    leaving every earlier batch committed. Rows are upserted on their primary key, so replaying lines that were
+    already imported is harmless. After each committed batch, the number of the last line read is reported and, if
+    checkpoint_path is given, written there; passing it back as start_line (or leaving it in checkpoint_path) resumes
+    an interrupted import.
+
+    Args:
+        session (Session): Session to write with, committed after every batch
+        tables (list[Table]): Tables that may be imported; rows for any other table are rejected
+        lines (Iterable[str]): The NDJSON lines
+        batch_size (int): Maximum rows per transaction
+        start_line (int): Skip lines up to and including this line number (the header is line 1)
+        checkpoint_path (str): File recording the last committed line; read to resume if it exists
+
+    Yields:
+        dict: Running totals after each batch: the last committed line and rows imported per table
+
+    Raises:
+        ValueError: The header is missing or of another format, or a batch holds invalid rows
+    """
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as checkpoint:
+            start_line = max(start_line, json.load(checkpoint)['line'])
+    tables_by_name = {table.name: table for table in tables}
+    report = {'line': start_line, 'imported': {}}
+    batch = []
+    line_number = 0
+    for line_number, line in enumerate(lines, start=1):
+        if line_number == 1:
+            header = _parse(line, line_number)
+            if header.get('format') != FORMAT or header.get('version') != VERSION:
+                raise ValueError(f'Line 1: not a {FORMAT} version {VERSION} export')
+            continue
+        if line_number <= start_line or not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) >= batch_size:
+            _import_batch(session, tables_by_name, batch, report)
+            _save_checkpoint(checkpoint_path, report)
+            batch = []
+            yield report
+    if line_number == 0:
+        raise ValueError(f'Line 1: not a {FORMAT} version {VERSION} export')
+    if batch:
+        _import_batch(session, tables_by_name, batch, report)
+    report['line'] = max(report['line'], line_number)
+    _save_checkpoint(checkpoint_path, report)
+    yield report
+
+
+def _import_batch(session: Session, tables: dict[str, Table], batch: list[tuple[int, str]], report: dict):
+    rows: dict[str, list[dict]] = {}
+    errors = []
+    for line_number, line in batch:
+        try:
+            record = _parse(line, line_number)
+            table = tables.get(record.get('table'))
+            if table is None:
+                raise ValueError(f'Line {line_number}: unknown table {record.get("table")!r}')
+            rows.setdefault(table.name, []).append(_decode_row(table, record.get('row'), line_number))
+        except ValueError as e:
+            errors.append(str(e))
+    if errors:
+        raise ValueError('; '.join(errors[:10]) + (f' (and {len(errors) - 10} more)' if len(errors) > 10 else ''))
+
+    for name, table_rows in rows.items():
+        table = tables[name]
+        keys = [column.name for column in table.primary_key.columns]
+        statement = insert(table)
+        updates = {column.name: statement.excluded[column.name]
+                   for column in get_transfer_columns(table) if column.name not in keys}
+        statement = statement.on_conflict_do_update(index_elements=keys, set_=updates) if updates else \
+            statement.on_conflict_do_nothing(index_elements=keys)
+        try:
+            session.execute(statement, table_rows)
+        except IntegrityError as e:
+            session.rollback()
+            raise ValueError(f'Lines {batch[0][0]}-{batch[-1][0]}: {e.orig}')
+        report['imported'][name] = report['imported'].get(name, 0) + len(table_rows)
+    session.commit()
+    report['line'] = batch[-1][0]
+
+
+def _decode_row(table: Table, values, line_number: int) -> dict:
+    if not isinstance(values, dict):
+        raise ValueError(f'Line {line_number}: row must be an object')
+    columns = {column.name: column for column in get_transfer_columns(table)}
+    unknown = set(values) - set(columns)
+    if unknown:
+        raise ValueError(f'Line {line_number}: unknown columns {sorted(unknown)} for {table.name}')
+    row = {}
+    for name, column in columns.items():
+        value = values.get(name)
+        if value is not None:
+            row[name] = _decode_value(column, value, f'Line {line_number}: {table.name}.{name}')
+        elif name not in values and column.default is not None and column.default.is_scalar:
+            row[name] = column.default.arg
+        elif column.nullable and not column.primary_key:
+            row[name] = None
+        else:
+            raise ValueError(f'Line {line_number}: {table.name}.{name} is required')
+    return row
+
+
+def _decode_value(column, value, where: str):
+    column_type = column.type
+    try:
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column_type, Date):
+            return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{where} must be an ISO 8601 date')
+    if isinstance(column_type, Boolean):
+        if not isinstance(value, bool):
+            raise ValueError(f'{where} must be a boolean')
+    elif isinstance(column_type, Integer):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(f'{where} must be an integer')
+    elif isinstance(column_type, Float):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f'{where} must be a number')
+    elif isinstance(column_type, String):
+        if not isinstance(value, str):
+            raise ValueError(f'{where} must be a string')
+        if column_type.length and len(value) > column_type.length:
+            raise ValueError(f'{where} is longer than {column_type.length} characters')
+    return value
+
+
+def _parse(line: str, line_number: int) -> dict:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Line {line_number}: invalid JSON ({e.msg})')
+    if not isinstance(record, dict):
+        raise ValueError(f'Line {line_number}: expected a JSON object')
+    return record
+
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _save_checkpoint(path: str | None, report: dict):
+    if not path:
+        return
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as checkpoint:
+        json.dump(report, checkpoint)
+    os.replace(temporary, path)
@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+_STOP = object()
+
+
+class WriteQueue:
+    """WriteQueue groups many small write operations into fewer transactions (group commit).
+
+    Callers submit a unit of work (a function taking a session) and receive a Future. A single writer thread collects
+    work until either max_batch_size items are waiting or max_latency seconds have passed since the first one arrived,
+    runs the whole group in one session and commits once. Each Future resolves only after the commit, so a caller that
+    waits on it has the same durability guarantee as committing directly.
+
+    If a grouped transaction fails, it is rolled back and every unit of work is retried in its own transaction, so one
+    bad write only fails its own Future.
+
+    Attributes:
+    max_batch_size (int): Maximum number of units of work committed together
+    max_latency (float): Maximum time in seconds a unit of work waits for others to join its transaction
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch_size: int = 64, max_latency: float = 0.005):
+        """Initialises a WriteQueue. The writer thread is started on the first submission.
+
+        Args:
+            session_factory (Callable[[], Session]): Creates the sessions the writer thread commits with
+            max_batch_size (int): Maximum number of units of work committed together
+            max_latency (float): Maximum time in seconds to wait for a group to fill up
+        """
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._session_factory = session_factory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, work: Callable[[Session], Any]) -> Future:
+        """Queue a unit of work for the writer thread.
+
+        Args:
+            work (Callable[[Session], Any]): Function that performs the write using the session it is given
+
+        Returns:
+            Future: Resolves to the return value of work once its transaction has committed
+        """
+        self.start()
+        future = Future()
+        self._queue.put((work, future))
+        return future
+
+    def start(self):
+        """
+        Start the writer thread if it is not already running
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """
+        Flush everything already queued, then stop the writer thread
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # collect more work until the batch is full or the first item has waited max_latency
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            batch = [(work, future) for work, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: list[tuple[Callable[[Session], Any], Future]]):
+        """Commit a group of units of work in one transaction.
+
+        Args:
+            batch (list[tuple[Callable[[Session], Any], Future]]): The queued work and the Futures to resolve
+        """
+        session = self._session_factory()
+        try:
+            results = [work(session) for work, _ in batch]
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # isolate the failing write(s) by retrying each unit of work in its own transaction
+                for item in batch:
+                    self._flush([item])
+            return
+        finally:
+            session.close()
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -1,5 +1,5 @@
 import datetime
-from flask import SQLAlchemy
+from flask_sqlalchemy import SQLAlchemy
 from src.error_handling.CustomError import CustomError
 db = SQLAlchemy()
 
@@ -33,13 +33,13 @@ class Activity(db.Model):
 
         # check if start/end dates are valid:
         # check that start date happens before the end date, if not, swap the two dates
-        if start > end:
+        if start is not None and end is not None and start > end:
             new_end = start
             start = end
             end = new_end
 
         # check that start date occurs on or after the current date
-        if start < datetime.datetime.now():
+        if start is not None and start < datetime.datetime.now():
             # start date is invalid, change set start and end to None
             start = None
             end = None
@@ -0,0 +1,103 @@
+from collections import defaultdict
+
+import numpy as np
+
+from src.project_management.Task import Priority, SP_MINIMUM, SP_MAXIMUM
+
+# Value of a task when planning a sprint; each priority is worth as much as two tasks of the priority below it
+PRIORITY_WEIGHTS = {
+    Priority.UNSPECIFIED: 1,
+    Priority.LOW: 2,
+    Priority.MEDIUM: 4,
+    Priority.IMPORTANT: 8,
+    Priority.URGENT: 16,
+}
+
+
+def plan_sprints(backlog: list[dict], capacities: list[int]) -> list[list[int]]:
+    """Fill a sequence of sprints from a backlog, maximising priority-weighted value within each sprint's capacity.
+
+    Sprints are filled in order, each with the most valuable set of remaining tasks that fits its story point
+    capacity, so the most important work lands in the earliest sprints.
+
+    Story points are bounded by SP_MINIMUM and SP_MAXIMUM, so a backlog of any size contains at most
+    (SP_MAXIMUM - SP_MINIMUM + 1) * len(Priority) kinds of task that are interchangeable for planning. Each sprint is
+    therefore solved exactly as a bounded knapsack over those kinds (with binary splitting of the counts), which takes
+    time proportional to the capacity rather than to the backlog. Tasks of the same kind are taken in backlog order.
+
+    Args:
+        backlog (list[dict]): Tasks to plan, each with 'id', 'story_point' and 'priority' (Priority), in order of
+            preference (e.g. oldest first). Story points outside the bounds are clamped to them.
+        capacities (list[int]): Story point capacity of each sprint, of which at most the backlog's total story points
+            are used
+
+    Returns:
+        list[list[int]]: The IDs of the tasks assigned to each sprint
+    """
+    remaining = defaultdict(list)
+    for task in backlog:
+        points = min(max(int(task.get('story_point') or 0), SP_MINIMUM), SP_MAXIMUM)
+        remaining[(points, task['priority'])].append(task['id'])
+    for task_ids in remaining.values():
+        task_ids.reverse()  # pop() takes tasks in backlog order
+
+    plan = []
+    backlog_points = sum(points * len(task_ids) for (points, _), task_ids in remaining.items())
+    for capacity in capacities:
+        # no sprint can take more than the whole remaining backlog, so a larger capacity needs no larger table
+        counts = _solve_bounded_knapsack(
+            [(points, PRIORITY_WEIGHTS[priority], len(task_ids))
+             for (points, priority), task_ids in remaining.items()],
+            min(int(capacity), backlog_points)
+        )
+        sprint = []
+        for (kind, task_ids), count in zip(list(remaining.items()), counts):
+            sprint.extend(task_ids.pop() for _ in range(count))
+            backlog_points -= kind[0] * count
+            if not task_ids:
+                del remaining[kind]
+        plan.append(sprint)
+    return plan
+
+
+def _solve_bounded_knapsack(kinds: list[tuple[int, int, int]], capacity: int) -> list[int]:
+    """Choose how many items of each kind to take to maximise total value within a capacity.
+
+    Args:
+        kinds (list[tuple[int, int, int]]): (weight, value, available count) of each kind of item
+        capacity (int): Maximum total weight
+
+    Returns:
+        list[int]: The number of items of each kind to take
+    """
+    if capacity <= 0:
+        return [0] * len(kinds)
+
+    # split each count into pieces of 1, 2, 4, ... items so a 0/1 knapsack over the pieces can reach every count
+    pieces = []
+    for kind, (weight, value, count) in enumerate(kinds):
+        size = 1
+        while count > 0:
+            size = min(size, count)
+            pieces.append((kind, size, weight * size, value * size))
+            count -= size
+            size *= 2
+
+    best = np.zeros(capacity + 1, dtype=np.int64)
+    taken = np.zeros((len(pieces), capacity + 1), dtype=bool)
+    for i, (_, _, weight, value) in enumerate(pieces):
+        if weight > capacity:
+            continue
+        with_piece = best[:-weight] + value
+        improves = with_piece > best[weight:]
+        taken[i, weight:] = improves
+        best[weight:] = np.where(improves, with_piece, best[weight:])
+
+    counts = [0] * len(kinds)
+    remaining_capacity = int(np.argmax(best))
+    for i in range(len(pieces) - 1, -1, -1):
+        if taken[i, remaining_capacity]:
+            kind, size, weight, _ = pieces[i]
+            counts[kind] += size
+            remaining_capacity -= weight
+    return counts
@@ -1,7 +1,7 @@
 from enum import Enum
 
 from src.error_handling.CustomError import CustomError
-from src.project_management.Log import LogModel
+from src.project_management.Log import Log
 
 SP_MINIMUM = 1
 SP_MAXIMUM = 10
@@ -88,7 +88,7 @@ class Task:
     ]
     _fields_inputs = {
         "title": [str],
-        "location": [LogModel],
+        "location": [Log],
         "description": [str],
         "storyPoint": [int, float],
         "priority": [Priority],
@@ -102,7 +102,7 @@ class Task:
     def __init__(
             self,
             title: str,
-            location: LogModel,
+            location: Log,
             user: str,
             description: str = "",
             storyPoint: float | None = None,
@@ -114,7 +114,7 @@ class Task:
 
         Args:
             title (str): Title of the task
-            location (LogModel): Log the task is in
+            location (Log): Log the task is in
             user (str): The initial user who created the task
             description (str): Description of the task
             storyPoint (float): Story point estimate for the task
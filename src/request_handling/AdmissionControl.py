@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS slot (id TEXT PRIMARY KEY, name TEXT NOT NULL, expires_at REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS ix_slot_name ON slot (name, expires_at);
+CREATE TABLE IF NOT EXISTS counter (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+# Refill the bucket for the time elapsed since it was last used and take one token, but only if a whole token is
+# available. A new bucket starts full.
+TAKE_TOKEN = """
+INSERT INTO token_bucket (key, tokens, updated_at) VALUES (:key, :burst - 1, :now)
+ON CONFLICT (key) DO UPDATE SET tokens = min(:burst, tokens + (:now - updated_at) * :rate) - 1, updated_at = :now
+WHERE min(:burst, tokens + (:now - updated_at) * :rate) >= 1
+RETURNING tokens
+"""
+
+
+class AdmissionState:
+    """AdmissionState holds rate limiting and concurrency state shared by every worker process on a host.
+
+    The state lives in a small SQLite file, separate from the application database, so that it never competes with
+    the writes it protects. Each check is a single short transaction; durability is not needed, so the file is not
+    synced to disk.
+
+    Token buckets hold up to burst tokens and refill at rate tokens per second; each admitted request takes one.
+    Concurrency slots are leases: a slot held by a process that dies is reclaimed once its lease expires.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        """Initialises an AdmissionState, creating the state file if it does not exist
+
+        Args:
+            path (str): Path of the SQLite state file
+            timeout (float): Seconds to wait for another process holding the state file's lock
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def take_token(self, key: str, rate: float, burst: int, now: float = None) -> float:
+        """Take a token from a bucket
+
+        Args:
+            key (str): The bucket, e.g. a route and user
+            rate (float): Tokens added per second
+            burst (int): Maximum tokens the bucket holds
+            now (float): Current time in seconds since the epoch, defaults to time.time()
+
+        Returns:
+            float: 0.0 if a token was taken, otherwise the seconds until one will be available
+        """
+        now = time.time() if now is None else now
+        connection = self._connection()
+        parameters = {'key': key, 'rate': rate, 'burst': burst, 'now': now}
+        if connection.execute(TAKE_TOKEN, parameters).fetchone() is not None:
+            return 0.0
+        tokens, updated_at = connection.execute(
+            'SELECT tokens, updated_at FROM token_bucket WHERE key = ?', (key,)
+        ).fetchone()
+        available = min(burst, tokens + (now - updated_at) * rate)
+        return max((1 - available) / rate, 0.0) if rate > 0 else float('inf')
+
+    def acquire_slot(self, name: str, limit: int, lease: float = 30.0) -> str | None:
+        """Acquire one of a limited number of slots
+
+        Args:
+            name (str): The group of slots, e.g. 'write'
+            limit (int): Maximum number of slots held at once
+            lease (float): Seconds after which an unreleased slot is reclaimed
+
+        Returns:
+            str | None: The ID of the slot to release, or None if every slot is taken
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM slot WHERE name = ? AND expires_at <= ?', (name, now))
+            (held,) = connection.execute('SELECT count(*) FROM slot WHERE name = ?', (name,)).fetchone()
+            slot_id = None
+            if held < limit:
+                slot_id = uuid.uuid4().hex
+                connection.execute('INSERT INTO slot (id, name, expires_at) VALUES (?, ?, ?)',
+                                   (slot_id, name, now + lease))
+            connection.execute('COMMIT')
+            return slot_id
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def release_slot(self, slot_id: str):
+        """Release a slot returned by acquire_slot
+
+        Args:
+            slot_id (str): ID of the slot
+        """
+        self._connection().execute('DELETE FROM slot WHERE id = ?', (slot_id,))
+
+    def count(self, name: str, amount: int = 1):
+        """Add to a counter
+
+        Args:
+            name (str): Name of the counter, e.g. 'rejected.rate_limit.add_task'
+            amount (int): Amount to add
+        """
+        self._connection().execute(
+            'INSERT INTO counter (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + ?',
+            (name, amount, amount)
+        )
+
+    def counters(self) -> dict[str, int]:
+        """Read every counter
+
+        Returns:
+            dict[str, int]: Counter values by name
+        """
+        return dict(self._connection().execute('SELECT name, value FROM counter ORDER BY name').fetchall())
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+        return connection
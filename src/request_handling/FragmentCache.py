@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+class FragmentCache:
+    """FragmentCache keeps rendered template fragments in memory, keyed by fragment name and whatever they vary on.
+
+    It is meant for fragments that only depend on a few values, such as the header for a given user role, and stores
+    at most max_entries fragments, discarding the least recently used. Entries never expire; call invalidate when the
+    data a fragment depends on changes.
+
+    Attributes:
+    max_entries (int): Maximum number of fragments kept
+    hits (int): Number of renders served from the cache
+    misses (int): Number of renders that had to render the fragment
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialises a FragmentCache
+
+        Args:
+            max_entries (int): Maximum number of fragments kept
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._fragments: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key: tuple, render: Callable[[], str]) -> str:
+        """Get a cached fragment, rendering and storing it if missing
+
+        Args:
+            key (tuple): The fragment name followed by the values it varies on
+            render (Callable[[], str]): Renders the fragment
+
+        Returns:
+            str: The rendered fragment
+        """
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+        # rendered outside the lock; two threads missing at once both render, and the result is the same
+        fragment = render()
+        with self._lock:
+            self._fragments[key] = fragment
+            if len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def invalidate(self, name: str = None) -> int:
+        """Discard cached fragments
+
+        Args:
+            name (str): Only discard the fragments with this name, every variant included; all fragments if None
+
+        Returns:
+            int: The number of fragments discarded
+        """
+        with self._lock:
+            keys = [key for key in self._fragments if name is None or key[0] == name]
+            for key in keys:
+                del self._fragments[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension adding a {% cache name, vary... %} ... {% endcache %} block.
+
+    The block's output is stored in environment.fragment_cache under (name, vary...). When no cache is set the block
+    is simply rendered, so templates behave the same with caching disabled. The block must only depend on its key:
+    anything else it uses is frozen at the first render.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(key)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        return cache.get_or_render(tuple(key), caller)
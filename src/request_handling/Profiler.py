@@ -0,0 +1,259 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable
+
+PROFILE_SUFFIX = '.folded'
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    """SamplingProfiler records where a running process spends its time by periodically sampling every thread's stack.
+
+    Nothing is instrumented: between samples the profiled threads run at full speed, so it can be switched on inside a
+    live worker. Only one profile runs at a time per process.
+
+    Attributes:
+    interval (float): Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.005):
+        """Initialises a SamplingProfiler
+
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def sample(self, duration: float, thread_ids: set[int] = None,
+               until: Callable[[], bool] = None) -> Counter:
+        """Sample stacks from the calling thread for up to duration seconds
+
+        Args:
+            duration (float): Maximum seconds to sample for
+            thread_ids (set[int]): Only sample these threads; every thread but the caller's if None
+            until (Callable[[], bool]): Checked before each sample; sampling stops early once it returns True
+
+        Returns:
+            Counter: The number of samples of each stack, keyed by its collapsed form (root first, ';' separated)
+
+        Raises:
+            ProfilerBusy: Another profile is already running in this process
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy('A profile is already running')
+        try:
+            counts = Counter()
+            own_id = threading.get_ident()
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline and not (until and until()):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id or (thread_ids is not None and thread_id not in thread_ids):
+                        continue
+                    counts[collapse_frame(names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(self.interval)
+            return counts
+        finally:
+            self._lock.release()
+
+
+def collapse_frame(thread_name: str, frame) -> str:
+    """Collapse a stack into one line: the thread name, then each function from the outermost, ';' separated
+
+    Args:
+        thread_name (str): Name of the sampled thread, used as the root of the stack
+        frame (FrameType): The innermost frame of the stack
+
+    Returns:
+        str: The collapsed stack
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    names.append(thread_name)
+    return ';'.join(reversed(names)).replace('\n', ' ')
+
+
+def format_collapsed(counts: Counter) -> str:
+    """Format sampled stacks in the collapsed format read by flamegraph.pl, speedscope and similar tools
+
+    Args:
+        counts (Counter): Samples per collapsed stack, as returned by SamplingProfiler.sample
+
+    Returns:
+        str: One 'stack count' line per stack, most sampled first
+    """
+    return ''.join(f'{stack} {count}\n' for stack, count in counts.most_common())
+
+
+class ProfileRing:
+    """ProfileRing keeps the most recent profiles as files in a directory, deleting the oldest beyond a capacity.
+
+    Attributes:
+    directory (str): Folder holding the profiles, one collapsed-stack file and one JSON metadata file each
+    capacity (int): Maximum profiles kept
+    """
+
+    def __init__(self, directory: str, capacity: int = 20):
+        """Initialises a ProfileRing
+
+        Args:
+            directory (str): Folder to keep the profiles in, created if missing
+            capacity (int): Maximum profiles kept
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, counts: Counter, label: str, **metadata) -> str:
+        """Store a profile and delete the oldest profiles beyond the capacity
+
+        Args:
+            counts (Counter): The sampled stacks
+            label (str): What was profiled, e.g. the endpoint of a slow request
+            **metadata: Anything else to record with the profile
+
+        Returns:
+            str: The profile's name
+        """
+        safe_label = ''.join(c if c.isalnum() or c in '-_' else '-' for c in label)[:40]
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S_%f')}_{safe_label}"
+        with self._lock:
+            with open(os.path.join(self.directory, name + PROFILE_SUFFIX), 'w') as profile:
+                profile.write(format_collapsed(counts))
+            with open(os.path.join(self.directory, name + '.json'), 'w') as info:
+                json.dump({'name': name, 'label': label, 'samples': sum(counts.values()), **metadata}, info)
+            names = self._names()
+            for expired in names[:max(len(names) - self.capacity, 0)]:
+                for suffix in (PROFILE_SUFFIX, '.json'):
+                    try:
+                        os.remove(os.path.join(self.directory, expired + suffix))
+                    except FileNotFoundError:
+                        pass
+        return name
+
+    def list_profiles(self) -> list[dict]:
+        """List the stored profiles, newest first
+
+        Returns:
+            list[dict]: The metadata of each profile
+        """
+        profiles = []
+        for name in reversed(self._names()):
+            try:
+                with open(os.path.join(self.directory, name + '.json')) as info:
+                    profiles.append(json.load(info))
+            except (OSError, ValueError):
+                profiles.append({'name': name})
+        return profiles
+
+    def read(self, name: str) -> str | None:
+        """Read a stored profile
+
+        Args:
+            name (str): The profile's name, as returned by save or list_profiles
+
+        Returns:
+            str | None: The profile in collapsed format, or None if there is no such profile
+        """
+        if name not in self._names():
+            return None
+        with open(os.path.join(self.directory, name + PROFILE_SUFFIX)) as profile:
+            return profile.read()
+
+    def _names(self) -> list[str]:
+        return sorted(file[:-len(PROFILE_SUFFIX)] for file in os.listdir(self.directory)
+                      if file.endswith(PROFILE_SUFFIX))
+
+
+class SlowRequestWatchdog:
+    """SlowRequestWatchdog profiles requests while they are still running once they exceed a latency threshold.
+
+    Request threads register themselves with track and untrack. A background thread checks the registered requests
+    every check_interval seconds; when one has been running for longer than threshold, its thread is sampled until the
+    request finishes (for at most duration seconds) and the profile is saved to the ring. After a profile, slow
+    requests are ignored for cooldown seconds, which bounds the profiling overhead.
+
+    Attributes:
+    threshold (float): Seconds a request may run before it is profiled
+    duration (float): Maximum seconds to sample a slow request
+    cooldown (float): Seconds after a profile during which no other profile is taken
+    """
+
+    def __init__(self, profiler: SamplingProfiler, ring: ProfileRing, threshold: float, duration: float = 5.0,
+                 cooldown: float = 60.0, check_interval: float = None):
+        """Initialises a SlowRequestWatchdog and starts its thread
+
+        Args:
+            profiler (SamplingProfiler): The process's profiler
+            ring (ProfileRing): Where to keep the profiles
+            threshold (float): Seconds a request may run before it is profiled
+            duration (float): Maximum seconds to sample a slow request
+            cooldown (float): Seconds after a profile during which no other profile is taken
+            check_interval (float): Seconds between checks, a tenth of the threshold by default
+        """
+        self.profiler = profiler
+        self.ring = ring
+        self.threshold = threshold
+        self.duration = duration
+        self.cooldown = cooldown
+        self.check_interval = check_interval or threshold / 10
+        self._requests: dict[int, tuple[float, str]] = {}
+        self._last_profile = float('-inf')
+        self._thread = threading.Thread(target=self._run, name='slow-request-watchdog', daemon=True)
+        self._thread.start()
+
+    def track(self, label: str):
+        """Register the calling thread's request
+
+        Args:
+            label (str): What to call the request's profile, e.g. its endpoint
+        """
+        self._requests[threading.get_ident()] = (time.monotonic(), label)
+
+    def untrack(self):
+        """
+        Unregister the calling thread's request
+        """
+        self._requests.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.check_interval)
+            now = time.monotonic()
+            if now - self._last_profile < self.cooldown or self.profiler.busy:
+                continue
+            slow = [(started, thread_id, label) for thread_id, (started, label) in list(self._requests.items())
+                    if now - started >= self.threshold]
+            if slow:
+                started, thread_id, label = min(slow)
+                self._profile(thread_id, started, label)
+
+    def _profile(self, thread_id: int, started: float, label: str):
+        def finished():
+            return self._requests.get(thread_id, (None,))[0] != started
+
+        try:
+            counts = self.profiler.sample(self.duration, thread_ids={thread_id}, until=finished)
+        except ProfilerBusy:
+            return
+        self._last_profile = time.monotonic()
+        if counts:
+            self.ring.save(counts, label, trigger='slow-request', threshold=self.threshold,
+                           running_for=round(time.monotonic() - started, 3))
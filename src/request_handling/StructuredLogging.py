@@ -0,0 +1,88 @@
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JsonFormatter(logging.Formatter):
+    """JsonFormatter writes each record as a single line of JSON.
+
+    The line holds the time, level, logger name and message, any fields passed as extra={'fields': {...}}, and the
+    traceback if the record carries one.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """DroppingQueueHandler hands records to a bounded queue without ever blocking the logging thread.
+
+    When the queue is full the record is dropped and counted instead, so a slow disk can never stall requests.
+
+    Attributes:
+    dropped (int): Number of records dropped because the queue was full
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what cannot cross threads (the message arguments and the traceback); formatting is left to
+        # the listener's handler
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_queue_logging(loggers: list[logging.Logger], handler: logging.Handler,
+                        max_queue: int = 10000) -> tuple[QueueListener, DroppingQueueHandler]:
+    """Send the records of some loggers through a queue to a handler run by a background thread
+
+    The loggers' existing handlers are replaced and they stop propagating, so each record is written exactly once, by
+    the background thread.
+
+    Args:
+        loggers (list[logging.Logger]): The loggers to route through the queue
+        handler (logging.Handler): Writes the records, e.g. a FileHandler with a JsonFormatter
+        max_queue (int): Maximum records waiting to be written; further records are dropped
+
+    Returns:
+        tuple[QueueListener, DroppingQueueHandler]: The started listener (stop it to flush the queue) and the handler
+            the loggers write to
+    """
+    record_queue = queue.Queue(max_queue)
+    queue_handler = DroppingQueueHandler(record_queue)
+    for logger in loggers:
+        for existing in list(logger.handlers):
+            logger.removeHandler(existing)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+    listener = QueueListener(record_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener, queue_handler
@@ -1,15 +1,17 @@
+/**
+ * @type {number|null} editingTaskId - The ID of the task open in the edit form.
+ */
+let editingTaskId = null;
+
 /**
  * Handle the Edit button click event.
- * Fetches the task data from the server and opens the edit form.
+ * Reads the task data from the local copy of the board (falling back to the
+ * server) and opens the edit form.
  *
  * @param {number} taskId - The ID of the task to edit.
  */
 function handleEditButton(taskId) {
-  fetch(`/get_task/${taskId}`)
-  .then((response) => {
-    if (!response.ok) throw new Error('Task not found');
-    return response.json();
-  })
+  getTaskDetails(taskId)
   .then(openEditForm)
   .catch((error) => alert(`Error: ${error.message}`));
 }
@@ -27,6 +29,7 @@ function openEditForm(task) {
   }
 
   editPopup.style.display = 'block';
+  editingTaskId = task.id;
 
   // Pre-fill the form fields
   const formFields = {
@@ -48,7 +51,7 @@ function openEditForm(task) {
   });
 
   // Set the development tag checkboxes based on the bit vector
-  const bitVector = parseInt(task.development_bit_vector, 10);
+  const bitVector = parseInt(task.development_bit_vector, 2);
   document.querySelectorAll('input[name="edit-development-tags"]').forEach((checkbox) => {
     const tagValue = parseInt(checkbox.value, 10);
     checkbox.checked = (bitVector & tagValue) === tagValue;
@@ -77,25 +80,27 @@ document.getElementById('edit-task-form')?.addEventListener('submit', (event) =>
   const updatedTask = {
     title: document.getElementById('edit-title').value,
     description: document.getElementById('edit-description').value,
-    story_point: document.getElementById('edit-story-point').value,
+    story_point: parseInt(document.getElementById('edit-story-point').value, 10),
     priority_tag: document.getElementById('edit-priority-tag').value,
     progress_tag: document.getElementById('edit-progress-tag').value,
     in_progress_stage: document.getElementById('edit-in-progress-tag').value,
     development_bit_vector: getDevelopmentBitVector(),
   };
 
-  // Send the updated data to the server
-  fetch(`/update_task/${taskId}`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify(updatedTask),
-  })
-  .then((response) => {
-    if (!response.ok) throw new Error('Failed to update task');
+  if (!(updatedTask.story_point >= 1 && updatedTask.story_point <= 10)) {
+    alert('Story point estimate must be between 1 and 10.');
+    return;
+  }
+
+  // Save the edit locally and send it to the server, or queue it while offline
+  saveTaskEdit(editingTaskId, updatedTask)
+  .then((outcome) => {
     closeEditForm();
-    alert('Task updated successfully!');
+    if (outcome === 'queued') {
+      alert('You are offline: the edit will be sent when the connection is back.');
+    } else if (outcome === 'sent') {
+      alert('Task updated successfully!');
+    } // a refused edit has already been reported
   })
   .catch((error) => alert(`Error: ${error.message}`));
 });
@@ -103,14 +108,14 @@ document.getElementById('edit-task-form')?.addEventListener('submit', (event) =>
 /**
  * Get the development tag bit vector based on selected checkboxes.
  *
- * @returns {number} - The calculated bit vector.
+ * @returns {string} - The calculated bit vector, as five binary digits.
  */
 function getDevelopmentBitVector() {
   let bitVector = 0;
   document.querySelectorAll('input[name="edit-development-tags"]:checked').forEach((checkbox) => {
     bitVector |= parseInt(checkbox.value, 10);
   });
-  return bitVector;
+  return bitVector.toString(2).padStart(5, '0');
 }
 
 /**
@@ -119,6 +124,7 @@ function getDevelopmentBitVector() {
 function closeEditForm() {
   const editPopup = document.getElementById('edit-task-popup');
   if (editPopup) editPopup.style.display = 'none';
+  editingTaskId = null;
   document.getElementById('edit-task-form')?.reset();
 
   // Hide the progress stage dropdown if it was visible
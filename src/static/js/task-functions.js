@@ -14,11 +14,25 @@ const cardView = document.getElementById('card-view');
 const availableTags = ['front-end', 'back-end', 'ui-ux', 'api', 'testing'];
 
 /**
- * Loads tasks from the server when the DOM is fully loaded.
+ * Loads the column totals from the server when the DOM is fully loaded, so the
+ * board headers render before the task list arrives.
+ * @listens {DOMContentLoaded}
+ */
+document.addEventListener('DOMContentLoaded', getBoardSummary);
+
+/**
+ * Renders the board from the local copy when the DOM is fully loaded, then
+ * brings it up to date with the server.
  * @listens {DOMContentLoaded}
  */
 document.addEventListener('DOMContentLoaded', getTasks);
 
+/**
+ * Sends the edits queued while offline once the connection is back.
+ * @listens {online}
+ */
+window.addEventListener('online', syncPendingEdits);
+
 /**
  * Handles the task form submission event.
  * @listens submit
@@ -125,34 +139,463 @@ function addTask(
  * @param {number} taskId - The ID of the task to be deleted.
  */
 function deleteTask(taskId) {
-  fetch(`/delete_task/${taskId}`, {
+  return fetch(`/delete_task/${taskId}`, {
     method: 'DELETE',
     headers: {
       'Content-Type': 'application/json',
     },
-  }).then(() => {
-    getTasks();
-  }).catch(error => console.error('Error:', error));
+  }).then(() => reconcileTasks());
 }
 
 /**
- * Sends a GET request to fetch tasks from the server and updates the task list.
+ * Sends a GET request for the board summary and shows the task count and story
+ * point total of each column in its header.
  */
-function getTasks() {
-  fetch('/get_tasks', {
+function getBoardSummary() {
+  fetch('/tasks/summary', {
     method: 'GET',
     headers: {
       'Content-Type': 'application/json',
     },
   }).then(response => response.json()).then(data => {
-    // Update the task list with the tasks received from the server
-    displayListView(data.tasks);
-    displayCardView(data.tasks);
+    for (const [column, totals] of Object.entries(data.columns)) {
+      const summary = document.getElementById(`${column}-summary`);
+      if (summary) {
+        summary.textContent = `(${totals.count} tasks, ${totals.story_points} points)`;
+      }
+    }
   })
       // Log errors to the console
       .catch(error => console.error('Error:', error));
 }
 
+/**
+ * Renders the board from the local copy straight away, then brings the copy up
+ * to date with the server in the background.
+ *
+ * @returns {Promise} Resolves once the board is up to date.
+ */
+function getTasks() {
+  return renderLocalBoard().then(() => reconcileTasks())
+      // Log errors to the console
+      .catch(error => console.error('Error:', error));
+}
+
+/**
+ * @const {string} TASK_STORE_NAME - Name of the IndexedDB database holding the
+ *     local copy of the board.
+ * @const {number} TASK_STORE_VERSION - Schema version of that database.
+ */
+const TASK_STORE_NAME = 'silicon-board';
+const TASK_STORE_VERSION = 1;
+let taskStore = null;
+let replayingEdits = null;
+
+/**
+ * Opens the IndexedDB database holding the local copy of the board, creating
+ * its object stores on first use: tasks (the server's copy of each task), meta
+ * (the change sequence number and project the copy is up to date with) and
+ * pendingEdits (edits the server has not accepted yet, one per task).
+ *
+ * @returns {Promise<IDBDatabase|null>} The database, or null if IndexedDB is
+ *     unavailable, in which case the board is always loaded from the server.
+ */
+function openTaskStore() {
+  if (!taskStore) {
+    taskStore = new Promise(resolve => {
+      if (!window.indexedDB) {
+        resolve(null);
+        return;
+      }
+      const request = indexedDB.open(TASK_STORE_NAME, TASK_STORE_VERSION);
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore('tasks', {keyPath: 'id'});
+        request.result.createObjectStore('meta');
+        request.result.createObjectStore('pendingEdits', {keyPath: 'taskId'});
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        console.error('Error:', request.error);
+        resolve(null);
+      };
+    });
+  }
+  return taskStore;
+}
+
+/**
+ * Runs work in a single transaction on the local copy of the board.
+ *
+ * @param {string[]} storeNames - The object stores the work uses.
+ * @param {string} mode - 'readonly' or 'readwrite'.
+ * @param {function(IDBTransaction): *} work - Issues the requests; the value it
+ *     returns (typically an object its request callbacks fill in) is what the
+ *     returned promise resolves to.
+ * @returns {Promise<*>} Resolves once the transaction has completed, or to
+ *     null if there is no local copy.
+ */
+function withTaskStore(storeNames, mode, work) {
+  return openTaskStore().then(database => database && new Promise(
+      (resolve, reject) => {
+        const transaction = database.transaction(storeNames, mode);
+        const result = work(transaction);
+        transaction.oncomplete = () => resolve(result);
+        transaction.onerror = () => reject(transaction.error);
+        transaction.onabort = () => reject(transaction.error);
+      }));
+}
+
+/**
+ * Reads the whole local copy of the board.
+ *
+ * @returns {Promise<Object|null>} The tasks, the pending edits and the meta
+ *     record ({seq, projectId}, empty before the first download).
+ */
+function readLocalBoard() {
+  return withTaskStore(['tasks', 'meta', 'pendingEdits'], 'readonly',
+      transaction => {
+        const board = {tasks: [], pending: [], meta: {}};
+        transaction.objectStore('tasks').getAll().onsuccess = event => {
+          board.tasks = event.target.result;
+        };
+        transaction.objectStore('pendingEdits').getAll().onsuccess = event => {
+          board.pending = event.target.result;
+        };
+        transaction.objectStore('meta').get('board').onsuccess = event => {
+          board.meta = event.target.result || {};
+        };
+        return board;
+      });
+}
+
+/**
+ * Gets the description to show on a card: the full description when the task
+ * has it (e.g. after an edit), otherwise the excerpt of a task summary.
+ *
+ * @param {Object} task - A full task or a task summary.
+ * @returns {string} The description or its excerpt.
+ */
+function getDescriptionPreview(task) {
+  if (task.description !== undefined) return task.description;
+  return task.description_excerpt + (task.description_truncated ? '…' : '');
+}
+
+/**
+ * Reads one task from the local copy, with its pending edit applied.
+ *
+ * @param {number} taskId - The ID of the task.
+ * @returns {Promise<Object|null>} The task, or null if it is not stored.
+ */
+function readLocalTask(taskId) {
+  return withTaskStore(['tasks', 'pendingEdits'], 'readonly', transaction => {
+    const found = {};
+    transaction.objectStore('tasks').get(taskId).onsuccess = event => {
+      found.task = event.target.result;
+    };
+    transaction.objectStore('pendingEdits').get(taskId).onsuccess = event => {
+      found.edit = event.target.result;
+    };
+    return found;
+  }).then(found => found && found.task ?
+      {...found.task, ...(found.edit ? found.edit.changes : {})} : null);
+}
+
+/**
+ * Gets a task's full details. The board only downloads task summaries, so the
+ * full task is fetched from the server the first time it is needed and kept in
+ * the local copy until the task next changes.
+ *
+ * @param {number} taskId - The ID of the task.
+ * @returns {Promise<Object>} The task.
+ */
+function getTaskDetails(taskId) {
+  return readLocalTask(taskId).then(task => {
+    if (task && task.description !== undefined) return task;
+    return fetch(`/get_task/${taskId}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    }).then(response => {
+      if (!response.ok) throw new Error('Task not found');
+      return response.json();
+    }).then(details => storeTaskDetails(details).
+        // Read back to keep any pending edit applied
+        then(() => readLocalTask(taskId)).
+        then(stored => stored && stored.description !== undefined ? stored : details));
+  });
+}
+
+/**
+ * Adds a task's full details to its summary in the local copy, unless the
+ * stored task has changed since.
+ *
+ * @param {Object} details - The full task from the server.
+ * @returns {Promise} Resolves once stored.
+ */
+function storeTaskDetails(details) {
+  return withTaskStore(['tasks'], 'readwrite', transaction => {
+    const store = transaction.objectStore('tasks');
+    store.get(details.id).onsuccess = event => {
+      const summary = event.target.result;
+      if (summary && summary.version === details.version) {
+        store.put({...summary, ...details});
+      }
+    };
+  });
+}
+
+/**
+ * Stores tasks received from the server in the local copy.
+ *
+ * @param {Array<Object>} tasks - Tasks to add or replace.
+ * @param {number[]} deleted - IDs of tasks to remove.
+ * @param {Object|null} meta - The {seq, projectId} the copy is now up to date
+ *     with, or null to leave it unchanged (e.g. for a single edited task).
+ * @param {boolean} reset - Whether tasks is the whole board, replacing the
+ *     current copy.
+ * @returns {Promise} Resolves once stored.
+ */
+function storeServerTasks(tasks, deleted, meta, reset) {
+  return withTaskStore(['tasks', 'meta'], 'readwrite', transaction => {
+    const store = transaction.objectStore('tasks');
+    if (reset) store.clear();
+    tasks.forEach(task => store.put(task));
+    deleted.forEach(taskId => store.delete(taskId));
+    if (meta) transaction.objectStore('meta').put(meta, 'board');
+  });
+}
+
+/**
+ * Renders the list and card views from the local copy, with pending edits
+ * applied.
+ *
+ * @returns {Promise<boolean>} Whether there was a local copy to render.
+ */
+function renderLocalBoard() {
+  return readLocalBoard().then(board => {
+    if (!board || board.meta.seq === undefined) return false;
+    const edits = new Map(board.pending.map(edit => [edit.taskId, edit.changes]));
+    const tasks = board.tasks.map(task => ({...task, ...edits.get(task.id)}));
+    displayListView(tasks);
+    displayCardView(tasks);
+    return true;
+  });
+}
+
+/**
+ * Brings the local copy up to date with the server: only the tasks changed
+ * since the copy's sequence number are downloaded, unless the copy is empty,
+ * belongs to another project or the server asks for a reset. Pending edits are
+ * then sent, and the board is rendered again if anything changed. Without
+ * IndexedDB the whole board is downloaded and rendered every time.
+ *
+ * @param {boolean} full - Download the whole board regardless of the copy.
+ * @returns {Promise} Resolves once the board is up to date.
+ */
+function reconcileTasks(full = false) {
+  return readLocalBoard().then(board => {
+    const meta = board ? board.meta : {};
+    const since = !full && meta.seq !== undefined ? `?since=${meta.seq}` : '';
+    return fetch(`/get_tasks${since}`, {
+      method: 'GET',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+    }).then(response => response.json()).then(data => {
+      if (since && data.project_id !== meta.projectId) return reconcileTasks(true);
+      if (!board) {
+        displayListView(data.tasks);
+        displayCardView(data.tasks);
+        getBoardSummary();
+        return;
+      }
+      const changed = !since || data.reset || data.tasks.length > 0 ||
+          data.deleted.length > 0;
+      return storeServerTasks(data.tasks, data.deleted,
+          {seq: data.seq, projectId: data.project_id}, !since || data.reset).
+          then(() => changed && renderLocalBoard()).
+          then(syncPendingEdits).
+          then(getBoardSummary);
+    });
+  });
+}
+
+/**
+ * Records an edit in the local copy and sends it to the server. If the server
+ * cannot be reached the edit stays queued and is sent when the connection is
+ * back; a queued edit is merged into any edit already queued for the task.
+ *
+ * @param {number} taskId - The ID of the task.
+ * @param {Object} changes - The fields to change.
+ * @returns {Promise<string>} 'sent' once applied, 'queued' if it is waiting to
+ *     be sent, or 'rejected' if the server refused it (the user has been told).
+ */
+function saveTaskEdit(taskId, changes) {
+  return getTaskDetails(taskId).then(task => {
+    const edit = {taskId, changes, baseVersion: task.version};
+    return withTaskStore(['pendingEdits'], 'readwrite', transaction => {
+      const store = transaction.objectStore('pendingEdits');
+      store.get(taskId).onsuccess = event => {
+        const queued = event.target.result;
+        store.put(queued ?
+            {...queued, changes: {...queued.changes, ...changes}} : edit);
+      };
+      return true;
+    }).then(stored => {
+      if (!stored) {
+        // No local copy: send the edit straight away
+        return sendTaskEdit(edit).then(({status, body}) => {
+          if (status !== 200) throw new Error(body.error || 'Failed to update task');
+          return reconcileTasks().then(() => 'sent');
+        });
+      }
+      return renderLocalBoard().then(syncPendingEdits).then(result => {
+        if (result && result.rejected.some(edit => edit.taskId === taskId)) {
+          return 'rejected';
+        }
+        return isEditPending(taskId).then(pending => pending ? 'queued' : 'sent');
+      });
+    });
+  });
+}
+
+/**
+ * Checks whether an edit of a task is waiting to be sent.
+ *
+ * @param {number} taskId - The ID of the task.
+ * @returns {Promise<boolean>} Whether an edit is queued.
+ */
+function isEditPending(taskId) {
+  return withTaskStore(['pendingEdits'], 'readonly', transaction => {
+    const found = {pending: false};
+    transaction.objectStore('pendingEdits').count(taskId).onsuccess = event => {
+      found.pending = event.target.result > 0;
+    };
+    return found;
+  }).then(found => Boolean(found && found.pending));
+}
+
+/**
+ * Sends an edit to the server, conditional on the task still being at the
+ * version it was edited from.
+ *
+ * @param {Object} edit - The {taskId, changes, baseVersion} to send.
+ * @returns {Promise<Object>} The response's {status, body}, with an empty body
+ *     if it is not JSON; rejects if the server cannot be reached.
+ */
+function sendTaskEdit(edit) {
+  const headers = {'Content-Type': 'application/json'};
+  if (edit.baseVersion !== undefined) headers['If-Match'] = `"${edit.baseVersion}"`;
+  return fetch(`/edit_task/${edit.taskId}`, {
+    method: 'PUT',
+    headers,
+    body: JSON.stringify(edit.changes),
+  }).then(response => response.json().catch(() => ({})).
+      then(body => ({status: response.status, body})));
+}
+
+/**
+ * Settles a sent edit in the local copy: the server's copy of the task replaces
+ * the stored one (or the task is removed if it no longer exists) and the edit
+ * is dequeued, unless it was added to while it was being sent, in which case
+ * the rest is kept, based on the new version.
+ *
+ * @param {Object} edit - The edit that was sent.
+ * @param {Object|null|undefined} task - The server's copy of the task, null
+ *     if the task was deleted, or undefined to keep the stored copy.
+ * @param {boolean} discard - Dequeue the edit even if it was added to.
+ * @returns {Promise} Resolves once stored.
+ */
+function settleTaskEdit(edit, task, discard) {
+  return withTaskStore(['tasks', 'pendingEdits'], 'readwrite', transaction => {
+    const tasks = transaction.objectStore('tasks');
+    if (task) {
+      tasks.put(task);
+    } else if (task === null) {
+      tasks.delete(edit.taskId);
+    }
+    const pendingEdits = transaction.objectStore('pendingEdits');
+    pendingEdits.get(edit.taskId).onsuccess = event => {
+      const queued = event.target.result;
+      if (!queued) return;
+      if (discard || !task ||
+          JSON.stringify(queued.changes) === JSON.stringify(edit.changes)) {
+        pendingEdits.delete(edit.taskId);
+      } else {
+        pendingEdits.put({...queued, baseVersion: task.version});
+      }
+    };
+  });
+}
+
+/**
+ * Sends the queued edits one at a time, stopping at the first that cannot be
+ * delivered yet: the server is unreachable, rate limited (429) or busy (503).
+ * An edit whose task was changed by someone else since it was edited is a
+ * conflict: it is dropped and the server's copy is kept. An edit the server
+ * refuses for any other reason (e.g. invalid data) would fail again, so it is
+ * dropped too rather than holding up the edits behind it.
+ *
+ * @returns {Promise<Object>} The number of edits applied, the titles of the
+ *     conflicting tasks, and the {taskId, title, error} of each refused edit.
+ */
+function replayPendingEdits() {
+  const result = {applied: 0, conflicts: [], rejected: []};
+  return readLocalBoard().then(board => (board ? board.pending : []).reduce(
+      (chain, edit) => chain.then(proceed => proceed && sendTaskEdit(edit).then(
+          ({status, body}) => {
+            if (status === 200) {
+              result.applied++;
+              return settleTaskEdit(edit, body, false).then(() => true);
+            }
+            if (status === 404) return settleTaskEdit(edit, null, true).then(() => true);
+            if (status === 412 || status === 409) {
+              // 409 carries no task: keep the stored one until the next reconcile
+              result.conflicts.push(body.task ? body.task.title : `Task ${edit.taskId}`);
+              return settleTaskEdit(edit, body.task, true).then(() => true);
+            }
+            if (status === 429 || status === 503) return false; // retry later
+            return readLocalTask(edit.taskId).then(task => {
+              result.rejected.push({
+                taskId: edit.taskId,
+                title: task ? task.title : `Task ${edit.taskId}`,
+                error: body.error || `HTTP ${status}`,
+              });
+              // dequeue it; the stored copy of the task is still the server's
+              return settleTaskEdit(edit, undefined, true);
+            }).then(() => true);
+          }, () => false)), // still offline
+      Promise.resolve(true))).then(() => result);
+}
+
+/**
+ * Sends the queued edits (one replay at a time), tells the user about
+ * conflicts and refused edits, and reloads the board if anything changed.
+ *
+ * @returns {Promise<Object>} Resolves with the replay's result once it has
+ *     finished.
+ */
+function syncPendingEdits() {
+  if (!replayingEdits) {
+    replayingEdits = replayPendingEdits().then(result => {
+      result.conflicts.forEach(title => alert(
+          `"${title}" was changed by someone else before your edit ` +
+          'reached the server, so your edit was not applied.'));
+      result.rejected.forEach(({title, error}) => alert(
+          `Your edit of "${title}" was refused by the server (${error}), ` +
+          'so it was not applied.'));
+      if (result.applied || result.conflicts.length || result.rejected.length) {
+        return renderLocalBoard().then(() => result);
+      }
+      return result;
+    }).finally(() => {
+      replayingEdits = null;
+    });
+  }
+  return replayingEdits;
+}
+
 /**
  * Updates the task list in the DOM with the provided tasks.
  *
@@ -226,7 +669,7 @@ function displayCardView(tasks) {
       <span class="task-tag progress-tag">#${task.progress_tag}</span>
       <div class="development-tags"></div>
     </div>
-    <p class="task-description">${task.description}</p>
+    <p class="task-description">${getDescriptionPreview(task)}</p>
     Created At: ${task.created_at}<br>
     <button type="button" class="delete-task-btn" onclick="confirmDeletion('${task.title}', ${task.id})">&times;</button>
     </div>
@@ -345,7 +788,7 @@ function appendTaskToCardView(task) {
       <span class="task-tag progress-tag">#${task.progress_tag}</span>
       <div class="development-tags"></div>
     </div>
-    <p class="task-description">${task.description}</p>
+    <p class="task-description">${getDescriptionPreview(task)}</p>
     Created At: ${task.created_at}<br>
     <button type="button" class="delete-task-btn" onclick="confirmDeletion('${task.title}', ${task.id})">&times;</button>
     <button type="button" class="read-more-btn" onclick="openModal(${task.id})">Read More</button>
@@ -371,12 +814,7 @@ function appendTaskToCardView(task) {
 
 // Function to open the task details modal and display task details
 function openModal(taskId) {
-  fetch(`/get_task/${taskId}`, {
-    method: 'GET',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-  }).then(response => response.json()).then(task => {
+  getTaskDetails(taskId).then(task => {
     // Populate the modal with task details
     document.getElementById('modal-title').innerText = task.title;
     document.getElementById('modal-description').innerText = task.description;
@@ -385,14 +823,14 @@ function openModal(taskId) {
         task.priority_tag;
     document.getElementById('modal-status').innerText = '#' + task.progress_tag;
     document.getElementById('modal-development-tags').innerHTML = '';
-    document.querySelector('.development-tags').
+    document.getElementById('modal-development-tags').
         appendChild(decodeDevelopmentTags(task.development_bit_vector));
     document.getElementById('modal-creator').innerText = task.user;
     document.getElementById('modal-created-at').innerText = task.created_at;
 
     // Show the task details modal
     document.getElementById('task-details-modal').style.display = 'block';
-  });
+  }).catch(error => console.error('Error:', error));
 }
 
 // Function to close the task details modal
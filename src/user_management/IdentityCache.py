@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+ROLE_ADMIN = 'admin'
+ROLE_MEMBER = 'member'
+
+
+class Identity:
+    """Identity is what a request needs to know about its logged-in user, resolved once and then reused.
+
+    Attributes:
+    user_id (int): ID of the user
+    username (str): Current username of the user
+    role (str): Role of the user (e.g. ROLE_ADMIN)
+    """
+
+    def __init__(self, user_id: int, username: str, role: str):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == ROLE_ADMIN
+
+    def has_role(self, role: str | None) -> bool:
+        """Check whether the user may act in a role. Administrators may act in every role.
+
+        Args:
+            role (str | None): The required role, or None when any logged-in user will do
+
+        Returns:
+            bool: True if the user has the role
+        """
+        return role is None or self.role == role or self.is_admin
+
+    def __repr__(self):
+        return f'Identity({self.user_id}, {self.username!r}, {self.role!r})'
+
+
+class IdentityCache:
+    """IdentityCache maps session IDs to the Identity of their user for a limited time.
+
+    Entries expire ttl seconds after they were stored, so changes made outside the application are picked up
+    eventually. Changes made through the application should call invalidate_user instead of waiting. That only reaches
+    this process's cache, so with get_version, which reads a version counter that every process bumps when it changes a
+    user, the whole cache is dropped whenever the counter has moved; the counter is read at most once per
+    check_interval seconds, which bounds how long another process's change takes to apply here. When more than max_size
+    sessions are cached, the least recently used entries are dropped.
+
+    Attributes:
+    ttl (float): Seconds an entry stays valid
+    max_size (int): Maximum number of cached sessions
+    check_interval (float): Seconds the shared version is reused before it is read again
+    """
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 10000, get_version: Callable[[], int] = None,
+                 check_interval: float = 1.0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self._get_version = get_version
+        self._version = None
+        self._checked_at = None
+        self._entries: OrderedDict[str, tuple[Identity, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, session_id: str) -> Identity | None:
+        """Look up the identity of a session
+
+        Args:
+            session_id (str): ID of the session
+
+        Returns:
+            Identity | None: The cached identity, or None if it is missing or expired
+        """
+        self._check_version()
+        with self._lock:
+            identity, expires_at = self._entries.get(session_id, (None, 0.0))
+            if identity is None:
+                return None
+            if time.monotonic() >= expires_at:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return identity
+
+    def put(self, session_id: str, identity: Identity):
+        """Cache the identity of a session
+
+        Args:
+            session_id (str): ID of the session
+            identity (Identity): The session's identity
+        """
+        with self._lock:
+            self._entries[session_id] = (identity, time.monotonic() + self.ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, session_id: str):
+        """Forget a session, e.g. when it logs out
+
+        Args:
+            session_id (str): ID of the session
+        """
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Forget every session of a user, e.g. after their username or password changed
+
+        Args:
+            user_id (int): ID of the user
+
+        Returns:
+            int: The number of sessions forgotten
+        """
+        with self._lock:
+            stale = [session_id for session_id, (identity, _) in self._entries.items() if identity.user_id == user_id]
+            for session_id in stale:
+                del self._entries[session_id]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _check_version(self):
+        if self._get_version is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+        version = self._get_version()
+        with self._lock:
+            if self._version is not None and version != self._version:
+                self._entries.clear()
+            self._version = version
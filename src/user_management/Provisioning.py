@@ -0,0 +1,141 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Iterable, Iterator
+
+from flask_bcrypt import generate_password_hash
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.user_management.IdentityCache import ROLE_ADMIN, ROLE_MEMBER
+
+ROLES = (ROLE_ADMIN, ROLE_MEMBER)
+MAX_USERNAME_LENGTH = 15
+
+
+def hash_password(password: str, rounds: int = 12) -> str:
+    """Hash a password with bcrypt
+
+    Args:
+        password (str): The plain text password
+        rounds (int): bcrypt cost factor (log2 of the number of rounds)
+
+    Returns:
+        str: The password hash, as stored in User.password
+    """
+    return generate_password_hash(password, rounds).decode('utf-8')
+
+
+def read_users_csv(lines: Iterable[str]) -> Iterator[dict]:
+    """Read users from CSV lines with a header row, one row at a time
+
+    The username and password columns are required; role is optional and defaults to ROLE_MEMBER.
+
+    Args:
+        lines (Iterable[str]): The CSV lines, e.g. an open file
+
+    Returns:
+        Iterator[dict]: The line number, username, password and role of each user
+
+    Raises:
+        ValueError: The header lacks a username or password column
+    """
+    reader = csv.DictReader(lines)
+    # the header is checked straight away, before any row is requested
+    if not {'username', 'password'} <= set(reader.fieldnames or ()):
+        raise ValueError('The CSV must have a header with username and password columns')
+    return _read_users(reader)
+
+
+def _read_users(reader: csv.DictReader) -> Iterator[dict]:
+    for row in reader:
+        yield {
+            'line': reader.line_num,
+            'username': (row['username'] or '').strip(),
+            'password': row['password'] or '',
+            'role': (row.get('role') or ROLE_MEMBER).strip().lower()
+        }
+
+
+def provision_users(session: Session, model, users: Iterable[dict], batch_size: int = 500, rounds: int = 12,
+                    processes: int = None) -> Iterator[dict]:
+    """Create users in bulk, hashing their passwords across a process pool
+
+    Users are read in batches of batch_size. For each batch, invalid rows and usernames repeated in the input are
+    skipped, the remaining usernames are checked against the database with a single query, the new users' passwords
+    are hashed in parallel, and the batch is inserted and committed in one transaction. Usernames that already exist
+    are skipped rather than updated, so an interrupted run can simply be repeated.
+
+    Args:
+        session (Session): Session used to check and insert users, committed after every batch
+        model (db.Model): The user model, with username, password and role columns
+        users (Iterable[dict]): Users as produced by read_users_csv
+        batch_size (int): Maximum number of users inserted per transaction
+        rounds (int): bcrypt cost factor
+        processes (int): Number of hashing processes, defaults to the number of CPUs
+
+    Yields:
+        dict: The running totals after each batch: rows processed, users created, and the skipped rows (line,
+            username and reason)
+    """
+    processes = processes or os.cpu_count() or 1
+    report = {'processed': 0, 'created': 0, 'skipped': []}
+    seen = set()
+    users = iter(users)
+    executor = None
+    try:
+        while batch := list(islice(users, batch_size)):
+            candidates = []
+            for user in batch:
+                reason = _get_invalid_reason(user, seen)
+                if reason:
+                    report['skipped'].append({'line': user.get('line'), 'username': user['username'], 'reason': reason})
+                else:
+                    seen.add(user['username'])
+                    candidates.append(user)
+
+            usernames = [user['username'] for user in candidates]
+            existing = set(session.scalars(select(model.username).where(model.username.in_(usernames))))
+            new_users = []
+            for user in candidates:
+                if user['username'] in existing:
+                    report['skipped'].append({'line': user.get('line'), 'username': user['username'],
+                                              'reason': 'already exists'})
+                else:
+                    new_users.append(user)
+
+            if new_users:
+                passwords = [user['password'] for user in new_users]
+                if processes > 1 and len(new_users) > 1:
+                    executor = executor or ProcessPoolExecutor(processes)
+                    chunksize = max(1, len(passwords) // (processes * 4))
+                    hashes = list(executor.map(hash_password, passwords, repeat(rounds), chunksize=chunksize))
+                else:
+                    hashes = [hash_password(password, rounds) for password in passwords]
+                session.execute(insert(model), [
+                    {'username': user['username'], 'password': password_hash, 'role': user['role']}
+                    for user, password_hash in zip(new_users, hashes)
+                ])
+                session.commit()
+
+            report['processed'] += len(batch)
+            report['created'] += len(new_users)
+            yield report
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _get_invalid_reason(user: dict, seen: set[str]) -> str | None:
+    if not user['username']:
+        return 'missing username'
+    if len(user['username']) > MAX_USERNAME_LENGTH:
+        return f'username longer than {MAX_USERNAME_LENGTH} characters'
+    if not user['password']:
+        return 'missing password'
+    if user['role'] not in ROLES:
+        return 'unknown role'
+    if user['username'] in seen:
+        return 'duplicate in file'
+    return None
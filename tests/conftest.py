@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Point the application at a throwaway database before src.app is imported, so the test suite never touches
+# instance/sql_database.db
+os.environ.setdefault('DATABASE_URI', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test_database.db'))
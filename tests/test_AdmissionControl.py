@@ -0,0 +1,107 @@
+import multiprocessing
+import time
+
+import src.app as app_module
+from src.app import app, db, Task
+from src.request_handling.AdmissionControl import AdmissionState
+
+
+def take_tokens(path, count):
+    state = AdmissionState(path)
+    for _ in range(count):
+        state.take_token('shared', 0.001, 3)
+
+
+def test_token_bucket_refills_and_is_shared_across_processes(tmp_path):
+    """
+    Checks refill arithmetic with an explicit clock, and that a bucket drained by another process stays drained.
+    """
+    state = AdmissionState(str(tmp_path / 'admission.db'))
+    assert state.take_token('a', 1, 2, now=100) == 0.0
+    assert state.take_token('a', 1, 2, now=100) == 0.0
+    assert state.take_token('a', 1, 2, now=100) == 1.0
+    assert state.take_token('a', 1, 2, now=100.5) == 0.5
+    assert state.take_token('a', 1, 2, now=101) == 0.0
+    assert state.take_token('b', 1, 2, now=100) == 0.0
+
+    process = multiprocessing.get_context('spawn').Process(target=take_tokens, args=(str(tmp_path / 'admission.db'), 3))
+    process.start()
+    process.join()
+    assert state.take_token('shared', 0.001, 3) > 0
+
+
+def test_slots_are_capped_released_and_reclaimed(tmp_path):
+    """
+    Checks the concurrency cap, release, lease expiry and counters.
+    """
+    state = AdmissionState(str(tmp_path / 'admission.db'))
+    first = state.acquire_slot('write', 1)
+    assert first is not None
+    assert state.acquire_slot('write', 1) is None
+    state.release_slot(first)
+    assert state.acquire_slot('write', 1, lease=0.01) is not None
+    time.sleep(0.02)
+    assert state.acquire_slot('write', 1) is not None
+
+    state.count('rejected')
+    state.count('rejected', 2)
+    assert state.counters() == {'rejected': 3}
+
+
+def test_write_routes_reject_with_retry_after(tmp_path):
+    """
+    Checks 429 and 503 responses with Retry-After on write routes, and that rejections appear in the metrics.
+    """
+    config = {'ADMISSION_CONTROL': True, 'ADMISSION_STATE_PATH': str(tmp_path / 'admission.db'),
+              'RATE_LIMITS': {'add_task': (0.01, 2)}}
+    saved = {key: app.config[key] for key in config}
+    app.config.update(config)
+    app_module.admission_state = None
+    try:
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': '123'})
+        task = {'title': 'Limited', 'description': 'd', 'development_bit_vector': '00001', 'priority_tag': 'low',
+                'progress_tag': 'not-started'}
+        assert [client.post('/add_task', json=task).status_code for _ in range(3)] == [201, 201, 429]
+        response = client.post('/add_task', json=task)
+        assert response.status_code == 429 and 1 <= int(response.headers['Retry-After']) <= 100
+
+        app.config['WRITE_CONCURRENCY_LIMIT'], limit = 0, app.config['WRITE_CONCURRENCY_LIMIT']
+        try:
+            response = client.put('/edit_task/1', json={'title': 'Busy'})
+        finally:
+            app.config['WRITE_CONCURRENCY_LIMIT'] = limit
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+
+        assert client.get('/metrics').get_json()['counters'] == {'rejected.concurrency.edit_task': 1,
+                                                                 'rejected.rate_limit.add_task': 2}
+    finally:
+        app.config.update(saved)
+        app_module.admission_state = None
+        with app.app_context():
+            Task.query.filter_by(title='Limited').delete()
+            db.session.commit()
+
+
+def test_streamed_writes_hold_their_slot_until_sent(tmp_path):
+    """
+    Checks that a streamed write route (an import) keeps its concurrency slot until its response has been sent.
+    """
+    config = {'ADMISSION_CONTROL': True, 'ADMISSION_STATE_PATH': str(tmp_path / 'admission.db'),
+              'WRITE_CONCURRENCY_LIMIT': 1}
+    saved = {key: app.config[key] for key in config}
+    app.config.update(config)
+    app_module.admission_state = None
+    try:
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': '123'})
+        streaming = client.post('/import', data=b'', content_type='application/x-ndjson', buffered=False)
+        assert streaming.status_code == 200
+        assert client.put('/edit_task/1', json={'title': 'Busy'}).status_code == 503
+
+        assert b''.join(streaming.response)  # the import runs while its progress is streamed
+        streaming.close()
+        assert client.put('/edit_task/1', json={'title': 'Busy'}).status_code != 503
+    finally:
+        app.config.update(saved)
+        app_module.admission_state = None
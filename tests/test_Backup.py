@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import threading
+
+from src.database.Backup import (backup_file, create_backup, list_backups, restore_backup, rotate_backups,
+                                 verify_backup)
+
+
+def make_database(path, rows=2000):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+    connection.executemany('INSERT INTO item (name) VALUES (?)', ((f'item {i}' * 20,) for i in range(rows)))
+    connection.commit()
+    connection.close()
+
+
+def count_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT count(*) FROM item').fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_backup_while_writing(tmp_path):
+    """
+    Checks that a small-step backup completes, and produces a sound copy, while another connection keeps writing.
+    """
+    source = str(tmp_path / 'live.db')
+    make_database(source)
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        connection = sqlite3.connect(source, timeout=5)
+        while not stop.is_set():
+            connection.execute("INSERT INTO item (name) VALUES ('concurrent')")
+            connection.commit()
+            written.append(1)
+            stop.wait(0.002)
+        connection.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        stats = backup_file(source, str(tmp_path / 'copy.db'), pages=5, sleep=0.001, max_restarts=3)
+    finally:
+        stop.set()
+        thread.join()
+    assert written
+    assert stats['steps'] > 1
+    assert count_rows(str(tmp_path / 'copy.db')) >= 2000
+
+
+def test_verify_rotate_and_restore(tmp_path):
+    """
+    Checks that backups verify, that a corrupted file is reported, that rotation keeps the newest backups and that a
+    restore brings back the backed up rows.
+    """
+    source = str(tmp_path / 'live.db')
+    make_database(source, rows=50)
+    directory = str(tmp_path / 'backups')
+    paths = [create_backup({'main': source}, directory, pages=8, sleep=0) for _ in range(3)]
+    assert list_backups(directory) == paths
+    assert verify_backup(paths[-1]) == []
+
+    with open(os.path.join(paths[0], 'main.db'), 'r+b') as file:
+        file.seek(200)
+        file.write(b'corrupted')
+    assert verify_backup(paths[0]) == ['main: checksum mismatch']
+
+    assert rotate_backups(directory, keep=2) == paths[:1]
+    assert list_backups(directory) == paths[1:]
+
+    connection = sqlite3.connect(source)
+    connection.execute('DELETE FROM item')
+    connection.commit()
+    assert restore_backup(paths[-1]) == {'main': os.path.abspath(source)}
+    assert connection.execute('SELECT count(*) FROM item').fetchone()[0] == 50
+    connection.close()
@@ -0,0 +1,98 @@
+from sqlalchemy import event
+
+from src.analytics.DuplicateIndex import DuplicateIndex
+from src.app import app, db, Task, TaskChange, TaskSignature, duplicate_indexes
+
+
+def test_query_finds_near_duplicates_only():
+    """
+    Checks that reworded copies are found with a high similarity, unrelated texts are not, and removal is honoured.
+    """
+    index = DuplicateIndex()
+    texts = {
+        1: 'Fix login page crash when the password field is empty',
+        2: 'Add dark mode toggle to the settings page',
+        3: 'Write API documentation for the task endpoints',
+    }
+    for key, text in texts.items():
+        index.add(key, index.signature(text))
+
+    matches = index.query(index.signature('Fix the login page crash when password field is empty'))
+    assert [key for key, _ in matches] == [1]
+    assert matches[0][1] >= 0.7
+    assert index.query(index.signature('Migrate the build to a new CI provider')) == []
+    assert index.query(index.signature(texts[2]), exclude=2) == []
+
+    index.remove(1)
+    assert 1 not in index
+    assert index.query(index.signature(texts[1])) == []
+    assert index.query(index.signature('')) == []
+
+
+def test_duplicates_follow_task_changes_and_persist():
+    """
+    Checks the suggestions returned by add_task and /tasks/duplicates after edits, and after reloading the index from
+    the stored signatures.
+    """
+    with app.app_context():
+        Task.query.delete()
+        TaskChange.query.delete()
+        TaskSignature.query.delete()
+        db.session.commit()
+    duplicate_indexes.clear()
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    task = {'development_bit_vector': '00001', 'priority_tag': 'low', 'progress_tag': 'not-started', 'story_point': 1}
+    first = client.post('/add_task', json={**task, 'title': 'Export board to CSV',
+                                           'description': 'Let users download the whole board as a CSV file'})
+    assert first.get_json()['possible_duplicates'] == []
+    first_id = first.get_json()['id']
+
+    second = client.post('/add_task', json={**task, 'title': 'Export the board to CSV',
+                                            'description': 'Let users download the board as a CSV file'}).get_json()
+    assert [match['id'] for match in second['possible_duplicates']] == [first_id]
+    assert second['possible_duplicates'][0]['title'] == 'Export board to CSV'
+
+    duplicate_indexes.clear()
+    response = client.get('/tasks/duplicates', query_string={'task_id': second['id']})
+    assert [match['id'] for match in response.get_json()['duplicates']] == [first_id]
+
+    client.put(f'/edit_task/{first_id}', json={'title': 'Upgrade database driver',
+                                               'description': 'Move to the latest driver release'})
+    response = client.post('/tasks/duplicates', json={'title': 'Export board to CSV',
+                                                           'description': 'Download the board as a CSV file'})
+    assert [match['id'] for match in response.get_json()['duplicates']] == [second['id']]
+    assert client.get('/tasks/duplicates').status_code == 400
+
+
+def test_add_task_stores_its_signature_in_the_same_commit():
+    """
+    Checks that add_task commits once, with the new task's signature, and that the index picks it up without writing
+    it again; and that a malformed task_id is a client error.
+    """
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    task = {'development_bit_vector': '00001', 'priority_tag': 'low', 'progress_tag': 'not-started', 'story_point': 1,
+            'title': 'Archive old sprints', 'description': 'Move finished sprints out of the board'}
+    client.post('/add_task', json=task)  # warms up the index
+
+    commits = []
+    with app.app_context():
+        engine = db.engine
+    record = lambda conn: commits.append(conn)  # noqa: E731
+    event.listen(engine, 'commit', record)
+    try:
+        created = client.post('/add_task', json={**task, 'title': 'Archive the old sprints'}).get_json()
+    finally:
+        event.remove(engine, 'commit', record)
+    assert len(commits) == 1
+    assert created['possible_duplicates'] and created['id'] in duplicate_indexes[1]
+    with app.app_context():
+        assert db.session.get(TaskSignature, created['id']) is not None
+
+    for task_id in ('abc', [1]):
+        assert client.post('/tasks/duplicates', json={'task_id': task_id}).status_code == 400
+    assert client.post('/tasks/duplicates', json=[1, 2]).status_code == 400
@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.analytics.Forecast import forecast, simulate_sprints_needed, sprint_velocities
+from src.app import app, db, Task, ArchivedTask, forecast_cache
+
+
+def test_sprint_velocities_total_points_per_window():
+    """
+    Checks that completions are totalled per window and completions outside every window are ignored.
+    """
+    start = datetime(2024, 1, 1)
+    windows = [(start, start + timedelta(days=14)), (start + timedelta(days=21), start + timedelta(days=35))]
+    completed_at = np.array([start + timedelta(days=d) for d in (0, 13, 14, 22, 40, -1)], dtype='datetime64[us]')
+    velocities = sprint_velocities(completed_at, np.array([1, 2, 4, 8, 16, 32]), windows)
+    assert velocities.tolist() == [3, 8]
+
+
+def test_constant_velocity_gives_an_exact_forecast():
+    """
+    Checks the simulation when every sprint completes the same number of points.
+    """
+    assert forecast(95, np.array([10, 10, 10]), percentiles=[5, 50, 95], seed=1) == {5: 10, 50: 10, 95: 10}
+    assert forecast(0, np.array([10])) == {50: 0, 85: 0, 95: 0}
+    with pytest.raises(ValueError):
+        simulate_sprints_needed(10, np.array([0, 0]))
+
+
+def test_long_forecasts_are_simulated_in_blocks_and_bounded():
+    """
+    Checks that a forecast longer than one block of sprints is still exact, and that a backlog too large for the
+    velocity is rejected instead of drawing a huge matrix.
+    """
+    assert forecast(300, np.array([1, 1]), percentiles=[50], simulations=100, seed=1) == {50: 300}
+    assert forecast(3000, np.array([10]), percentiles=[50], simulations=200000, seed=1) == {50: 300}
+    start = time.perf_counter()
+    with pytest.raises(ValueError, match='too far ahead'):
+        simulate_sprints_needed(5000, np.array([1] + [0] * 9))
+    assert time.perf_counter() - start < 1
+
+
+def test_forecast_percentiles_are_ordered():
+    """
+    Checks that higher confidence levels never need fewer sprints, including for slow velocity samples.
+    """
+    result = forecast(500, np.array([0, 1, 5, 30]), percentiles=[10, 50, 90, 99], seed=3)
+    assert list(result.values()) == sorted(result.values())
+    assert result[10] >= 500 // 30
+
+
+def test_forecast_endpoint_is_fast_and_cached():
+    """
+    Checks the endpoint on a 5k task backlog with completion history, and that new completions refresh the forecast.
+    """
+    generator = random.Random(5)
+    now = datetime.now()
+    with app.app_context():
+        Task.query.delete()
+        ArchivedTask.query.delete()
+        db.session.add_all([
+            Task(title=f'Task {i}', description='d', story_point=generator.randint(1, 10),
+                 development_bit_vector='00001', priority_tag='low', progress_tag='not-started', user='admin',
+                 created_at='now')
+            for i in range(5000)
+        ])
+        for i in range(300):
+            task = Task(title=f'Done {i}', description='d', story_point=5, development_bit_vector='00001',
+                        priority_tag='low', progress_tag='completed', user='admin', created_at='now')
+            task.completed_at = now - timedelta(days=generator.uniform(0, 140))
+            db.session.add(task)
+        db.session.commit()
+    forecast_cache.clear()
+
+    client = app.test_client()
+    start = time.perf_counter()
+    first = client.get('/forecast').get_json()
+    assert time.perf_counter() - start < 0.5
+    assert first['remaining_tasks'] == 5000
+    assert first['sprints']['50'] <= first['sprints']['85'] <= first['sprints']['95']
+    assert client.get('/forecast').get_json() == first
+
+    task_id = client.get('/get_tasks').get_json()['tasks'][0]['id']
+    client.put(f'/edit_task/{task_id}', json={'progress_tag': 'completed'})
+    assert client.get('/forecast').get_json()['remaining_tasks'] == 4999
+    assert client.get('/forecast', query_string={'percentiles': '150'}).status_code == 400
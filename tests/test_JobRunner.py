@@ -0,0 +1,128 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.app import app, db, Job, Task, job_runner
+from src.background.JobRunner import CANCELLED, QUEUED, RUNNING, SUCCEEDED, JobContext
+
+release = threading.Event()
+runs = []
+
+
+def blocking_job(context):
+    """
+    Report progress until released, so tests can observe queued and running jobs.
+    """
+    runs.append(context.params)
+    while not release.wait(0.01):
+        context.progress(0.5)
+    return {'params': context.params}
+
+
+job_runner.register('test-blocking', blocking_job)
+
+
+def wait_for_status(job_id, *statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            job = db.session.get(Job, job_id)
+            if job.status in statuses:
+                return job
+        time.sleep(0.01)
+    raise AssertionError(f'job {job_id} never reached {statuses}')
+
+
+def test_dedup_cancel_and_bounded_pool():
+    """
+    Checks that a duplicate submission returns the active job, that the pool runs at most JOB_WORKERS jobs, and that
+    queued and running jobs can both be cancelled.
+    """
+    release.clear()
+    runs.clear()
+    first, deduplicated = job_runner.submit('test-blocking', {'n': 1})
+    assert not deduplicated
+    assert job_runner.submit('test-blocking', {'n': 1}) == (first, True)
+    second, _ = job_runner.submit('test-blocking', {'n': 2})
+    third, _ = job_runner.submit('test-blocking', {'n': 3})
+    wait_for_status(first, RUNNING)
+    wait_for_status(second, RUNNING)
+    assert wait_for_status(third, QUEUED).status == QUEUED
+
+    assert job_runner.cancel(third)
+    assert job_runner.cancel(second)
+    assert wait_for_status(second, CANCELLED).progress == 0.5
+    release.set()
+    job = wait_for_status(first, SUCCEEDED)
+    assert job.progress == 1.0 and job.result == '{"params": {"n": 1}}'
+    assert wait_for_status(third, CANCELLED).started_at is None
+    assert {'n': 3} not in runs
+    assert not job_runner.cancel(first)
+    assert job_runner.submit('test-blocking', {'n': 1})[1] is False
+
+
+def test_recover_requeues_abandoned_jobs():
+    """
+    Checks that a job left running by a dead process is run again, while a recently active one is left alone.
+    """
+    release.set()
+    with app.app_context():
+        stale = datetime.now() - timedelta(seconds=job_runner.stale_after + 1)
+        jobs = [Job(kind='test-blocking', dedup_key=key, params='{"recovered": true}', status=RUNNING,
+                    created_at=stale, updated_at=updated_at) for key, updated_at in (('a', stale), ('b', datetime.now()))]
+        db.session.add_all(jobs)
+        db.session.commit()
+        abandoned, alive = jobs[0].id, jobs[1].id
+
+    assert job_runner.recover() >= 1
+    assert wait_for_status(abandoned, SUCCEEDED).result == '{"params": {"recovered": true}}'
+    with app.app_context():
+        assert db.session.get(Job, alive).status == RUNNING
+        db.session.get(Job, alive).status = CANCELLED
+        db.session.commit()
+
+
+def test_job_endpoints_run_an_archive():
+    """
+    Checks submitting, polling and cancelling jobs through the API.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.add(Task(title='Old', description='d', story_point=1, development_bit_vector='00001',
+                            priority_tag='low', progress_tag='completed', user='admin', created_at='now',
+                            completed_at=datetime.now() - timedelta(days=60)))
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    assert client.post('/jobs', json={'kind': 'nope'}).status_code == 400
+    response = client.post('/jobs', json={'kind': 'archive-tasks', 'params': {'days': 30}})
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['id']
+    assert response.headers['Location'].endswith(f'/jobs/{job_id}')
+
+    wait_for_status(job_id, SUCCEEDED)
+    job = client.get(f'/jobs/{job_id}').get_json()
+    assert job['result'] == {'archived': 1} and job['progress'] == 1.0
+    assert job_id in [job['id'] for job in client.get('/jobs', query_string={'status': 'succeeded'}).get_json()['jobs']]
+    assert client.post(f'/jobs/{job_id}/cancel').status_code == 409
+    assert client.get('/jobs/999999').status_code == 404
+
+
+def test_export_and_backup_jobs_report_progress(tmp_path, monkeypatch):
+    """
+    Checks that export and backup jobs report progress while they run, which keeps recover from taking a long job for
+    an abandoned one.
+    """
+    reported = []
+    progress = JobContext.progress
+    monkeypatch.setattr(JobContext, 'progress', lambda context, fraction: (reported.append((context.kind, fraction)),
+                                                                            progress(context, fraction)))
+    monkeypatch.setitem(app.config, 'EXPORT_DIRECTORY', str(tmp_path / 'exports'))
+    monkeypatch.setitem(app.config, 'BACKUP_DIRECTORY', str(tmp_path / 'backups'))
+
+    for kind in ('export-data', 'backup'):
+        job_id, _ = job_runner.submit(kind)
+        wait_for_status(job_id, SUCCEEDED)
+    assert {kind for kind, _ in reported} == {'export-data', 'backup'}
+    assert ('backup', 1.0) in reported
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+import src.app as app_module
+from src.app import app
+from src.request_handling.Profiler import (ProfileRing, ProfilerBusy, SamplingProfiler, SlowRequestWatchdog,
+                                           format_collapsed)
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_collapses_stacks_and_ring_rotates(tmp_path):
+    """
+    Checks that sampled stacks name the busy function under its thread, that only one profile runs at a time, and
+    that the ring keeps only the newest profiles.
+    """
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name='spinner')
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    try:
+        counts = profiler.sample(0.1, thread_ids={worker.ident})
+    finally:
+        stop.set()
+        worker.join()
+    assert counts and all(stack.startswith('spinner;') for stack in counts)
+    assert any('spin (test_Profiler.py' in stack for stack in counts)
+    assert format_collapsed(counts).splitlines()[0].rsplit(' ', 1)[1] == str(counts.most_common(1)[0][1])
+
+    with profiler._lock, pytest.raises(ProfilerBusy):
+        profiler.sample(0.01)
+
+    ring = ProfileRing(str(tmp_path), capacity=2)
+    names = [ring.save(counts, f'label {i}') for i in range(3)]
+    assert [profile['name'] for profile in ring.list_profiles()] == names[:0:-1]
+    assert ring.read(names[0]) is None and ring.read(names[2]) == format_collapsed(counts)
+
+
+def slow_request(watchdog, stop):
+    watchdog.track('slow_endpoint')
+    try:
+        spin(stop)
+    finally:
+        watchdog.untrack()
+
+
+def test_watchdog_profiles_a_slow_request_while_it_runs(tmp_path):
+    """
+    Checks that a request running past the threshold is profiled until it finishes and the profile is stored.
+    """
+    ring = ProfileRing(str(tmp_path))
+    watchdog = SlowRequestWatchdog(SamplingProfiler(0.001), ring, threshold=0.05, duration=5, cooldown=60)
+    stop = threading.Event()
+    request_thread = threading.Thread(target=slow_request, args=(watchdog, stop))
+    request_thread.start()
+    time.sleep(0.3)
+    stop.set()
+    request_thread.join()
+    for _ in range(100):
+        if ring.list_profiles():
+            break
+        time.sleep(0.01)
+
+    profiles = ring.list_profiles()
+    assert len(profiles) == 1 and profiles[0]['label'] == 'slow_endpoint'
+    assert profiles[0]['trigger'] == 'slow-request' and profiles[0]['running_for'] < 1
+    assert 'slow_request (test_Profiler.py' in ring.read(profiles[0]['name'])
+
+
+def test_profile_endpoint_is_admin_only(tmp_path, monkeypatch):
+    """
+    Checks that admins can profile the worker and list the result, and that members cannot.
+    """
+    monkeypatch.setattr(app_module, 'profile_ring', ProfileRing(str(tmp_path)))
+    client = app.test_client()
+    client.post('/login', data={'username': 'Xin', 'password': '123'})
+    assert client.post('/admin/profile', query_string={'seconds': 0.05}).status_code in (302, 403)
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    assert client.post('/admin/profile', query_string={'seconds': 0}).status_code == 400
+    response = client.post('/admin/profile', query_string={'seconds': 0.05})
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    name = response.headers['X-Profile-Name']
+    assert [profile['name'] for profile in client.get('/admin/profiles').get_json()['profiles']] == [name]
+    assert client.get(f'/admin/profiles/{name}').get_data(as_text=True) == response.get_data(as_text=True)
+    assert client.get('/admin/profiles/missing').status_code == 404
@@ -0,0 +1,153 @@
+import sqlite3
+
+import pytest
+from flask import g
+from sqlalchemy import MetaData, create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import src.app as app_module
+from src.app import app, db, Task, TaskCounter, repair_task_counters
+from src.database.Sharding import ShardDirectory, split_database
+
+TASK_ROW = {
+    'description': 'Sharded task', 'story_point': 1, 'development_bit_vector': '00001', 'priority_tag': 'low',
+    'progress_tag': 'not-started', 'user': 'admin', 'created_at': 'Sunday 20 October, 09:15 PM', 'version': 1
+}
+
+
+@pytest.fixture
+def shards(tmp_path):
+    """
+    Provide a shard directory holding the application's per-project tables.
+    """
+    shards = ShardDirectory(str(tmp_path / 'shards'), db.metadata, app.config['SHARDED_TABLES'], idle_timeout=60)
+    yield shards
+    shards.dispose()
+
+
+def test_writes_to_different_projects_do_not_block_each_other(shards):
+    """
+    Checks that holding the write lock on one project's shard does not stop writes to another project.
+    """
+    task_table = Task.__table__
+    shards.engine_for(1)
+    blocker = sqlite3.connect(shards.path_for(1), isolation_level=None)
+    blocker.execute('BEGIN IMMEDIATE')
+    try:
+        with shards.engine_for(2).begin() as connection:
+            connection.execute(insert(task_table), [{**TASK_ROW, 'title': 'Project 2', 'project_id': 2}])
+
+        locked_engine = create_engine(f'sqlite:///{shards.path_for(1)}', connect_args={'timeout': 0.1})
+        with pytest.raises(OperationalError):
+            with locked_engine.begin() as connection:
+                connection.execute(insert(task_table), [{**TASK_ROW, 'title': 'Project 1', 'project_id': 1}])
+        locked_engine.dispose()
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert shards.project_ids() == [1, 2]
+
+
+def test_idle_shards_are_closed_and_reopened(shards):
+    """
+    Checks that idle shards release their connections and reconnect on their next use.
+    """
+    shards.idle_timeout = 0
+    with shards.engine_for(1).connect() as connection:
+        connection.exec_driver_sql('SELECT 1')
+    assert shards.close_idle() == 1
+    assert shards.close_idle() == 0
+    with shards.engine_for(1).connect() as connection:
+        assert connection.exec_driver_sql('SELECT COUNT(*) FROM task').scalar() == 0
+
+
+def test_requests_are_routed_to_their_project_shard(shards):
+    """
+    Checks that task routes only see the tasks of the project named in the request.
+    """
+    app_module.shard_directory = shards
+    try:
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        response = client.post('/add_task', query_string={'project': 2}, json={
+            'title': 'Project 2 task', 'description': 'Only in project 2', 'story_point': 2,
+            'development_bit_vector': '00001', 'priority_tag': 'low', 'progress_tag': 'not-started'
+        })
+        assert response.status_code == 201
+
+        project_2 = client.get('/get_tasks', headers={'X-Project-Id': '2'}).get_json()['tasks']
+        project_3 = client.get('/get_tasks', query_string={'project': 3}).get_json()['tasks']
+        assert [task['title'] for task in project_2] == ['Project 2 task']
+        assert project_3 == []
+    finally:
+        app_module.shard_directory = None
+
+    with app.app_context():
+        assert Task.query.filter_by(title='Project 2 task').first() is None
+
+
+def test_task_counters_are_repaired_in_the_project_shard(shards):
+    """
+    Checks that repairing the counters rebuilds them from the shard's own tasks, rather than deleting them in the shard
+    and rebuilding them in the main database.
+    """
+    app_module.shard_directory = shards
+    try:
+        with shards.engine_for(2).begin() as connection:
+            connection.execute(insert(Task.__table__), [{**TASK_ROW, 'title': f'Task {i}', 'story_point': 1,
+                                                         'project_id': 2} for i in range(3)])
+            connection.execute(TaskCounter.__table__.update().values(task_count=99))
+        with app.app_context():
+            g.project_id = 2
+            assert repair_task_counters() == 1
+            counters = db.session.execute(select(TaskCounter.progress_tag, TaskCounter.sprint_id,
+                                                 TaskCounter.task_count, TaskCounter.story_points)).all()
+            assert counters == [('not-started', 0, 3, 3)]
+    finally:
+        app_module.shard_directory = None
+
+
+def test_split_database_copies_each_project_into_its_shard(shards, tmp_path):
+    """
+    Checks that splitting a single database puts every task into its project's shard, and can be re-run.
+    """
+    source = create_engine(f'sqlite:///{tmp_path / "source.db"}')
+    db.metadata.create_all(source, tables=[Task.__table__])
+    with source.begin() as connection:
+        connection.execute(insert(Task.__table__), [
+            {**TASK_ROW, 'title': f'Task {i}', 'project_id': 1 + i % 2} for i in range(7)
+        ])
+
+    assert split_database(source, shards, batch_size=2) == {1: 4, 2: 3}
+    assert split_database(source, shards, batch_size=2) == {1: 4, 2: 3}
+    with shards.engine_for(2).connect() as connection:
+        titles = connection.scalars(select(Task.__table__.c.title).order_by(Task.__table__.c.id)).all()
+    assert titles == ['Task 1', 'Task 3', 'Task 5']
+    source.dispose()
+
+
+def test_tasks_default_to_the_configured_project(tmp_path, monkeypatch):
+    """
+    Checks that new tasks and the tasks of a table created before projects existed both get DEFAULT_PROJECT_ID.
+    """
+    monkeypatch.setitem(app.config, 'DEFAULT_PROJECT_ID', 7)
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    old_task = Task.__table__.to_metadata(MetaData())
+    old_task.create(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('ALTER TABLE task DROP COLUMN project_id')
+        connection.exec_driver_sql(
+            "INSERT INTO task (title, description, story_point, development_bit_vector, priority_tag, progress_tag, "
+            "user, created_at, version) VALUES ('Before projects', 'd', 1, '00001', 'low', 'not-started', 'admin', "
+            "'now', 1)"
+        )
+
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Task(title='After projects', **{key: value for key, value in TASK_ROW.items() if key != 'version'}))
+        session.commit()
+        assert session.execute(select(Task.title, Task.project_id).order_by(Task.id)).all() == [
+            ('Before projects', 7), ('After projects', 7)
+        ]
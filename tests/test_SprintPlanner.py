@@ -0,0 +1,97 @@
+import itertools
+import random
+import time
+
+from src.app import app, db, Task
+from src.project_management.SprintPlanner import PRIORITY_WEIGHTS, plan_sprints
+from src.project_management.Task import Priority
+
+
+def value_of(tasks):
+    """
+    Total priority-weighted value of a collection of backlog tasks.
+    """
+    return sum(PRIORITY_WEIGHTS[task['priority']] for task in tasks)
+
+
+def test_single_sprint_plan_is_optimal():
+    """
+    Checks the planner against an exhaustive search on small random backlogs.
+    """
+    generator = random.Random(7)
+    for _ in range(30):
+        backlog = [{'id': i, 'story_point': generator.randint(1, 10), 'priority': generator.choice(list(Priority))}
+                   for i in range(10)]
+        capacity = generator.randint(5, 30)
+
+        [sprint] = plan_sprints(backlog, [capacity])
+        chosen = [task for task in backlog if task['id'] in sprint]
+        assert sum(task['story_point'] for task in chosen) <= capacity
+
+        best = max(value_of(subset) for size in range(len(backlog) + 1)
+                   for subset in itertools.combinations(backlog, size)
+                   if sum(task['story_point'] for task in subset) <= capacity)
+        assert value_of(chosen) == best
+
+
+def test_sprints_are_filled_in_order_without_reusing_tasks():
+    """
+    Checks that urgent work lands in the first sprint and no task is planned twice.
+    """
+    backlog = ([{'id': i, 'story_point': 5, 'priority': Priority.LOW} for i in range(4)]
+               + [{'id': 10 + i, 'story_point': 5, 'priority': Priority.URGENT} for i in range(2)])
+    first, second = plan_sprints(backlog, [10, 10])
+    assert sorted(first) == [10, 11]
+    assert sorted(second) == [0, 1]
+
+
+def test_large_backlog_is_planned_quickly():
+    """
+    Checks that a 10k task backlog is planned across several sprints well under a second.
+    """
+    generator = random.Random(1)
+    backlog = [{'id': i, 'story_point': generator.randint(1, 10), 'priority': generator.choice(list(Priority))}
+               for i in range(10000)]
+    start = time.perf_counter()
+    plan = plan_sprints(backlog, [200] * 10)
+    assert time.perf_counter() - start < 0.5
+    assert len({task_id for sprint in plan for task_id in sprint}) == sum(len(sprint) for sprint in plan)
+
+
+def test_huge_capacity_is_bounded_by_the_backlog():
+    """
+    Checks that a sprint capacity far beyond the backlog takes the whole backlog without sizing the table by it.
+    """
+    backlog = [{'id': i, 'story_point': 3, 'priority': Priority.LOW} for i in range(5)]
+    start = time.perf_counter()
+    first, second = plan_sprints(backlog, [10 ** 12, 10 ** 12])
+    assert time.perf_counter() - start < 0.5
+    assert sorted(first) == list(range(5)) and second == []
+
+
+def test_plan_endpoint_returns_and_applies_a_batch_diff():
+    """
+    Checks that the plan endpoint only changes tasks whose sprint moves, and that applying it updates the board.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all([
+            Task(title=f'Task {i}', description='d', story_point=4, development_bit_vector='00001',
+                 priority_tag=priority, progress_tag='not-started', user='admin', created_at='now',
+                 sprint_id=sprint_id)
+            for i, (priority, sprint_id) in enumerate([('urgent', 1), ('low', 1), ('important', None)])
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    response = client.post('/sprints/plan', json={'sprints': [{'id': 1, 'capacity': 8}], 'apply': True})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['applied'] is True
+    assert body['sprints'][0]['story_points'] == 8
+    assert sorted(operation['data']['sprint_id'] is None for operation in body['operations']) == [False, True]
+
+    sprints = {task['title']: task['sprint_id'] for task in client.get('/get_tasks').get_json()['tasks']}
+    assert sprints == {'Task 0': 1, 'Task 1': None, 'Task 2': 1}
+
+    assert client.post('/sprints/plan', json={'sprints': [{'id': 1, 'capacity': 0}]}).status_code == 400
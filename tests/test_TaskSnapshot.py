@@ -0,0 +1,99 @@
+from src.analytics.TaskSnapshot import TaskSnapshot
+from src.app import app, db, Task, TaskChange, task_snapshots
+from src.project_management.Task import Priority, Status, Tag
+
+
+def make_task(task_id, story_point, priority_tag='low', progress_tag='not-started', bits='00001', user='admin'):
+    """
+    Build a task dictionary in the format returned by get_task_schema.
+    """
+    return {'id': task_id, 'story_point': story_point, 'priority_tag': priority_tag, 'progress_tag': progress_tag,
+            'development_bit_vector': bits, 'user': user}
+
+
+def test_group_by_filter_and_histogram():
+    """
+    Checks the vectorised aggregations against a small hand-checked board.
+    """
+    snapshot = TaskSnapshot(capacity=2)
+    snapshot.upsert([
+        make_task(1, 5, 'urgent', 'completed', '00011', 'Alicia'),
+        make_task(2, 3, 'urgent', 'in-progress', '00010', 'Xin'),
+        make_task(3, 2, 'low', 'not-started', '01000', 'Alicia'),
+        make_task(4, 8, 'medium', 'completed', '00001', 'Xin'),
+    ])
+
+    assert snapshot.group_by('priority') == {'Low': 2.0, 'Medium': 8.0, 'Urgent': 8.0}
+    assert snapshot.group_by('user', agg='count') == {'Alicia': 2.0, 'Xin': 2.0}
+    assert snapshot.group_by('status', agg='mean') == {'In-progress: Development': 3.0, 'Complete': 6.5,
+                                                       'Not Started': 2.0}
+    assert snapshot.group_by('tag') == {'Front-end': 13.0, 'Back-end': 8.0, 'API': 2.0}
+
+    urgent = snapshot.mask(priority=Priority.URGENT)
+    assert snapshot.group_by('user', mask=urgent) == {'Alicia': 5.0, 'Xin': 3.0}
+    done_front_end = snapshot.mask(status=Status.COMPLETE, tag=Tag.FRONT_END, min_points=6)
+    assert snapshot.group_by('user', mask=done_front_end) == {'Xin': 8.0}
+
+    counts, edges = snapshot.histogram(bins=[0, 4, 10])
+    assert counts == [2, 2]
+    assert edges == [0, 4, 10]
+
+
+def test_upsert_and_remove_update_rows_in_place():
+    """
+    Checks that replacing and removing tasks keeps aggregates correct, including after compaction.
+    """
+    snapshot = TaskSnapshot()
+    snapshot.upsert(make_task(i, 1) for i in range(3000))
+    snapshot.upsert([make_task(0, 10, 'urgent'), make_task(0, 20, 'urgent')])
+    assert len(snapshot) == 3000
+    assert snapshot.group_by('priority') == {'Low': 2999.0, 'Urgent': 20.0}
+
+    snapshot.remove(range(1, 2000))
+    assert len(snapshot) == 1001
+    assert snapshot.group_by('priority', agg='count') == {'Low': 1000.0, 'Urgent': 1.0}
+    snapshot.upsert([make_task(2500, 4, 'medium')])
+    assert snapshot.group_by('priority') == {'Low': 999.0, 'Medium': 4.0, 'Urgent': 20.0}
+
+
+def test_snapshot_refreshes_from_the_task_change_stream():
+    """
+    Checks that the application's snapshot follows inserts, edits and deletes made through any write path.
+    """
+    with app.app_context():
+        Task.query.delete()
+        TaskChange.query.delete()
+        db.session.commit()
+    task_snapshots.clear()
+    refresh_interval, app.config['ANALYTICS_REFRESH_INTERVAL'] = app.config['ANALYTICS_REFRESH_INTERVAL'], 0
+    try:
+        check_snapshot_follows_task_changes()
+    finally:
+        app.config['ANALYTICS_REFRESH_INTERVAL'] = refresh_interval
+
+
+def check_snapshot_follows_task_changes():
+    """
+    Create, edit and delete tasks through the routes and check the analytics endpoints after each step.
+    """
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    created = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': f'Task {i}', 'description': 'd', 'story_point': i,
+                                  'development_bit_vector': '00001', 'priority_tag': 'urgent',
+                                  'progress_tag': 'not-started'}} for i in range(1, 5)
+    ]}).get_json()['results']
+    assert client.get('/analytics/tasks', query_string={'group_by': 'priority'}).get_json()['groups'] == {
+        'Urgent': 10.0
+    }
+
+    client.put(f'/edit_task/{created[0]["id"]}', json={'priority_tag': 'low'})
+    client.delete(f'/delete_task/{created[1]["id"]}')
+    response = client.get('/analytics/tasks', query_string={'group_by': 'priority', 'agg': 'count'})
+    assert response.get_json()['groups'] == {'Low': 1.0, 'Urgent': 2.0}
+
+    response = client.get('/analytics/histogram', query_string={'priority': 'urgent'})
+    assert response.get_json()['counts'] == [0, 0, 0, 1, 1]
+    assert client.get('/analytics/tasks', query_string={'status': 'bogus'}).status_code == 400
@@ -0,0 +1,91 @@
+import io
+import json
+
+from src.app import app, db, ArchivedTask, Task, TaskCounter, get_transfer_tables
+from src.database.Transfer import import_ndjson
+
+
+def make_task(i, **kwargs):
+    return Task(title=f'Transfer {i}', description='d', story_point=i, development_bit_vector='00001',
+                priority_tag='urgent' if i % 2 else 'low', progress_tag='not-started', user='admin', created_at='now',
+                **kwargs)
+
+
+def test_export_import_round_trip():
+    """
+    Checks that exported tasks come back identical, computed columns and counters included, after they are deleted.
+    """
+    with app.app_context():
+        Task.query.delete()
+        ArchivedTask.query.delete()
+        db.session.add_all([make_task(i, sprint_id=i % 3 or None) for i in range(1, 8)])
+        db.session.commit()
+        before = [(task.id, task.title, task.priority, task.sprint_id, task.version) for task in Task.query.all()]
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    export = client.get('/export').get_data(as_text=True).splitlines()
+    header = json.loads(export[0])
+    assert header['tables'][:3] == ['user', 'task', 'archived_task'] and 'task_signature' not in header['tables']
+    assert sum(json.loads(line)['table'] == 'task' for line in export[1:]) == 7
+    assert client.get('/export', query_string={'tables': 'nope'}).status_code == 400
+
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+    app.config['IMPORT_BATCH_SIZE'], batch_size = 4, app.config['IMPORT_BATCH_SIZE']
+    try:
+        response = client.post('/import', data='\n'.join(export) + '\n')
+    finally:
+        app.config['IMPORT_BATCH_SIZE'] = batch_size
+    progress = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert progress[-1]['done'] and progress[-1]['imported']['task'] == 7 and len(progress) > 2
+
+    with app.app_context():
+        assert [(task.id, task.title, task.priority, task.sprint_id, task.version) for task in Task.query.all()] == before
+        assert sum(counter.task_count for counter in TaskCounter.query.all()) == 7
+
+
+def test_import_stops_on_invalid_batch_and_resumes_from_checkpoint(tmp_path):
+    """
+    Checks that a batch with invalid rows is rejected without writing it, and that re-running resumes after the last
+    committed line.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+        tables = get_transfer_tables(['task'])
+
+    def task_line(i, **overrides):
+        row = {'id': 1000 + i, 'title': f'Imported {i}', 'description': 'd', 'story_point': 1,
+               'development_bit_vector': '00001', 'priority_tag': 'low', 'progress_tag': 'not-started',
+               'user': 'admin', 'created_at': 'now', 'project_id': 1, 'version': 1, **overrides}
+        return json.dumps({'table': 'task', 'row': row})
+
+    header = json.dumps({'format': 'silicon-ndjson', 'version': 1, 'tables': ['task']})
+    lines = [header] + [task_line(i) for i in range(4)] + [task_line(4, story_point='many'), task_line(5)]
+    checkpoint = str(tmp_path / 'import.checkpoint')
+
+    with app.app_context():
+        reports = []
+        try:
+            for report in import_ndjson(db.session, tables, lines, batch_size=2, checkpoint_path=checkpoint):
+                reports.append(dict(report))
+        except ValueError as e:
+            assert 'Line 6: task.story_point must be an integer' in str(e)
+        assert [report['line'] for report in reports] == [3, 5]
+        assert Task.query.filter(Task.title.like('Imported%')).count() == 4
+
+        lines[5] = task_line(4)
+        report = list(import_ndjson(db.session, tables, lines, batch_size=2, checkpoint_path=checkpoint))[-1]
+        assert report == {'line': 7, 'imported': {'task': 2}}
+        assert Task.query.filter(Task.title.like('Imported%')).count() == 6
+
+        try:
+            list(import_ndjson(db.session, tables, io.StringIO('{"format": "csv"}\n')))
+        except ValueError as e:
+            assert 'not a silicon-ndjson' in str(e)
+        else:
+            raise AssertionError('a foreign header must be rejected')
+        Task.query.filter(Task.title.like('Imported%')).delete()
+        db.session.commit()
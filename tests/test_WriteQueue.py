@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+import src.app as app_module
+from src.app import app, db, Task
+from src.database.WriteQueue import WriteQueue
+
+Base = declarative_base()
+
+
+class Note(Base):
+    __tablename__ = 'note'
+    id = Column(Integer, primary_key=True)
+    text = Column(String(20), nullable=False)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Provide a session factory for a fresh file-backed database that counts its commits.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path / "notes.db"}')
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    factory.commits = 0
+
+    def counting_factory():
+        session = factory()
+        original_commit = session.commit
+
+        def commit():
+            factory.commits += 1
+            original_commit()
+
+        session.commit = commit
+        return session
+
+    counting_factory.commits = lambda: factory.commits
+    counting_factory.engine = engine
+    yield counting_factory
+    engine.dispose()
+
+
+def test_concurrent_writes_are_grouped_into_fewer_commits(session_factory):
+    """
+    Checks that writes submitted together share transactions and all become durable.
+    """
+    write_queue = WriteQueue(session_factory, max_batch_size=50, max_latency=0.05)
+    futures = []
+    barrier = threading.Barrier(20)
+
+    def submit(i):
+        barrier.wait()
+        futures.append(write_queue.submit(lambda session: session.add(Note(text=f'note {i}'))))
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result(timeout=5)
+    write_queue.stop()
+
+    assert session_factory.commits() < 20
+    with session_factory.engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT COUNT(*) FROM note').scalar() == 20
+
+
+def test_a_failing_write_only_fails_its_own_future(session_factory):
+    """
+    Checks that a grouped transaction containing a bad write is retried so the other writes still commit.
+    """
+    write_queue = WriteQueue(session_factory, max_batch_size=10, max_latency=0.05)
+    good = write_queue.submit(lambda session: session.add(Note(text='good')))
+    bad = write_queue.submit(lambda session: session.add(Note(text=None)))
+    also_good = write_queue.submit(lambda session: session.add(Note(text='also good')))
+
+    good.result(timeout=5)
+    also_good.result(timeout=5)
+    with pytest.raises(Exception):
+        bad.result(timeout=5)
+    write_queue.stop()
+
+    with session_factory.engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT COUNT(*) FROM note').scalar() == 2
+
+
+def test_task_routes_in_write_behind_mode():
+    """
+    Checks that adding and editing tasks through the write queue behaves like the direct path, including version
+    conflicts.
+    """
+    with app.app_context():
+        app_module.write_queue = WriteQueue(sessionmaker(bind=db.engine, expire_on_commit=False))
+    try:
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        response = client.post('/add_task', json={
+            'title': 'Queued', 'description': 'Written behind', 'story_point': 2, 'development_bit_vector': '00001',
+            'priority_tag': 'low', 'progress_tag': 'not-started'
+        })
+        assert response.status_code == 201
+        task_id = response.get_json()['id']
+
+        response = client.put(f'/edit_task/{task_id}', json={'title': 'Edited'}, headers={'If-Match': '"1"'})
+        assert response.status_code == 200
+        assert response.get_json()['title'] == 'Edited'
+        assert response.get_json()['version'] == 2
+
+        with app.app_context():
+            stale_task = db.session.get(Task, task_id)
+            db.session.expunge(stale_task)
+        client.put(f'/edit_task/{task_id}', json={'title': 'Edited again'})
+        with app.app_context():
+            with pytest.raises(StaleDataError):
+                app_module.update_model_instance(stale_task, {'title': 'Lost update'})
+    finally:
+        app_module.write_queue.stop()
+        app_module.write_queue = None
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import MetaData, create_engine, func, insert, inspect, select
+
+from src.app import app, db, Task, ArchivedTask, TaskChange, archive_completed_tasks, upgrade_task_ids
+
+
+def make_task(title, progress_tag='completed', completed_days_ago=None):
+    """
+    Build a task, optionally completed the given number of days ago.
+    """
+    task = Task(title=title, description=f'Description of {title}', story_point=1, development_bit_vector='00001',
+                priority_tag='low', progress_tag=progress_tag, user='admin', created_at='Sunday 20 October, 09:15 PM')
+    if completed_days_ago is not None:
+        task.completed_at = datetime.now() - timedelta(days=completed_days_ago)
+    return task
+
+
+@pytest.fixture
+def client():
+    """
+    Provide a test client with empty live and archive task tables.
+    """
+    with app.app_context():
+        Task.query.delete()
+        ArchivedTask.query.delete()
+        db.session.commit()
+    yield app.test_client()
+
+
+def test_completion_time_follows_progress_tag(client):
+    """
+    Checks that completed_at is set when a task is completed and cleared when it is reopened.
+    """
+    with app.app_context():
+        task = make_task('Task 1', progress_tag='not-started')
+        db.session.add(task)
+        db.session.commit()
+        assert task.completed_at is None
+        task_id = task.id
+
+    response = client.put(f'/edit_task/{task_id}', json={'progress_tag': 'completed'})
+    assert response.get_json()['completed_at'] is not None
+    response = client.put(f'/edit_task/{task_id}', json={'progress_tag': 'in-progress'})
+    assert response.get_json()['completed_at'] is None
+
+
+def test_old_completed_tasks_are_archived_in_batches(client):
+    """
+    Checks that only tasks completed longer ago than the cutoff leave the live table, and stay searchable.
+    """
+    with app.app_context():
+        db.session.add_all([make_task(f'Old {i}', completed_days_ago=40) for i in range(5)])
+        db.session.add_all([
+            make_task('Recent', completed_days_ago=1),
+            make_task('Open', progress_tag='in-progress'),
+        ])
+        db.session.commit()
+
+        assert archive_completed_tasks(max_age_days=30, batch_size=2) == 5
+        assert archive_completed_tasks(max_age_days=30, batch_size=2) == 0
+
+    live_titles = {task['title'] for task in client.get('/get_tasks').get_json()['tasks']}
+    assert live_titles == {'Recent', 'Open'}
+
+    archived = client.get('/archived_tasks').get_json()['tasks']
+    assert len(archived) == 5
+    assert all(task['archived_at'] for task in archived)
+
+    matches = client.get('/archived_tasks', query_string={'q': 'old 3'}).get_json()['tasks']
+    assert [task['title'] for task in matches] == ['Old 3']
+    assert client.get(f'/archived_tasks/{matches[0]["id"]}').get_json()['title'] == 'Old 3'
+
+
+def test_archived_task_ids_are_not_reused(client):
+    """
+    Checks that a task created after the highest task was archived gets a new ID, so archiving it later does not clash
+    with the archived task.
+    """
+    with app.app_context():
+        db.session.add(make_task('Old', completed_days_ago=40))
+        db.session.commit()
+        assert archive_completed_tasks(max_age_days=30) == 1
+        archived_id = ArchivedTask.query.one().id
+
+        task = make_task('Newer', completed_days_ago=40)
+        db.session.add(task)
+        db.session.commit()
+        assert task.id > archived_id
+        assert archive_completed_tasks(max_age_days=30) == 1
+
+
+def test_task_table_without_autoincrement_is_upgraded(tmp_path):
+    """
+    Checks that a task table created before IDs were never reused is rebuilt with AUTOINCREMENT, keeping its rows and
+    indexes, and that new IDs start above the archived ones.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    old_metadata = MetaData()
+    old_task = Task.__table__.to_metadata(old_metadata)
+    old_task.dialect_options['sqlite']['autoincrement'] = False
+    ArchivedTask.__table__.to_metadata(old_metadata)
+    old_metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(old_task), [
+            {'title': 'Kept', 'description': 'd', 'story_point': 1, 'development_bit_vector': '00001',
+             'priority_tag': 'low', 'progress_tag': 'not-started', 'user': 'admin', 'created_at': 'now',
+             'project_id': 1, 'version': 1}
+        ])
+        connection.execute(insert(ArchivedTask.__table__).values(
+            id=7, title='Archived', description='d', story_point=1, development_bit_vector='00001',
+            priority_tag='low', progress_tag='completed', user='admin', created_at='now', project_id=1, version=1,
+            archived_at=datetime.now()
+        ))
+        assert 'AUTOINCREMENT' not in connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'task'").scalar()
+
+    db.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        assert 'AUTOINCREMENT' in connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE name = 'task'").scalar()
+        assert connection.scalars(select(Task.title)).all() == ['Kept']
+        assert 'ix_task_next' in {index['name'] for index in inspect(connection).get_indexes('task')}
+        connection.execute(insert(Task.__table__).values(
+            title='New', description='d', story_point=1, development_bit_vector='00001', priority_tag='low',
+            progress_tag='not-started', user='admin', created_at='now', project_id=1, version=1))
+        assert connection.scalar(select(Task.id).where(Task.title == 'New')) == 8
+        # the task triggers were installed on the rebuilt table
+        assert connection.scalar(select(func.count()).select_from(TaskChange)) == 1
+
+
+def test_task_table_missing_columns_is_rebuilt(tmp_path):
+    """
+    Checks that rebuilding a task table that also lacks later columns gives its rows the values new tasks get by
+    default, rather than failing on the NOT NULL version column.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE task (id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, description VARCHAR(1000) NOT NULL, '
+            'story_point INTEGER NOT NULL, development_bit_vector VARCHAR(5) NOT NULL, '
+            'priority_tag VARCHAR(9) NOT NULL, progress_tag VARCHAR(11) NOT NULL, user VARCHAR(15) NOT NULL, '
+            'created_at VARCHAR(100) NOT NULL, '
+            'PRIMARY KEY (id))'
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO task (title, description, story_point, development_bit_vector, priority_tag, progress_tag, "
+            "user, created_at) VALUES ('Kept', 'd', 1, '00001', 'low', 'not-started', 'admin', 'now')"
+        )
+        upgrade_task_ids(db.metadata, connection)
+
+    with engine.begin() as connection:
+        assert connection.execute(select(Task.title, Task.project_id, Task.version, Task.sprint_id, Task.completed_at)
+                                  ).all() == [('Kept', app.config['DEFAULT_PROJECT_ID'], 1, None, None)]
+
+
+def test_task_table_without_priority_is_rebuilt(tmp_path):
+    """
+    Checks that a task table created before the computed priority column existed is rebuilt with it, so the
+    next-tasks indexes can be created and existing tasks are ordered by priority.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            'CREATE TABLE task (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, title VARCHAR(100) NOT NULL, '
+            'description VARCHAR(1000) NOT NULL, story_point INTEGER NOT NULL, development_bit_vector VARCHAR(5) NOT '
+            'NULL, priority_tag VARCHAR(9) NOT NULL, progress_tag VARCHAR(11) NOT NULL, user VARCHAR(15) NOT NULL, '
+            'created_at VARCHAR(100) NOT NULL, project_id INTEGER NOT NULL, sprint_id INTEGER, version INTEGER NOT '
+            'NULL, completed_at DATETIME)'
+        )
+        for title, priority_tag in (('Low', 'low'), ('Urgent', 'urgent')):
+            connection.exec_driver_sql(
+                "INSERT INTO task (title, description, story_point, development_bit_vector, priority_tag, "
+                "progress_tag, user, created_at, project_id, version) "
+                "VALUES (?, 'd', 1, '00001', ?, 'not-started', 'admin', 'now', 1, 1)", (title, priority_tag)
+            )
+
+    db.metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        assert connection.execute(select(Task.title, Task.priority).order_by(Task.priority.desc())).all() == [
+            ('Urgent', 4), ('Low', 1)
+        ]
+        assert 'ix_task_next' in {index['name'] for index in inspect(connection).get_indexes('task')}
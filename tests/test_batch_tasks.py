@@ -0,0 +1,122 @@
+import pytest
+
+from src.app import app, db, Task
+
+
+def make_task_data(title, **overrides):
+    """
+    Build a valid task payload for a batch create operation.
+    """
+    return {
+        'title': title,
+        'description': f'Description of {title}',
+        'story_point': 3,
+        'development_bit_vector': '00001',
+        'priority_tag': 'low',
+        'progress_tag': 'not-started',
+        **overrides
+    }
+
+
+@pytest.fixture
+def client():
+    """
+    Provide a test client logged in as admin, with an empty task table.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+    with app.test_client() as client:
+        with client.session_transaction() as flask_session:
+            flask_session['username'] = 'admin'
+        yield client
+
+
+def test_batch_creates_updates_and_deletes_in_one_request(client):
+    """
+    Checks that a mixed batch is applied and every operation reports its result.
+    """
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': make_task_data('Task 1')},
+        {'op': 'create', 'data': make_task_data('Task 2')},
+    ]})
+    assert response.status_code == 200
+    first_id, second_id = [result['id'] for result in response.get_json()['results']]
+
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'update', 'id': first_id, 'data': {'progress_tag': 'completed'}},
+        {'op': 'delete', 'id': second_id},
+        {'op': 'create', 'data': make_task_data('Task 3')},
+    ]})
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == ['ok', 'ok', 'ok']
+
+    tasks = {task['title']: task for task in client.get('/get_tasks').get_json()['tasks']}
+    assert set(tasks) == {'Task 1', 'Task 3'}
+    assert tasks['Task 1']['progress_tag'] == 'completed'
+    assert tasks['Task 3']['user'] == 'admin'
+
+
+def test_atomic_batch_is_rejected_when_any_operation_is_invalid(client):
+    """
+    Checks that an atomic batch writes nothing if a single operation fails validation.
+    """
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': make_task_data('Task 1')},
+        {'op': 'create', 'data': make_task_data('')},
+        {'op': 'delete', 'id': 12345},
+    ]})
+    assert response.status_code == 400
+    statuses = [result['status'] for result in response.get_json()['results']]
+    assert statuses == ['skipped', 'error', 'error']
+    assert client.get('/get_tasks').get_json()['tasks'] == []
+
+
+def test_best_effort_batch_applies_valid_operations(client):
+    """
+    Checks that a best-effort batch skips invalid operations and applies the rest.
+    """
+    response = client.post('/tasks/batch', json={'mode': 'best_effort', 'operations': [
+        {'op': 'create', 'data': make_task_data('Task 1')},
+        {'op': 'update', 'id': 12345, 'data': {'title': 'Missing'}},
+        {'op': 'archive', 'id': 1},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['ok', 'error', 'error']
+    assert results[1]['error'] == 'Task not found'
+    assert [task['title'] for task in client.get('/get_tasks').get_json()['tasks']] == ['Task 1']
+
+
+def test_operations_on_a_task_deleted_earlier_in_the_batch_are_rejected(client):
+    """
+    Checks that operations are validated in order within a batch.
+    """
+    task_id = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': make_task_data('Task 1')},
+    ]}).get_json()['results'][0]['id']
+
+    response = client.post('/tasks/batch', json={'mode': 'best_effort', 'operations': [
+        {'op': 'delete', 'id': task_id},
+        {'op': 'update', 'id': task_id, 'data': {'title': 'Too late'}},
+    ]})
+    assert [result['status'] for result in response.get_json()['results']] == ['ok', 'error']
+
+
+def test_operations_with_malformed_data_are_rejected(client):
+    """
+    Checks that an operation whose data is not an object gets an error result instead of failing the whole request.
+    """
+    task_id = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': make_task_data('Task 1')},
+    ]}).get_json()['results'][0]['id']
+
+    response = client.post('/tasks/batch', json={'mode': 'best_effort', 'operations': [
+        {'op': 'create', 'data': ['not', 'a', 'task']},
+        {'op': 'update', 'id': task_id, 'data': 'Renamed'},
+        {'op': 'update', 'id': task_id, 'data': {'title': 'Renamed'}},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['error', 'error', 'ok']
+    assert results[0]['error'] == "'data' must be an object."
@@ -0,0 +1,39 @@
+from src.app import app, db, Task
+
+
+def make_task(i):
+    return Task(title=f'Since {i}', description='d', story_point=i, development_bit_vector='00001',
+                priority_tag='low', progress_tag='not-started', user='admin', created_at='now')
+
+
+def test_get_tasks_since_returns_only_changes():
+    """
+    Checks that a since query returns the tasks created or edited after the given seq and the IDs of deleted tasks,
+    and that a seq ahead of the stream falls back to a full reset.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all([make_task(i) for i in range(1, 4)])
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    full = client.get('/get_tasks').get_json()
+    assert len(full['tasks']) == 3 and not full['reset']
+    first, second = full['tasks'][0]['id'], full['tasks'][1]['id']
+
+    unchanged = client.get('/get_tasks', query_string={'since': full['seq']}).get_json()
+    assert (unchanged['tasks'], unchanged['deleted'], unchanged['seq']) == ([], [], full['seq'])
+
+    client.put(f'/edit_task/{first}', json={'title': 'Edited'})
+    client.delete(f'/delete_task/{second}')
+    created = client.post('/add_task', json={'title': 'New', 'description': 'd', 'story_point': 2,
+                                             'development_bit_vector': '00001', 'priority_tag': 'low',
+                                             'progress_tag': 'not-started'}).get_json()
+    delta = client.get('/get_tasks', query_string={'since': full['seq']}).get_json()
+    assert sorted((task['id'], task['title']) for task in delta['tasks']) == [(first, 'Edited'),
+                                                                              (created['id'], 'New')]
+    assert delta['deleted'] == [second] and delta['seq'] > full['seq']
+
+    reset = client.get('/get_tasks', query_string={'since': delta['seq'] + 100}).get_json()
+    assert reset['reset'] and len(reset['tasks']) == 3
@@ -0,0 +1,140 @@
+import time
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from src.app import app, db, Task, User, bump_identity_version, identity_cache
+from src.user_management.IdentityCache import ROLE_ADMIN, Identity, IdentityCache
+
+
+def test_identity_cache_expiry_eviction_and_invalidation():
+    """
+    Checks that entries expire after the TTL, the least recently used entry is evicted first, and invalidate_user
+    drops every session of that user only.
+    """
+    cache = IdentityCache(ttl=60, max_size=2)
+    cache.put('a', Identity(1, 'admin', ROLE_ADMIN))
+    cache.put('b', Identity(2, 'Xin', 'member'))
+    assert cache.get('a').is_admin
+    cache.put('c', Identity(2, 'Xin', 'member'))
+    assert cache.get('b') is None and cache.get('a') is not None
+
+    assert cache.invalidate_user(2) == 1
+    assert len(cache) == 1
+
+    short_lived = IdentityCache(ttl=0.01)
+    short_lived.put('a', Identity(1, 'admin', ROLE_ADMIN))
+    time.sleep(0.02)
+    assert short_lived.get('a') is None
+
+
+def test_shared_version_change_clears_the_cache():
+    """
+    Checks that a cache with a shared version drops every entry once the version moves, reading it at most once per
+    check interval.
+    """
+    version = [1]
+    reads = []
+    cache = IdentityCache(ttl=60, get_version=lambda: reads.append(version[0]) or version[0], check_interval=60)
+    cache.put('a', Identity(1, 'admin', ROLE_ADMIN))
+    assert cache.get('a') is not None and cache.get('a') is not None
+    assert reads == [1]
+
+    version[0] = 2
+    cache.check_interval = 0
+    assert cache.get('a') is None
+
+
+def count_user_queries(client, path):
+    """
+    Request a path and count the statements that read the user table.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if 'FROM user' in statement:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return response, len(statements)
+
+
+def test_auth_decorator_resolves_identity_once_and_follows_renames():
+    """
+    Checks that an authenticated session stops querying the user table, that role checks use the stored role, and that
+    renaming a user is reflected in their session straight away.
+    """
+    identity_cache.clear()
+    admin, member = app.test_client(), app.test_client()
+    admin.post('/login', data={'username': 'admin', 'password': '123'})
+    member.post('/login', data={'username': 'Xin', 'password': '123'})
+
+    assert admin.get('/admin').status_code == 200
+    response, queries = count_user_queries(admin, '/change-username')
+    assert response.status_code == 200 and queries == 0
+
+    response, _ = count_user_queries(member, '/admin')
+    assert response.status_code == 302
+    assert member.get('/').status_code == 200
+
+    try:
+        admin.post('/change_username', data={'old_username': 'Xin', 'new_username_change': 'Xin2'})
+        with app.app_context():
+            assert User.query.filter_by(username='Xin2').count() == 1
+        member.post('/add_task', json={'title': 'Renamed', 'description': 'd', 'development_bit_vector': '00001',
+                                       'priority_tag': 'low', 'progress_tag': 'not-started'})
+        with app.app_context():
+            assert Task.query.filter_by(title='Renamed').one().user == 'Xin2'
+            Task.query.filter_by(title='Renamed').delete()
+            db.session.commit()
+
+        admin.post('/change_username', data={'old_username': 'admin', 'new_username_change': 'Xin2'})
+        with app.app_context():
+            assert User.query.filter_by(username='admin').count() == 1
+    finally:
+        admin.post('/change_username', data={'old_username': 'Xin2', 'new_username_change': 'Xin'})
+
+
+def test_user_table_without_roles_is_upgraded(tmp_path):
+    """
+    Checks that a user table created before roles existed gets the role column, with the configured administrator
+    promoted and every other user a member.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE user (id INTEGER NOT NULL, username VARCHAR(15) NOT NULL, '
+                                   'password VARCHAR(150) NOT NULL, PRIMARY KEY (id), UNIQUE (username))')
+        connection.exec_driver_sql("INSERT INTO user (username, password) VALUES ('admin', 'x'), ('Xin', 'x')")
+
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        assert session.execute(select(User.username, User.role).order_by(User.id)).all() == [
+            ('admin', ROLE_ADMIN), ('Xin', 'member')
+        ]
+
+
+def test_user_changed_by_another_process_is_resolved_again(monkeypatch):
+    """
+    Checks that a role change written by another process, which only bumps the shared identity version, reaches the
+    cached sessions of this one.
+    """
+    monkeypatch.setattr(identity_cache, 'check_interval', 0)
+    member = app.test_client()
+    member.post('/login', data={'username': 'Xin', 'password': '123'})
+    assert member.get('/admin').status_code == 302
+
+    try:
+        with app.app_context():
+            User.query.filter_by(username='Xin').update({'role': ROLE_ADMIN})
+            bump_identity_version()
+        assert member.get('/admin').status_code == 200
+    finally:
+        with app.app_context():
+            User.query.filter_by(username='Xin').update({'role': 'member'})
+            bump_identity_version()
@@ -0,0 +1,56 @@
+from sqlalchemy import select, text
+
+from src.app import app, db, Task
+
+
+def test_next_tasks_orders_by_priority_points_and_age():
+    """
+    Checks the top-k ordering and the user, sprint and backlog filters, and that the ordinal follows priority edits.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    tasks = [('low', 1, None, 'not-started'), ('urgent', 5, 1, 'not-started'), ('medium', 2, None, 'not-started'),
+             ('urgent', 3, None, 'not-started'), ('important', 1, 1, 'not-started'), ('urgent', 1, None, 'completed')]
+    created = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': f'Task {i}', 'description': 'd', 'story_point': points, 'sprint_id': sprint,
+                                  'development_bit_vector': '00001', 'priority_tag': priority,
+                                  'progress_tag': progress}}
+        for i, (priority, points, sprint, progress) in enumerate(tasks)
+    ]}).get_json()['results']
+    ids = [result['id'] for result in created]
+
+    def next_ids(**args):
+        return [task['id'] for task in client.get('/next_tasks', query_string=args).get_json()['tasks']]
+
+    assert next_ids() == [ids[3], ids[1], ids[4], ids[2], ids[0]]
+    assert next_ids(k=2) == [ids[3], ids[1]]
+    assert next_ids(sprint_id=1) == [ids[1], ids[4]]
+    assert next_ids(sprint_id='none', k=2) == [ids[3], ids[2]]
+    assert next_ids(user='admin', progress_tag='completed') == [ids[5]]
+    assert next_ids(user='Xin') == []
+    assert client.get('/next_tasks', query_string={'k': 0}).status_code == 400
+    assert client.get('/next_tasks', query_string={'sprint_id': 'x'}).status_code == 400
+
+    client.put(f'/edit_task/{ids[0]}', json={'priority_tag': 'urgent', 'priority': 0})
+    assert next_ids(k=1) == [ids[0]]
+
+
+def test_next_tasks_query_reads_the_index_in_order():
+    """
+    Checks that SQLite answers each next-tasks query from an index range without sorting.
+    """
+    with app.app_context():
+        for condition in (None, Task.user == 'admin', Task.sprint_id.is_(None)):
+            query = select(Task).where(Task.progress_tag == 'not-started')
+            if condition is not None:
+                query = query.where(condition)
+            query = query.order_by(Task.priority.desc(), Task.story_point, Task.id).limit(10)
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[3] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+            assert 'USING INDEX ix_task_next' in plan
+            assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,70 @@
+import io
+import json
+
+from flask_bcrypt import check_password_hash
+
+from src.app import app, db, User
+from src.user_management.Provisioning import provision_users, read_users_csv
+
+CSV = """username,password,role
+bulk1,pw1,
+bulk2,pw2,admin
+bulk1,other,
+admin,pw,
+,pw,
+bulk3,,
+bulk4,pw4,owner
+bulk5,pw5,member
+"""
+
+
+def remove_bulk_users():
+    with app.app_context():
+        User.query.filter(User.username.like('bulk%')).delete()
+        db.session.commit()
+
+
+def test_provision_users_skips_invalid_and_existing_rows():
+    """
+    Checks batching, the skip reasons, and that the parallel hashes verify against the given passwords.
+    """
+    remove_bulk_users()
+    with app.app_context():
+        reports = [dict(report, skipped=len(report['skipped'])) for report in provision_users(
+            db.session, User, read_users_csv(io.StringIO(CSV)), batch_size=3, rounds=4, processes=2
+        )]
+        assert reports == [{'processed': 3, 'created': 2, 'skipped': 1}, {'processed': 6, 'created': 2, 'skipped': 4},
+                           {'processed': 8, 'created': 3, 'skipped': 5}]
+        users = {user.username: user for user in User.query.filter(User.username.like('bulk%'))}
+        assert sorted(users) == ['bulk1', 'bulk2', 'bulk5']
+        assert users['bulk2'].role == 'admin' and users['bulk1'].role == 'member'
+        assert check_password_hash(users['bulk1'].password, 'pw1')
+    remove_bulk_users()
+
+
+def test_provisioning_endpoint_and_command(tmp_path):
+    """
+    Checks the streamed progress of the endpoint, the header check, and that the command is safe to re-run.
+    """
+    remove_bulk_users()
+    rounds, app.config['BCRYPT_LOG_ROUNDS'] = app.config['BCRYPT_LOG_ROUNDS'], 4
+    try:
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': '123'})
+        response = client.post('/users/provision', data={'file': (io.BytesIO(CSV.encode()), 'users.csv')})
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[-1]['done'] and lines[-1]['created'] == 3
+        assert sorted((skipped['line'], skipped['reason']) for skipped in lines[-1]['skipped']) == [
+            (4, 'duplicate in file'), (5, 'already exists'), (6, 'missing username'), (7, 'missing password'),
+            (8, 'unknown role')
+        ]
+        assert client.post('/users/provision', data='name,pw\na,b\n').status_code == 400
+
+        csv_file = tmp_path / 'users.csv'
+        csv_file.write_text(CSV)
+        result = app.test_cli_runner().invoke(args=['provision-users', str(csv_file), '--processes', '1'])
+        assert 'Processed 8 rows, created 0 users.' in result.output
+        assert 'Skipped line 2 (bulk1): already exists' in result.output
+    finally:
+        app.config['BCRYPT_LOG_ROUNDS'] = rounds
+        remove_bulk_users()
@@ -0,0 +1,72 @@
+import src.app as app_module
+from src.app import app, db, Task
+from src.database.Replicas import ReplicaSet, create_replica_engine, refresh_replica, write_heartbeat
+
+NEW_TASK = {'title': 'Replicated', 'description': 'd', 'story_point': 2, 'development_bit_vector': '00001',
+            'priority_tag': 'low', 'progress_tag': 'not-started'}
+
+
+def board_titles(client):
+    return {task['title'] for task in client.get('/get_tasks').get_json()['tasks']}
+
+
+def test_replica_set_skips_missing_and_stale_replicas(tmp_path):
+    """
+    Checks that a replica is only chosen once it has a heartbeat, that it stops being chosen when it lags by more than
+    max_lag or is older than the session's last write, and that a missing replica file is not created.
+    """
+    with app.app_context():
+        primary = db.engine
+    path = tmp_path / 'replica.db'
+    now = [1000.0]
+    replicas = ReplicaSet([create_replica_engine(f'sqlite:///{path}')], max_lag=10, check_interval=0,
+                          clock=lambda: now[0])
+    assert replicas.choose() is None and not path.exists()
+
+    assert write_heartbeat(primary, now=now[0]) == now[0]
+    assert write_heartbeat(primary, min_interval=5, now=now[0] + 1) is None
+    with app.app_context():
+        refresh_replica(primary.url.database, str(path))
+    assert replicas.choose() is replicas.engines[0]
+    assert replicas.choose(since=now[0] + 1) is None
+
+    now[0] += 11
+    assert replicas.choose() is None
+    assert replicas.status()[0]['lag'] == 11 and not replicas.status()[0]['usable']
+
+
+def test_reads_go_to_replica_except_after_a_write(tmp_path, monkeypatch):
+    """
+    Checks that GET requests read from the replica while the session that wrote reads from the primary, that a refresh
+    through the backup API brings the replica up to date, and that reads fail over to the primary when the replica goes
+    missing.
+    """
+    path = tmp_path / 'replica.db'
+    uri = f'sqlite:///{path}'
+    replicas = ReplicaSet([create_replica_engine(uri)], max_lag=60, check_interval=0)
+    monkeypatch.setattr(app_module, 'replica_set', replicas)
+    monkeypatch.setitem(app.config, 'READ_REPLICAS', [uri])
+    monkeypatch.setitem(app.config, 'REPLICA_REFRESH_INTERVAL', 0)
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+        app_module.refresh_replicas()
+
+    writer, reader = app.test_client(), app.test_client()
+    for client in (writer, reader):
+        assert client.post('/login', data={'username': 'admin', 'password': '123'}).status_code == 200
+    writer.post('/add_task', json=NEW_TASK)
+
+    assert 'Replicated' in board_titles(writer)  # read-your-writes: the replica does not have the task yet
+    assert 'Replicated' not in board_titles(reader)
+
+    with app.app_context():
+        assert app_module.refresh_replicas() is not None
+    assert 'Replicated' in board_titles(reader) and 'Replicated' in board_titles(writer)
+
+    path.unlink()
+    replicas.engines[0].dispose()  # pooled connections would keep reading the deleted file
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+    assert board_titles(reader) == set()
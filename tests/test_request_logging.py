@@ -0,0 +1,77 @@
+import json
+import logging
+import queue
+
+import src.app as app_module
+from src.app import app, db, Task, request_logger
+from src.error_handling.CustomError import CustomError
+from src.request_handling.StructuredLogging import DroppingQueueHandler, JsonFormatter
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_json_formatter_and_dropping_queue():
+    """
+    Checks that records become one JSON line with their fields and traceback, and that a full queue drops records
+    instead of blocking.
+    """
+    handler = DroppingQueueHandler(queue.Queue(1))
+    try:
+        raise CustomError('Logged error')
+    except CustomError as e:
+        record = logging.LogRecord('test', logging.ERROR, __file__, 1, 'failed %s', ('here',),
+                                   (type(e), e, e.__traceback__))
+    record.fields = {'request_id': 'abc'}
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.dropped == 1
+
+    line = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    assert line['message'] == 'failed here' and line['request_id'] == 'abc' and line['level'] == 'ERROR'
+    assert 'Logged error' in line['exception']
+
+
+def raise_title_error(task, data):
+    raise CustomError('Title is empty')
+
+
+def test_requests_are_sampled_but_errors_always_logged(monkeypatch):
+    """
+    Checks the request log line's fields, that sampled-out successes are not logged, and that a failing request is
+    logged with its CustomError code regardless of the sample rate.
+    """
+    with app.app_context():
+        task = Task(title='Logged', description='d', story_point=1, development_bit_vector='00001',
+                    priority_tag='low', progress_tag='not-started', user='admin', created_at='now')
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    monkeypatch.setattr(app_module, 'update_model_instance', raise_title_error)
+    handler = ListHandler()
+    request_logger.addHandler(handler)
+    try:
+        response = client.get('/get_tasks', headers={'X-Request-ID': 'request-1'})
+        assert response.headers['X-Request-ID'] == 'request-1'
+        app.config['LOG_SAMPLE_RATES'] = {'get_tasks': 0.0, 'edit_task': 0.0}
+        client.get('/get_tasks')
+        client.put(f'/edit_task/{task_id}', json={'title': ''})
+    finally:
+        app.config['LOG_SAMPLE_RATES'] = {}
+        request_logger.removeHandler(handler)
+
+    logged = [record.fields for record in handler.records]
+    assert [(fields['endpoint'], fields['status']) for fields in logged] == [('get_tasks', 200), ('edit_task', 500)]
+    assert logged[0]['request_id'] == 'request-1' and logged[0]['user'] == 'admin'
+    assert logged[0]['route'] == '/get_tasks' and logged[0]['sql_count'] >= 1
+    assert logged[1]['error_code'] == str(CustomError('Title is empty').ID)
+    assert handler.records[1].levelno == logging.ERROR
@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+from flask_bcrypt import generate_password_hash
+from sqlalchemy import create_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The task and user tables as the first release of the application created them
+BASELINE_SCHEMA = [
+    """CREATE TABLE task (
+        id INTEGER NOT NULL,
+        title VARCHAR(100) NOT NULL,
+        description VARCHAR(1000) NOT NULL,
+        story_point INTEGER NOT NULL,
+        development_bit_vector VARCHAR(5) NOT NULL,
+        priority_tag VARCHAR(9) NOT NULL,
+        progress_tag VARCHAR(11) NOT NULL,
+        user VARCHAR(15) NOT NULL,
+        created_at VARCHAR(100) NOT NULL,
+        PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE user (
+        id INTEGER NOT NULL,
+        username VARCHAR(15) NOT NULL,
+        password VARCHAR(150) NOT NULL,
+        PRIMARY KEY (id),
+        UNIQUE (username)
+    )""",
+]
+
+# Runs in a fresh interpreter, so the application starts up (and upgrades the schema) against the baseline database
+ROUTES_SCRIPT = """
+import json
+from src.app import app
+
+client = app.test_client()
+statuses = {'login': client.post('/login', data={'username': 'admin', 'password': '123'}).status_code}
+task = {'title': 'After upgrade', 'description': 'd', 'story_point': 3, 'development_bit_vector': '00001',
+        'priority_tag': 'urgent', 'progress_tag': 'not-started'}
+added = client.post('/add_task', json=task)
+statuses['add_task'] = added.status_code
+task_id = added.get_json()['id']
+requests = {
+    'get_tasks': lambda: client.get('/get_tasks'),
+    'get_task': lambda: client.get('/get_task/1'),
+    'edit_task': lambda: client.put('/edit_task/1', json={'progress_tag': 'completed', 'sprint_id': 2}),
+    'next_tasks': lambda: client.get('/next_tasks'),
+    'summary': lambda: client.get('/tasks/summary'),
+    'batch': lambda: client.post('/tasks/batch', json={'operations': [
+        {'op': 'update', 'id': task_id, 'data': {'priority_tag': 'low'}}]}),
+    'duplicates': lambda: client.get('/tasks/duplicates', query_string={'task_id': task_id}),
+    'analytics': lambda: client.get('/analytics/tasks'),
+    'histogram': lambda: client.get('/analytics/histogram'),
+    'forecast': lambda: client.get('/forecast'),
+    'plan': lambda: client.post('/sprints/plan', json={'sprints': [{'id': 3, 'capacity': 10}]}),
+    'export': lambda: client.get('/export'),
+    'archived_tasks': lambda: client.get('/archived_tasks'),
+    'delete_task': lambda: client.delete(f'/delete_task/{task_id}'),
+}
+for name, send in requests.items():
+    statuses[name] = send().status_code
+tasks = client.get('/get_tasks').get_json()['tasks']
+print(json.dumps({'statuses': statuses, 'tasks': tasks}))
+"""
+
+
+def create_baseline_database(path):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO task (title, description, story_point, development_bit_vector, priority_tag, progress_tag, "
+            "user, created_at) VALUES ('Before upgrade', 'd', 2, '00001', 'medium', 'not-started', 'admin', 'now')"
+        )
+        connection.exec_driver_sql("INSERT INTO user (username, password) VALUES ('admin', ?)",
+                                   (generate_password_hash('123', 4).decode(),))
+    engine.dispose()
+
+
+def run_against(path, script):
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, timeout=300,
+                            env={**os.environ, 'DATABASE_URI': f'sqlite:///{path}'})
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_task_routes_work_on_a_baseline_database(tmp_path):
+    """
+    Checks that the application starts against a database created by the first release, and that every task route
+    works on the upgraded task table.
+    """
+    path = tmp_path / 'baseline.db'
+    create_baseline_database(path)
+
+    result = run_against(path, ROUTES_SCRIPT)
+    assert result['statuses'] == {
+        'login': 200, 'add_task': 201, 'get_tasks': 200, 'get_task': 200, 'edit_task': 200, 'next_tasks': 200,
+        'summary': 200, 'batch': 200, 'duplicates': 200, 'analytics': 200, 'histogram': 200, 'forecast': 200,
+        'plan': 200, 'export': 200, 'archived_tasks': 200, 'delete_task': 200,
+    }
+    [task] = result['tasks']
+    assert (task['title'], task['progress_tag'], task['sprint_id'], task['version']) == (
+        'Before upgrade', 'completed', 2, 2
+    )
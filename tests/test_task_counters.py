@@ -0,0 +1,47 @@
+from src.app import app, db, Task, TaskCounter
+
+
+def test_counters_follow_task_writes_and_repair():
+    """
+    Checks the board summary after inserts, edits and deletes, and that the repair command fixes drifted counters.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.commit()
+        assert TaskCounter.query.filter(TaskCounter.task_count != 0).count() == 0
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['username'] = 'admin'
+    created = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'data': {'title': f'Task {i}', 'description': 'd', 'story_point': points, 'sprint_id': sprint,
+                                  'development_bit_vector': '00001', 'priority_tag': 'low', 'progress_tag': progress}}
+        for i, (points, sprint, progress) in enumerate([(3, None, 'not-started'), (5, 1, 'not-started'),
+                                                        (2, 1, 'in-progress'), (8, 2, 'completed')])
+    ]}).get_json()['results']
+    ids = [result['id'] for result in created]
+
+    client.put(f'/edit_task/{ids[0]}', json={'progress_tag': 'in-progress', 'sprint_id': 2})
+    client.put(f'/edit_task/{ids[2]}', json={'story_point': 4})
+    client.delete(f'/delete_task/{ids[3]}')
+
+    summary = client.get('/tasks/summary').get_json()
+    assert summary['columns'] == {'not-started': {'count': 1, 'story_points': 5},
+                                  'in-progress': {'count': 2, 'story_points': 7},
+                                  'completed': {'count': 0, 'story_points': 0}}
+    assert summary['total'] == {'count': 3, 'story_points': 12}
+    assert [(sprint['sprint_id'], sprint['count'], sprint['story_points']) for sprint in summary['sprints']] == [
+        (1, 2, 9), (2, 1, 3)
+    ]
+    sprint = client.get('/tasks/summary', query_string={'sprint_id': 2}).get_json()
+    assert sprint['total'] == {'count': 1, 'story_points': 3}
+    assert client.get('/tasks/summary', query_string={'sprint_id': 'none'}).get_json()['total']['count'] == 0
+
+    with app.app_context():
+        TaskCounter.query.filter_by(progress_tag='not-started', sprint_id=1).update({'task_count': 7})
+        db.session.add(TaskCounter(progress_tag='testing', sprint_id=0, task_count=1, story_points=1))
+        db.session.commit()
+    result = app.test_cli_runner().invoke(args=['repair-task-counters'])
+    assert 'Repaired 2 task counters.' in result.output
+    assert client.get('/tasks/summary').get_json() == summary
+    assert 'Repaired 0 task counters.' in app.test_cli_runner().invoke(args=['repair-task-counters']).output
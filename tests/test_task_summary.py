@@ -0,0 +1,46 @@
+from sqlalchemy import event
+
+from src.app import app, db, Task
+
+
+def test_board_endpoints_return_summaries():
+    """
+    Checks that the board endpoints send summaries with a database-computed excerpt and never read the full
+    description, that get_task and detail=full still return it, and that the ORM defers it.
+    """
+    with app.app_context():
+        Task.query.delete()
+        db.session.add_all([
+            Task(title='Long', description='x' * 900, story_point=3, development_bit_vector='00011',
+                 priority_tag='urgent', progress_tag='not-started', user='admin', created_at='now'),
+            Task(title='Short', description='Short description', story_point=1, development_bit_vector='00001',
+                 priority_tag='low', progress_tag='not-started', user='admin', created_at='now'),
+        ])
+        db.session.commit()
+        task = Task.query.filter_by(title='Long').one()
+        assert 'description' not in task.__dict__
+        long_id = task.id
+
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    record = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': '123'})
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        board = client.get('/get_tasks').get_json()['tasks']
+        next_tasks = client.get('/next_tasks').get_json()['tasks']
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert not any('task.description AS' in statement for statement in statements)
+
+    long, short = board
+    assert 'description' not in long and len(long['description_excerpt']) == app.config['TASK_EXCERPT_LENGTH']
+    assert long['description_truncated'] and not short['description_truncated']
+    assert short['description_excerpt'] == 'Short description'
+    assert next_tasks[0]['id'] == long_id and 'description' not in next_tasks[0]
+
+    assert client.get(f'/get_task/{long_id}').get_json()['description'] == 'x' * 900
+    full = client.get('/get_tasks', query_string={'detail': 'full'}).get_json()['tasks']
+    assert full[0]['description'] == 'x' * 900
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from src.app import app, db, Task
+
+
+@pytest.fixture
+def task_id():
+    """
+    Create a single task with a story point counter of zero and return its ID.
+    """
+    with app.app_context():
+        Task.query.delete()
+        task = Task(title='Counter', description='Incremented concurrently', story_point=0,
+                    development_bit_vector='00001', priority_tag='low', progress_tag='not-started', user='admin',
+                    created_at='Sunday 20 October, 09:15 PM')
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+
+def test_get_task_returns_version_as_etag(task_id):
+    """
+    Checks that the ETag of a task changes every time the task is edited.
+    """
+    client = app.test_client()
+    response = client.get(f'/get_task/{task_id}')
+    assert response.headers['ETag'] == '"1"'
+    assert response.get_json()['version'] == 1
+
+    response = client.put(f'/edit_task/{task_id}', json={'title': 'Renamed', 'version': 99},
+                          headers={'If-Match': '"1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+    assert response.get_json()['version'] == 2
+
+
+def test_edit_only_writes_editable_fields(task_id):
+    """
+    Checks that an edit cannot set fields the server manages, such as the completion time or the project.
+    """
+    client = app.test_client()
+    response = client.put(f'/edit_task/{task_id}', json={'title': 'Renamed', 'completed_at': '2020-01-01',
+                                                          'project_id': 99, 'created_at': 'then'})
+    assert response.status_code == 200
+    with app.app_context():
+        task = db.session.get(Task, task_id)
+        assert (task.title, task.completed_at, task.project_id, task.created_at) == (
+            'Renamed', None, app.config['DEFAULT_PROJECT_ID'], 'Sunday 20 October, 09:15 PM'
+        )
+    assert client.put(f'/edit_task/{task_id}', json=['title']).status_code == 400
+
+
+def test_stale_if_match_is_rejected(task_id):
+    """
+    Checks that an edit based on an outdated version is rejected with 412 and not applied.
+    """
+    client = app.test_client()
+    client.put(f'/edit_task/{task_id}', json={'title': 'First edit'}, headers={'If-Match': '"1"'})
+
+    response = client.put(f'/edit_task/{task_id}', json={'title': 'Second edit'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 412
+    assert response.headers['ETag'] == '"2"'
+    assert client.get(f'/get_task/{task_id}').get_json()['title'] == 'First edit'
+
+
+def test_batch_update_with_stale_version_conflicts(task_id):
+    """
+    Checks that a batch update carrying an outdated version is reported as a conflict.
+    """
+    client = app.test_client()
+    client.put(f'/edit_task/{task_id}', json={'title': 'First edit'})
+
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'update', 'id': task_id, 'version': 1, 'data': {'title': 'Stale edit'}},
+    ]})
+    assert response.status_code == 409
+    assert response.get_json()['results'][0]['status'] == 'conflict'
+
+
+def test_concurrent_increments_are_never_lost(task_id):
+    """
+    Hammers the same task from many threads with read-modify-write increments. Every increment that the server
+    accepted must be reflected in the final value.
+    """
+    thread_count, increments_per_thread = 8, 15
+    accepted = []
+
+    def increment():
+        client = app.test_client()
+        done = 0
+        while done < increments_per_thread:
+            response = client.get(f'/get_task/{task_id}')
+            story_point = response.get_json()['story_point']
+            response = client.put(f'/edit_task/{task_id}', json={'story_point': story_point + 1},
+                                  headers={'If-Match': response.headers['ETag']})
+            if response.status_code == 200:
+                done += 1
+            else:
+                assert response.status_code in (409, 412)
+        accepted.append(done)
+
+    threads = [threading.Thread(target=increment) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    final = app.test_client().get(f'/get_task/{task_id}').get_json()
+    assert sum(accepted) == thread_count * increments_per_thread
+    assert final['story_point'] == sum(accepted)
+    assert final['version'] == sum(accepted) + 1
@@ -0,0 +1,59 @@
+import os
+
+from jinja2 import FileSystemBytecodeCache
+
+from src.app import app
+from src.request_handling.FragmentCache import FragmentCache
+
+
+def test_fragment_cache_keys_eviction_and_invalidation():
+    """
+    Checks that fragments are rendered once per key, the least recently used is evicted first, and invalidate drops
+    every variant of a name.
+    """
+    cache = FragmentCache(max_entries=2)
+    renders = []
+
+    def render(text):
+        renders.append(text)
+        return text
+
+    assert cache.get_or_render(('header', 'admin'), lambda: render('admin header')) == 'admin header'
+    assert cache.get_or_render(('header', 'admin'), lambda: render('other')) == 'admin header'
+    cache.get_or_render(('header', 'member'), lambda: render('member header'))
+    cache.get_or_render(('header', 'admin'), lambda: render('other'))
+    cache.get_or_render(('footer',), lambda: render('footer'))
+    assert renders == ['admin header', 'member header', 'footer']
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 2)
+
+    assert cache.invalidate('header') == 1
+    assert cache.invalidate() == 1 and len(cache) == 0
+
+
+def test_header_is_cached_per_role():
+    """
+    Checks that admins and members each get their own header, served from the fragment cache after the first render.
+    """
+    fragment_cache = app.jinja_env.fragment_cache
+    fragment_cache.invalidate()
+    pages = {}
+    for username in ('admin', 'Xin', 'admin'):
+        client = app.test_client()
+        client.post('/login', data={'username': username, 'password': '123'})
+        pages[username] = client.get('/').get_data(as_text=True)
+    assert 'admin-nav' in pages['admin'] and 'admin-nav' not in pages['Xin']
+    assert len([key for key in fragment_cache._fragments if key[0] == 'header']) == 2
+    assert fragment_cache.hits >= 5
+
+
+def test_compile_templates_fills_the_bytecode_cache(tmp_path):
+    """
+    Checks that compile-templates writes every template to the bytecode cache directory.
+    """
+    bytecode_cache, app.jinja_env.bytecode_cache = app.jinja_env.bytecode_cache, FileSystemBytecodeCache(str(tmp_path))
+    try:
+        result = app.test_cli_runner().invoke(args=['compile-templates'])
+    finally:
+        app.jinja_env.bytecode_cache = bytecode_cache
+    assert result.exit_code == 0
+    assert len(os.listdir(tmp_path)) == len(app.jinja_env.list_templates())